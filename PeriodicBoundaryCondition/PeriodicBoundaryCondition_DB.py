@@ -1,14 +1,23 @@
 import abaqusGui
 import kernelAccess
 from kernelAccess import mdb
+from kernelAccess import session
 
 
-# Class for the initial overview GUI
+# Class for the initial overview GUI: a table with the periodic boundary conditions, which can be filtered by model,
+# status and plane, and which is shown in pages of PAGE_SIZE rows. The table is populated from the cached summary of the
+# matchers (see get_summary), so filtering, paging and selecting rows do not require calls to the kernel. Several rows
+# can be selected, to pair or delete their periodic boundary conditions at once.
 class OverviewDialog(abaqusGui.AFXDataDialog):
     # id values, useful for commands between widgets
     [
-        ID_PBC
-    ] = range(abaqusGui.AFXToolsetGui.ID_LAST, abaqusGui.AFXToolsetGui.ID_LAST+1)
+        ID_TABLE,
+        ID_FILTER_MODEL,
+        ID_FILTER_STATUS,
+        ID_FILTER_PLANE,
+        ID_PREVIOUS,
+        ID_NEXT
+    ] = range(abaqusGui.AFXToolsetGui.ID_LAST, abaqusGui.AFXToolsetGui.ID_LAST+6)
 
     # constructor
     def __init__(self, form, step):
@@ -19,12 +28,19 @@ class OverviewDialog(abaqusGui.AFXDataDialog):
         # Save the step
         self.step = step
         # Define command map
-        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_PBC, OverviewDialog.on_message)
-        # Configure apply button: delete periodic boundary (issue command)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_TABLE, OverviewDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_SELECTED, self.ID_TABLE, OverviewDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_DESELECTED, self.ID_TABLE, OverviewDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_FILTER_MODEL, OverviewDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_FILTER_STATUS, OverviewDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_FILTER_PLANE, OverviewDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_PREVIOUS, OverviewDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_NEXT, OverviewDialog.on_message)
+        # Configure apply button: delete the selected periodic boundaries (issue command)
         del_btn = self.getActionButton(self.ID_CLICKED_APPLY)
         del_btn.setText('Delete')
         del_btn.disable()
-        # Configure continue button: pair periodic boundary (issue command)
+        # Configure continue button: pair the selected periodic boundaries (issue command)
         pair_btn = self.getActionButton(self.ID_CLICKED_OK)
         pair_btn.setText('Pair')
         pair_btn.disable()
@@ -34,36 +50,37 @@ class OverviewDialog(abaqusGui.AFXDataDialog):
         # Configure cancel button: close window
         close_btn = self.getActionButton(self.ID_CLICKED_CANCEL)
         close_btn.setText('Close')
-        # First horizontal frame
-        frame_1 = abaqusGui.FXHorizontalFrame(p=self)
-        # Child vertical frame 1
-        frame_1_1 = abaqusGui.FXVerticalFrame(p=frame_1)
-        # Combo box to select the different PBCs
-        self.cbx_pbx = abaqusGui.AFXComboBox(p=frame_1_1, ncols=24, nvis=1, text='',
-                                               tgt=self, sel=self.ID_PBC)
-        # Add status text fields
-        aligner = abaqusGui.AFXVerticalAligner(p=frame_1_1)
-        self.txt_valid = abaqusGui.AFXTextField(p=aligner, ncols=15, labelText='Valid:')
-        self.txt_valid.disable()
-        self.txt_matched = abaqusGui.AFXTextField(p=aligner, ncols=15, labelText='Matched:')
-        self.txt_matched.disable()
-        self.txt_paired = abaqusGui.AFXTextField(p=aligner, ncols=15, labelText='Paired:')
-        self.txt_paired.disable()
-        self.txt_master = abaqusGui.AFXTextField(p=aligner, ncols=15, labelText='Master:')
-        self.txt_master.disable()
-        self.txt_slave = abaqusGui.AFXTextField(p=aligner, ncols=15, labelText='Slave:')
-        self.txt_slave.disable()
-        self.txt_plane = abaqusGui.AFXTextField(p=aligner, ncols=15, labelText='Plane:')
-        self.txt_plane.disable()
-        self.txt_mode = abaqusGui.AFXTextField(p=aligner, ncols=15, labelText='Mode:')
-        self.txt_mode.disable()
-        self.txt_pairs = abaqusGui.AFXTextField(p=aligner, ncols=15, labelText='Pairs:')
-        self.txt_pairs.disable()
-        self.txt_exempts = abaqusGui.AFXTextField(p=aligner, ncols=15, labelText='Exempts:')
-        self.txt_exempts.disable()
-        # Tracker for highlighted surfaces
-        self.hl_m = ''
-        self.hl_s = ''
+        # Horizontal frame with the filters
+        frame_filters = abaqusGui.FXHorizontalFrame(p=self)
+        self.cbx_model = abaqusGui.AFXComboBox(p=frame_filters, ncols=16, nvis=1, text='Model',
+                                               tgt=self, sel=self.ID_FILTER_MODEL)
+        self.cbx_status = abaqusGui.AFXComboBox(p=frame_filters, ncols=12, nvis=len(STATUSES), text='Status',
+                                                tgt=self, sel=self.ID_FILTER_STATUS)
+        for index in range(0, len(STATUSES)):
+            self.cbx_status.appendItem(text=STATUSES[index], sel=index)
+        self.cbx_plane = abaqusGui.AFXComboBox(p=frame_filters, ncols=10, nvis=len(PLANES) + 1, text='Plane',
+                                               tgt=self, sel=self.ID_FILTER_PLANE)
+        self.cbx_plane.appendItem(text=ALL, sel=-1)
+        for index in range(0, len(PLANES)):
+            self.cbx_plane.appendItem(text=PLANES[index], sel=index)
+        # Table with the periodic boundary conditions of the current page, the first row holds the column labels,
+        # and rows are selected as a whole
+        self.table = abaqusGui.AFXTable(self, VISIBLE_ROWS + 1, len(COLUMNS), 1, len(COLUMNS), self, self.ID_TABLE,
+                                        abaqusGui.AFXTABLE_NORMAL | abaqusGui.AFXTABLE_ROW_MODE)
+        self.table.setLeadingRows(1)
+        self.table.setLeadingRowLabels('\t'.join(COLUMNS))
+        self.table.setColumnWidth(0, 140)
+        # Horizontal frame with the page navigation
+        frame_pages = abaqusGui.FXHorizontalFrame(p=self)
+        self.btn_previous = abaqusGui.FXButton(frame_pages, 'Previous', None, self, self.ID_PREVIOUS)
+        self.btn_next = abaqusGui.FXButton(frame_pages, 'Next', None, self, self.ID_NEXT)
+        self.lbl_page = abaqusGui.FXLabel(p=frame_pages, text='')
+        # Current page, and the names of the periodic boundaries which pass the filters and of those on the page
+        self.page = 0
+        self.names = []
+        self.rows = []
+        # Tracker for the highlighted surfaces
+        self.highlighted = False
         # Force initial updates
         self.update_boundaries()
 
@@ -74,121 +91,178 @@ class OverviewDialog(abaqusGui.AFXDataDialog):
     # general callback method for when a user performs an action on a widget,
     # routes the callback forward to the respective callback method for the widget
     def on_message(self, sender, sel, ptr):
-        if abaqusGui.SELID(sel) == self.ID_PBC:
-            self.on_boundary_selected()
-
-    # callback method for when the user selects a new matcher
-    def on_boundary_selected(self):
-        count = self.cbx_pbx.getNumItems()
-        flag = False
-        # remove highlighting
-        self.un_highlight()
-        # update GUI
-        if count <= 0:
-            flag = True
-        else:
-            if is_rep_initialized():
-                keys = mdb.customData.matchers.keys()
-                index = min(self.cbx_pbx.getCurrentItem(), len(keys)-1)
-                if index >= 0:
-                    # fetch matcher
-                    matcher = mdb.customData.matchers[keys[index]].get_matcher()
-                    self.txt_valid.setText(str(matcher.is_valid()))
-                    self.txt_matched.setText(str(matcher.is_matched()))
-                    self.txt_paired.setText(str(matcher.is_paired()))
-                    self.txt_master.setText(matcher.get_master_name())
-                    self.txt_slave.setText(matcher.get_slave_name())
-                    self.txt_plane.setText(PLANES[matcher.get_plane_index()])
-                    self.txt_mode.setText(MODES[matcher.get_mode_index()])
-                    self.txt_pairs.setText(str(matcher.get_pair_count()))
-                    self.txt_exempts.setText(str(matcher.get_exempt_count()))
-                    # highlight
-                    self.highlight(matcher)
-                else:
-                    flag = True
-        if flag:
-            self.txt_valid.setText('N.A.')
-            self.txt_matched.setText('N.A.')
-            self.txt_paired.setText('N.A.')
-            self.txt_master.setText('N.A.')
-            self.txt_slave.setText('N.A.')
-            self.txt_plane.setText('N.A.')
-            self.txt_mode.setText('N.A.')
-            self.txt_pairs.setText('N.A.')
-            self.txt_exempts.setText('N.A.')
+        if abaqusGui.SELID(sel) == self.ID_TABLE:
+            self.on_selection_changed()
+        elif abaqusGui.SELID(sel) in (self.ID_FILTER_MODEL, self.ID_FILTER_STATUS, self.ID_FILTER_PLANE):
+            self.on_filter_changed()
+        elif abaqusGui.SELID(sel) == self.ID_PREVIOUS:
+            self.on_page_selected(self.page - 1)
+        elif abaqusGui.SELID(sel) == self.ID_NEXT:
+            self.on_page_selected(self.page + 1)
+        return 1
+
+    # callback method for when the user changes one of the filters, the first page is shown
+    def on_filter_changed(self):
+        self.page = 0
+        self.update_table()
+
+    # callback method for when the user navigates to another page
+    def on_page_selected(self, page):
+        self.page = page
+        self.update_table()
+
+    # callback method for when the user selects or deselects rows: highlights the surfaces of the selected periodic
+    # boundaries and updates the buttons
+    def on_selection_changed(self):
+        self.highlight(self.get_selected_headers())
         self.update_buttons()
 
-    # method which can be called to force an update of the matcher combo box
+    # method which can be called to force an update of the filters and the table, after a command has been issued
     def update_boundaries(self):
-        if is_rep_initialized():
-            reset_combo_box(self.cbx_pbx, mdb.customData.matchers.keys())
+        summary = get_summary()
+        # Update the models in the model filter, keeping the selected model if it still exists
+        selected = self.get_model_filter()
+        models = []
+        for name in summary['names']:
+            model = summary['headers'][name]['model']
+            if model not in models:
+                models.append(model)
+        self.cbx_model.clearItems()
+        self.cbx_model.appendItem(text=ALL, sel=-1)
+        for index in range(0, len(models)):
+            self.cbx_model.appendItem(text=models[index], sel=index)
+        self.cbx_model.setMaxVisible(min(10, len(models) + 1))
+        if selected in models:
+            self.cbx_model.setCurrentItem(models.index(selected) + 1)
+        self.update_table()
+
+    # method to fill the table with the rows of the current page
+    def update_table(self):
+        summary = get_summary()
+        self.names = self.get_filtered_names()
+        pages = max(1, (len(self.names) + PAGE_SIZE - 1) // PAGE_SIZE)
+        self.page = max(0, min(self.page, pages - 1))
+        self.rows = self.names[self.page * PAGE_SIZE:(self.page + 1) * PAGE_SIZE]
+        # Resize the table to the number of rows on the page (the first row holds the column labels)
+        self.table.killSelection()
+        count = self.table.getNumRows() - 1
+        if count > len(self.rows):
+            self.table.deleteRows(1 + len(self.rows), count - len(self.rows))
+        elif count < len(self.rows):
+            self.table.insertRows(1 + count, len(self.rows) - count)
+        # Fill the rows
+        for row in range(0, len(self.rows)):
+            values = get_row_values(summary['headers'][self.rows[row]])
+            for column in range(0, len(values)):
+                self.table.setItemText(row + 1, column, values[column])
+        # Update the page navigation
+        self.lbl_page.setText('Page ' + str(self.page + 1) + '/' + str(pages) + ' (' + str(len(self.names)) + ' of ' +
+                              str(len(summary['names'])) + ')')
+        if self.page > 0:
+            self.btn_previous.enable()
         else:
-            self.cbx_pbx.clearItems()
-            self.cbx_pbx.setMaxVisible(1)
-            self.cbx_pbx.disable()
-        self.on_boundary_selected()
-
-    def try_select_boundary(self, name):
-        pass
-
-    # method to update the states of the action buttons based on the currently selected matcher
+            self.btn_previous.disable()
+        if self.page < pages - 1:
+            self.btn_next.enable()
+        else:
+            self.btn_next.disable()
+        self.on_selection_changed()
+
+    # Gets the names of the periodic boundaries which pass the filters, in the order of the summary
+    def get_filtered_names(self):
+        summary = get_summary()
+        model = self.get_model_filter()
+        status = self.cbx_status.getItemData(self.cbx_status.getCurrentItem())
+        plane = self.cbx_plane.getItemData(self.cbx_plane.getCurrentItem())
+        names = []
+        for name in summary['names']:
+            header = summary['headers'][name]
+            if model is not None and header['model'] != model:
+                continue
+            if status > 0 and get_status_index(header) != status:
+                continue
+            if plane >= 0 and header['plane'] != plane:
+                continue
+            names.append(name)
+        return names
+
+    # Gets the name of the model selected in the model filter, None if all models are shown
+    def get_model_filter(self):
+        if self.cbx_model.getNumItems() <= 0 or self.cbx_model.getCurrentItem() <= 0:
+            return None
+        return self.cbx_model.getItemText(self.cbx_model.getCurrentItem())
+
+    # Gets the names of the selected periodic boundaries, the row of the cursor counts as selected if no rows are
+    def get_selected_names(self):
+        names = [self.rows[row - 1] for row in range(1, len(self.rows) + 1) if self.table.isRowSelected(row)]
+        if len(names) == 0:
+            row = self.table.getCurrentRow()
+            if 1 <= row <= len(self.rows):
+                names.append(self.rows[row - 1])
+        return names
+
+    # Gets the headers of the selected periodic boundaries from the cached summary
+    def get_selected_headers(self):
+        summary = get_summary()
+        return [summary['headers'][name] for name in self.get_selected_names()]
+
+    # Gets the names of the selected periodic boundaries which can be paired: those which are not paired yet, or of
+    # which the constraints are outdated
+    def get_names_to_pair(self):
+        return [header['name'] for header in self.get_selected_headers()
+                if header['valid'] and (not header['paired'] or header.get('outdated', False))]
+
+    # method to update the states of the action buttons based on the currently selected matchers
     def update_buttons(self):
         del_btn = self.getActionButton(self.ID_CLICKED_APPLY)
         pair_btn = self.getActionButton(self.ID_CLICKED_OK)
-        if self.cbx_pbx.getNumItems() <= 0:
-            del_btn.disable()
-            pair_btn.disable()
-        else:
+        if len(self.get_selected_names()) > 0:
             del_btn.enable()
-            matcher = self.get_current_matcher()
-            if matcher is None or matcher.is_paired():
-                pair_btn.disable()
-            else:
-                pair_btn.enable()
-
-    # fetches the currently selected matcher object
-    def get_current_matcher(self):
-        if self.cbx_pbx.getNumItems() > 0 and is_rep_initialized():
-            keys = mdb.customData.matchers.keys()
-            index = min(self.cbx_pbx.getCurrentItem(), len(keys)-1)
-            if index < 0:
-                return None
-            else:
-                return mdb.customData.matchers[keys[index]].get_matcher()
         else:
-            return None
+            del_btn.disable()
+        if len(self.get_names_to_pair()) > 0:
+            pair_btn.enable()
+        else:
+            pair_btn.disable()
 
     # method to fetch the currently defined name (must be implemented in all dialogs from which commands will be issued)
     def get_current_name(self):
-        if self.cbx_pbx.getNumItems() > 0:
-            # Return the name
-            return self.cbx_pbx.getItemText(self.cbx_pbx.getCurrentItem())
+        names = self.get_selected_names()
+        if len(names) > 0:
+            # Return the name of the first selected periodic boundary
+            return names[0]
         else:
             # Return empty string
             return ''
 
-    def highlight(self, matcher):
-        self.hl_m = 'hl_m = (mdb.models[\'' + matcher.get_model_name() + '\']' +\
-                    '.parts[\'' + matcher.get_part_name() + '\']' +\
-                    '.surfaces[\'' + matcher.get_master_name() + '\'],)'
-        self.hl_s = 'hl_s = (mdb.models[\'' + matcher.get_model_name() + '\']' +\
-                    '.parts[\'' + matcher.get_part_name() + '\']' +\
-                    '.surfaces[\'' + matcher.get_slave_name() + '\'])'
-        abaqusGui.sendCommand(self.hl_m + '\nhighlight(hl_m)')
-        abaqusGui.sendCommand(self.hl_s + '\nhighlight(hl_s)')
-
+    # Highlights the master and slave surfaces of the given headers, with a single command which also removes the
+    # previous highlighting
+    def highlight(self, headers):
+        surfaces = []
+        for header in headers:
+            for surface in (header['master'], header['slave']):
+                path = ('mdb.models[' + repr(header['model']) + '].parts[' + repr(header['part']) + '].surfaces[' +
+                        repr(surface) + ']')
+                if path not in surfaces:
+                    surfaces.append(path)
+        command = ''
+        if self.highlighted:
+            command = 'unhighlight(hl_pbc)\n'
+        if len(surfaces) > 0:
+            command = command + 'hl_pbc = (' + ', '.join(surfaces) + ',)\nhighlight(hl_pbc)'
+        self.highlighted = len(surfaces) > 0
+        if command != '':
+            abaqusGui.sendCommand(command)
+
+    # Removes the highlighting
     def un_highlight(self):
-        if self.hl_m is not '':
-            abaqusGui.sendCommand(self.hl_m + '\nunhighlight(hl_m)')
-            self.hl_m = ''
-        if self.hl_s is not '':
-            abaqusGui.sendCommand(self.hl_s + '\nunhighlight(hl_s)')
-            self.hl_s = ''
+        if self.highlighted:
+            abaqusGui.sendCommand('unhighlight(hl_pbc)')
+            self.highlighted = False
 
     # Override from parent class
     def processUpdates(self):
         abaqusGui.AFXDataDialog.processUpdates(self)
-        # self.on_boundary_selected()
 
     # Override from parent class
     def hide(self):
@@ -212,8 +286,12 @@ class InputDialog(abaqusGui.AFXDataDialog):
         ID_USE_EX_SLAVE,
         ID_NAME,
         ID_PLANE,
-        ID_MODE
-    ] = range(abaqusGui.AFXToolsetGui.ID_LAST, abaqusGui.AFXToolsetGui.ID_LAST+11)
+        ID_MODE,
+        ID_SEARCH,
+        ID_OUTPUT,
+        ID_FORMULATION,
+        ID_ORDERING
+    ] = range(abaqusGui.AFXToolsetGui.ID_LAST, abaqusGui.AFXToolsetGui.ID_LAST+15)
 
     # constructor
     def __init__(self, form, step):
@@ -236,6 +314,10 @@ class InputDialog(abaqusGui.AFXDataDialog):
         abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_USE_EX_SLAVE, InputDialog.on_message)
         abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_PLANE, InputDialog.on_message)
         abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_MODE, InputDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_SEARCH, InputDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_OUTPUT, InputDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_FORMULATION, InputDialog.on_message)
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_COMMAND, self.ID_ORDERING, InputDialog.on_message)
         # Configure the ok button
         ok_btn = self.getActionButton(self.ID_CLICKED_CONTINUE)
         ok_btn.disable()
@@ -309,6 +391,31 @@ class InputDialog(abaqusGui.AFXDataDialog):
                                               tgt=self, sel=self.ID_MODE)
         self.cbx_mode.appendItem(text=MODES[0], sel=0)
         self.cbx_mode.appendItem(text=MODES[1], sel=1)
+        # Add text field for the tolerance of the exact matches
+        self.txt_tol = abaqusGui.AFXTextField(p=aligner, ncols=widget_width + 2, labelText='Tolerance')
+        self.txt_tol.setText('0')
+        # Add combo box to select the search method for proximity matches
+        self.cbx_search = abaqusGui.AFXComboBox(p=aligner, ncols=widget_width, nvis=3, text='Proximity Search',
+                                                tgt=self, sel=self.ID_SEARCH)
+        self.cbx_search.appendItem(text=SEARCHES[0], sel=0)
+        self.cbx_search.appendItem(text=SEARCHES[1], sel=1)
+        self.cbx_search.appendItem(text=SEARCHES[2], sel=2)
+        # Add combo box to select the output of the constraints
+        self.cbx_output = abaqusGui.AFXComboBox(p=aligner, ncols=widget_width, nvis=2, text='Output',
+                                                tgt=self, sel=self.ID_OUTPUT)
+        self.cbx_output.appendItem(text=OUTPUTS[0], sel=0)
+        self.cbx_output.appendItem(text=OUTPUTS[1], sel=1)
+        # Add combo box to select the formulation of the translational constraints
+        self.cbx_formulation = abaqusGui.AFXComboBox(p=aligner, ncols=widget_width, nvis=2, text='Constraints',
+                                                     tgt=self, sel=self.ID_FORMULATION)
+        self.cbx_formulation.appendItem(text=FORMULATIONS[0], sel=0)
+        self.cbx_formulation.appendItem(text=FORMULATIONS[1], sel=1)
+        # Add combo box to select the ordering of the node pairs
+        self.cbx_ordering = abaqusGui.AFXComboBox(p=aligner, ncols=widget_width, nvis=3, text='Pair Ordering',
+                                                  tgt=self, sel=self.ID_ORDERING)
+        self.cbx_ordering.appendItem(text=ORDERINGS[0], sel=0)
+        self.cbx_ordering.appendItem(text=ORDERINGS[1], sel=1)
+        self.cbx_ordering.appendItem(text=ORDERINGS[2], sel=2)
         # Set currently selected items to -1 (to force an update on first opening of the GUI)
         self.currentModel = -1
         self.currentPart = -1
@@ -319,6 +426,10 @@ class InputDialog(abaqusGui.AFXDataDialog):
         self.currentName = ''
         self.currentPlane = -1
         self.currentMode = -1
+        self.currentSearch = -1
+        self.currentOutput = -1
+        self.currentFormulation = -1
+        self.currentOrdering = -1
         # Define highlighted sets
         self.highlight_m = ''
         self.highlight_s = ''
@@ -328,6 +439,10 @@ class InputDialog(abaqusGui.AFXDataDialog):
         self.on_model_selected()
         self.on_plane_selected()
         self.on_mode_selected()
+        self.on_search_selected()
+        self.on_output_selected()
+        self.on_formulation_selected()
+        self.on_ordering_selected()
 
     # Method to get the step associated with the current dialog
     def get_step(self):
@@ -360,6 +475,14 @@ class InputDialog(abaqusGui.AFXDataDialog):
             self.on_plane_selected()
         elif abaqusGui.SELID(sel) == self.ID_MODE:
             self.on_mode_selected()
+        elif abaqusGui.SELID(sel) == self.ID_SEARCH:
+            self.on_search_selected()
+        elif abaqusGui.SELID(sel) == self.ID_OUTPUT:
+            self.on_output_selected()
+        elif abaqusGui.SELID(sel) == self.ID_FORMULATION:
+            self.on_formulation_selected()
+        elif abaqusGui.SELID(sel) == self.ID_ORDERING:
+            self.on_ordering_selected()
 
     def get_selected_model(self):
         count = self.cbx_model.getNumItems()
@@ -428,7 +551,7 @@ class InputDialog(abaqusGui.AFXDataDialog):
     # callback method for when the user selects a new master surface
     def on_master_selected(self):
         # Undo highlighting of previous master
-        if self.highlight_m is not '' and self.currentSlave != self.currentMaster:
+        if self.highlight_m != '' and self.currentSlave != self.currentMaster:
             abaqusGui.sendCommand(self.highlight_m + '\nunhighlight(m)')
             self.highlight_m = ''
         # Check if there are items in the master list
@@ -463,7 +586,7 @@ class InputDialog(abaqusGui.AFXDataDialog):
     # callback method for when the user selects a new slave surface
     def on_slave_selected(self):
         # Undo highlighting of previous slave
-        if self.highlight_s is not '' and self.currentSlave != self.currentMaster:
+        if self.highlight_s != '' and self.currentSlave != self.currentMaster:
             abaqusGui.sendCommand(self.highlight_s + '\nunhighlight(s)')
             self.highlight_s = ''
         # Check if there are items in the slave list
@@ -498,7 +621,7 @@ class InputDialog(abaqusGui.AFXDataDialog):
     # callback method for when the user selects a new master exemption set
     def on_master_exempt_selected(self):
         # Undo highlighting of previous master exempt
-        if self.highlight_em is not '' and self.currentSExempt != self.currentMExempt:
+        if self.highlight_em != '' and self.currentSExempt != self.currentMExempt:
             abaqusGui.sendCommand(self.highlight_em + '\nunhighlight(em)')
             self.highlight_em = ''
         # Check if there are items in the slave exempt list
@@ -529,7 +652,7 @@ class InputDialog(abaqusGui.AFXDataDialog):
     # callback method for when the user selects a new slave exemption set
     def on_slave_exempt_selected(self):
         # Undo highlighting of previous slave exempt
-        if self.highlight_es is not '' and self.currentSExempt != self.currentMExempt:
+        if self.highlight_es != '' and self.currentSExempt != self.currentMExempt:
             abaqusGui.sendCommand(self.highlight_es + '\nunhighlight(es)')
             self.highlight_es = ''
         # Check if there are items in the slave exempt list
@@ -595,6 +718,13 @@ class InputDialog(abaqusGui.AFXDataDialog):
         else:
             return -1
 
+    # Fetches the tolerance for exact matches (invalid or negative input is interpreted as 0, meaning bit-identical)
+    def get_tolerance(self):
+        try:
+            return max(0.0, float(self.txt_tol.getText()))
+        except ValueError:
+            return 0.0
+
     # callback method for when the user selects a new match plane
     def on_plane_selected(self):
         self.currentPlane = self.cbx_plane.getItemData(self.cbx_plane.getCurrentItem())
@@ -603,6 +733,22 @@ class InputDialog(abaqusGui.AFXDataDialog):
     def on_mode_selected(self):
         self.currentMode = self.cbx_mode.getItemData(self.cbx_mode.getCurrentItem())
 
+    # callback method for when the user selects a new proximity search method
+    def on_search_selected(self):
+        self.currentSearch = self.cbx_search.getItemData(self.cbx_search.getCurrentItem())
+
+    # callback method for when the user selects a new output for the constraints
+    def on_output_selected(self):
+        self.currentOutput = self.cbx_output.getItemData(self.cbx_output.getCurrentItem())
+
+    # callback method for when the user selects a new formulation for the translational constraints
+    def on_formulation_selected(self):
+        self.currentFormulation = self.cbx_formulation.getItemData(self.cbx_formulation.getCurrentItem())
+
+    # callback method for when the user selects a new ordering for the node pairs
+    def on_ordering_selected(self):
+        self.currentOrdering = self.cbx_ordering.getItemData(self.cbx_ordering.getCurrentItem())
+
     # method to update the state of the create button based on the current user inputs
     def update_action_button_state(self):
         m = self.cbx_master.getNumItems()
@@ -636,19 +782,19 @@ class InputDialog(abaqusGui.AFXDataDialog):
     # Override from parent class
     def hide(self):
         # Undo highlighting of master surface
-        if self.highlight_m is not '':
+        if self.highlight_m != '':
             abaqusGui.sendCommand(self.highlight_m + '\nunhighlight(m)')
             self.highlight_m = ''
         # Undo highlighting of slave surface
-        if self.highlight_s is not '':
+        if self.highlight_s != '':
             abaqusGui.sendCommand(self.highlight_s + '\nunhighlight(s)')
             self.highlight_s = ''
         # Undo highlighting of master exempt
-        if self.highlight_em is not '':
+        if self.highlight_em != '':
             abaqusGui.sendCommand(self.highlight_em + '\nunhighlight(em)')
             self.highlight_em = ''
         # Undo highlighting of slave exempt
-        if self.highlight_es is not '':
+        if self.highlight_es != '':
             abaqusGui.sendCommand(self.highlight_es + '\nunhighlight(es)')
             self.highlight_es = ''
         # Call super method
@@ -691,6 +837,100 @@ class ConfirmDialog(abaqusGui.AFXDataDialog):
         pass
 
 
+# Class for a dialog which shows the progress of a matching or pairing job, which is processed by the kernel in steps:
+# a timer issues the command for the next step, after which the progress is polled and displayed. In between the steps,
+# the GUI remains responsive. The Continue button is clicked automatically when the job has finished.
+class ProgressDialog(abaqusGui.AFXDataDialog):
+    # id values, useful for commands between widgets
+    [
+        ID_POLL
+    ] = range(abaqusGui.AFXToolsetGui.ID_LAST, abaqusGui.AFXToolsetGui.ID_LAST+1)
+
+    # constructor
+    def __init__(self, form, step, name, operation):
+        # Call super constructor
+        abaqusGui.AFXDataDialog.__init__(self, form, 'Progress',
+                                         self.CONTINUE | self.CANCEL,
+                                         abaqusGui.DIALOG_ACTIONS_SEPARATOR)
+        # Save the step
+        self.step = step
+        # Store data
+        self.form = form
+        self.name = name
+        self.operation = operation
+        self.polling = False
+        # Define command map
+        abaqusGui.FXMAPFUNC(self, abaqusGui.SEL_TIMEOUT, self.ID_POLL, ProgressDialog.on_poll)
+        # Configure the continue button (enabled when the job has finished)
+        continue_btn = self.getActionButton(self.ID_CLICKED_CONTINUE)
+        continue_btn.setText('Continue')
+        continue_btn.disable()
+        # Configure the cancel button: cancels the job
+        cancel_btn = self.getActionButton(self.ID_CLICKED_CANCEL)
+        cancel_btn.setText('Cancel')
+        # Add the labels and the progress bar
+        text = 'Matching nodes of ' if operation == 'match' else 'Pairing nodes of '
+        abaqusGui.FXLabel(p=self, text=text + name)
+        self.lbl_phase = abaqusGui.FXLabel(p=self, text='Starting...')
+        self.bar = abaqusGui.FXProgressBar(p=self, opts=abaqusGui.PROGRESSBAR_PERCENTAGE | abaqusGui.LAYOUT_FILL_X)
+
+    # Method to get the step associated with the current dialog
+    def get_step(self):
+        return self.step
+
+    # method to fetch the currently defined name (must be implemented in all dialogs from which commands will be issued)
+    def get_current_name(self):
+        return self.name
+
+    # method must be defined here as commands can be issued from this dialog, which will call this method
+    def update_boundaries(self):
+        # nothing to update
+        pass
+
+    # Schedules the next poll
+    def schedule_poll(self):
+        abaqusGui.getAFXApp().addTimeout(POLL_INTERVAL, self, self.ID_POLL)
+
+    # callback method for the timer: processes the next step of the job and displays its progress
+    def on_poll(self, sender, sel, ptr):
+        if not self.polling:
+            return 1
+        self.form.issue_step()
+        progress = get_job_progress(self.name)
+        if progress is None or progress['status'] == 'finished':
+            # The job has finished: continue
+            self.polling = False
+            self.getActionButton(self.ID_CLICKED_CONTINUE).enable()
+            self.handle(self, abaqusGui.MKUINT(self.ID_CLICKED_CONTINUE, abaqusGui.SEL_COMMAND), None)
+        elif progress['status'] == 'running':
+            # Update the progress and schedule the next step
+            self.lbl_phase.setText(progress['phase'].capitalize() + ': ' + str(progress['done']) + '/' +
+                                   str(progress['total']))
+            self.bar.setTotal(max(1, progress['total']))
+            self.bar.setProgress(progress['done'])
+            self.schedule_poll()
+        else:
+            # The job has been cancelled or has failed (the error is reported in the message area)
+            self.polling = False
+            self.handle(self, abaqusGui.MKUINT(self.ID_CLICKED_CANCEL, abaqusGui.SEL_COMMAND), None)
+        return 1
+
+    # Override from parent class
+    def show(self):
+        # Call super method
+        abaqusGui.AFXDataDialog.show(self)
+        # Start polling
+        self.polling = True
+        self.schedule_poll()
+
+    # Override from parent class
+    def hide(self):
+        # Stop polling
+        self.polling = False
+        # Call super method
+        abaqusGui.AFXDataDialog.hide(self)
+
+
 # Class for a dialog to inform the user that constraints can not be applied
 class ErrorDialog(abaqusGui.AFXDataDialog):
     # constructor
@@ -731,6 +971,56 @@ def reset_combo_box(cbx, keys):
         cbx.disable()
 
 
+# Utility method to get the index of the status of a periodic boundary (see STATUSES) from its header
+def get_status_index(header):
+    if not header['valid']:
+        return 1
+    elif header['paired'] and header.get('outdated', False):
+        return 5
+    elif header['paired']:
+        return 4
+    elif header['matched']:
+        return 3
+    else:
+        return 2
+
+
+# Utility method to get the texts of the columns of the overview table (see COLUMNS) from the header of a periodic
+# boundary
+def get_row_values(header):
+    return [header['name'], header['model'], STATUSES[get_status_index(header)], header['master'], header['slave'],
+            PLANES[header['plane']], MODES[header['mode']], str(header['pairs']), str(header['exempts'])]
+
+
+# Utility method to fetch the progress of a job from the session custom data (returns None if there is no progress)
+def get_job_progress(name):
+    if hasattr(session.customData, 'pbc_progress'):
+        try:
+            return session.customData.pbc_progress[name]
+        except KeyError:
+            return None
+    return None
+
+
+# Utility method to fetch the summary of the matchers (see PeriodicBoundaryCondition_core.get_summary), which the kernel
+# publishes in the session custom data. The summary is fetched with a single call to the kernel, and is then cached
+# until a command which modifies the matchers has been issued (see invalidate_summary). Returns an empty summary (which
+# is not cached) if the matcher repository is not initialized, or if the kernel has not published a summary yet.
+def get_summary():
+    global SUMMARY
+    if SUMMARY is None and is_rep_initialized() and hasattr(session.customData, 'pbc_summary'):
+        SUMMARY = session.customData.pbc_summary
+    if SUMMARY is None:
+        return {'names': [], 'headers': {}}
+    return SUMMARY
+
+
+# Utility method to clear the cached summary of the matchers, it is fetched again when it is needed
+def invalidate_summary():
+    global SUMMARY
+    SUMMARY = None
+
+
 # Utility method to check if the matcher repository is initialized
 def is_rep_initialized():
     # Check if the custom data has the matchers initialized
@@ -826,6 +1116,25 @@ class PickHandler(abaqusGui.AFXProcedure):
 # Arrays with the names of the match planes and mode options
 PLANES = ['XY-plane', 'XZ-plane', 'YZ-plane']
 MODES = ['Translational', 'Axial']
+SEARCHES = ['Grid', 'Linear', 'Assignment']
+OUTPUTS = ['Model', 'Include File']
+FORMULATIONS = ['Chained', 'Reference Point']
+ORDERINGS = ['Matching', 'Morton', 'Hilbert']
+
+# Columns of the overview table, the statuses by which it can be filtered (the first shows all), the number of rows
+# per page and the number of visible rows
+COLUMNS = ['Name', 'Model', 'Status', 'Master', 'Slave', 'Plane', 'Mode', 'Pairs', 'Exempts']
+STATUSES = ['All', 'Invalid', 'Not Matched', 'Matched', 'Paired', 'Outdated']
+ALL = 'All'
+PAGE_SIZE = 50
+VISIBLE_ROWS = 15
+
+# Cached summary of the matchers (see get_summary)
+SUMMARY = None
+
+# Interval (in ms) between the steps of a matching or pairing job, and the time budget (in s) of each step in the kernel
+POLL_INTERVAL = 50
+STEP_BUDGET = 0.25
 
 
 # Utility method to print a message to the console
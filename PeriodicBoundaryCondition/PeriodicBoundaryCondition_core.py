@@ -0,0 +1,2657 @@
+import abc
+import functools
+import hashlib
+import heapq
+import multiprocessing
+import numpy
+import os
+import pickle
+import sys
+import timeit
+from math import sqrt
+
+
+# The core of the plugin: matching the nodes of two surfaces and generating the equations for the periodic boundary
+# condition. This module only depends on NumPy, all access to the model database goes through an adapter
+# (see ModelAdapter), so that the matching can be run and tested outside of Abaqus CAE as well.
+
+
+# Sets the adapter through which the model database is accessed
+def set_adapter(adapter):
+    global ADAPTER
+    ADAPTER = adapter
+
+
+# Getter for the adapter through which the model database is accessed
+def get_adapter():
+    if ADAPTER is None:
+        raise RuntimeError('No model adapter has been set for the periodic boundary conditions')
+    return ADAPTER
+
+
+# Runs the script to match the nodes, the model, part, surfaces and exempt sets are given as indices in the
+# lists of names of the adapter (the exempt sets are -1 if there is no exemption)
+def match_nodes(name, model, part, master, slave, ex_m, ex_s, plane, mode, tol=0.0, search=0, output=0,
+                formulation=0, ordering=0):
+    adapter = get_adapter()
+    # Create a new matcher if one does not exist yet
+    if not adapter.has_matcher(name):
+        create_matcher(name, model, part, master, slave, ex_m, ex_s, plane, mode, tol, search, output, formulation,
+                       ordering)
+    # Fetch the matcher
+    matcher = adapter.get_matcher(name)
+    # Match the nodes if necessary
+    if not matcher.is_matched():
+        matcher.match_nodes()
+        adapter.store_matcher(name, matcher)
+
+
+# Creates a new matcher and stores it in the repository (see match_nodes for the arguments), the nodes of the
+# surfaces with the given indices are exempted from both the master and slave surfaces
+def create_matcher(name, model, part, master, slave, ex_m, ex_s, plane, mode, tol=0.0, search=0, output=0,
+                   formulation=0, ordering=0, exempt_surfaces=()):
+    adapter = get_adapter()
+    # Fetch keys
+    model_keys = adapter.get_model_names()
+    part_keys = adapter.get_part_names(model_keys[model])
+    surf_keys = adapter.get_surface_names(model_keys[model], part_keys[part])
+    set_keys = adapter.get_set_names(model_keys[model], part_keys[part])
+    # Create new matcher
+    matcher = NodeMatcher(name, model_keys[model], part_keys[part], surf_keys[master], surf_keys[slave],
+                          '' if ex_m < 0 else set_keys[ex_m], '' if ex_s < 0 else set_keys[ex_s],
+                          plane, mode, tol, search, output, formulation, ordering,
+                          [surf_keys[surface] for surface in exempt_surfaces])
+    # Store the matcher in the repository
+    adapter.store_matcher(name, matcher)
+    return matcher
+
+
+# Runs the script to apply the constraints
+def apply_constraints(name):
+    adapter = get_adapter()
+    # fetch matcher
+    if adapter.has_matcher(name):
+        matcher = adapter.get_matcher(name)
+        matcher.apply_constraints()
+        adapter.store_matcher(name, matcher)
+
+
+# Runs the script to remove the constraints, returns the report of the deletion (see NodeMatcher.clear_constraints),
+# None if the constraints had not been applied
+def remove_constraints(name):
+    adapter = get_adapter()
+    report = None
+    # fetch matcher
+    if adapter.has_matcher(name):
+        report = adapter.get_matcher(name).delete_constraints()
+        adapter.delete_matcher(name)
+    return report
+
+
+# Formats the report of the deletion of the constraints of a matcher (see remove_constraints) as a message
+def get_removal_message(name, report):
+    return ('Periodic Boundary Condition ' + name + ': removed ' + str(report['deleted sets']) + ' sets and ' +
+            str(report['deleted equations']) + ' equations, ' + str(report['missing sets']) + ' sets and ' +
+            str(report['missing equations']) + ' equations were already missing')
+
+
+# Runs the script to remove the constraints of several matchers (given by name) with a single command, returns the
+# reports of the deletions by name (see remove_constraints)
+def remove_constraints_batch(names):
+    reports = dict()
+    for name in names:
+        reports[name] = remove_constraints(name)
+    return reports
+
+
+# Runs the script to match the nodes again after the mesh has been modified (see NodeMatcher.rematch_nodes)
+def rematch_nodes(name):
+    adapter = get_adapter()
+    # fetch matcher
+    if adapter.has_matcher(name):
+        matcher = adapter.get_matcher(name)
+        matcher.rematch_nodes()
+        adapter.store_matcher(name, matcher)
+
+
+# Runs the script to update the constraints after the mesh has been modified: the nodes are matched again, after
+# which only the sets and equations which have changed are updated (see NodeMatcher.update_constraints)
+def update_constraints(name):
+    adapter = get_adapter()
+    # fetch matcher
+    if adapter.has_matcher(name):
+        matcher = adapter.get_matcher(name)
+        matcher.rematch_nodes()
+        matcher.update_constraints()
+        adapter.store_matcher(name, matcher)
+
+
+# Runs the script to match the nodes of several matchers at once (given by name), for instance the three periodic
+# boundary conditions of an RVE. The nodes are extracted in this process, each surface only once (see SurfaceIndex),
+# after which the exact and proximity passes
+# are distributed over a pool of processes: one task per matcher for the proximity pass, while the exact pass of large
+# matchers is also split in tiles (see split_tiles). The results are merged in the order of the tasks, and are the same
+# as those of match_nodes. The number of processes defaults to the number of cores, with a single process (or if no
+# pool can be started) the tasks are run one after another in this process. If the pool fails to run the tasks, they
+# are run in this process as well, which is reported in the profile of the matchers.
+def match_nodes_parallel(names, processes=0):
+    adapter = get_adapter()
+    matchers = list()
+    for name in names:
+        if adapter.has_matcher(name):
+            matcher = adapter.get_matcher(name)
+            if matcher.is_valid() and not matcher.is_matched():
+                matchers.append(matcher)
+    if len(matchers) == 0:
+        return
+    # Extract the nodes, this needs the model database, matchers of which the matches are in the cache are done
+    surfaces = SurfaceIndex()
+    nodes = list()
+    for matcher in list(matchers):
+        matcher_nodes = matcher.prepare_matching(surfaces)
+        if matcher_nodes is None:
+            adapter.store_matcher(matcher.get_name(), matcher)
+            matchers.remove(matcher)
+        else:
+            nodes.append(matcher_nodes)
+    if len(matchers) == 0:
+        return
+    pool = create_pool(processes)
+    fallbacks = list()
+    try:
+        # First pass: exact matches, for each tile of each matcher
+        tiles = list()
+        tasks = list()
+        for matcher, (labels_m, coords_m, labels_s, coords_s, exempt_m, exempt_s) in zip(matchers, nodes):
+            plane = matcher.get_plane()
+            plane_m = plane.get_in_plane_coordinates(coords_m)
+            plane_s = plane.get_in_plane_coordinates(coords_s)
+            tolerance = matcher.get_tolerance()
+            if tolerance > 0:
+                # Matches with a tolerance can cross the edges of the tiles, these are matched in a single task
+                tiles.append([(numpy.arange(len(plane_m)), numpy.arange(len(plane_s)))])
+            else:
+                tiles.append(split_tiles(plane_m, plane_s))
+            tasks.extend([(plane_m[tile_m], plane_s[tile_s], tolerance) for tile_m, tile_s in tiles[-1]])
+        results = run_tasks(pool, run_exact_task, tasks, fallbacks)
+        # Merge the tiles, and define the second pass: proximity matches, for each matcher
+        timings = list()
+        exact = list()
+        tasks = list()
+        position = 0
+        for number in range(0, len(matchers)):
+            labels_m, coords_m, labels_s, coords_s, exempt_m, exempt_s = nodes[number]
+            matches = -numpy.ones(len(labels_m), dtype=int)
+            elapsed = 0.0
+            for tile_m, tile_s in tiles[number]:
+                tile_matches, tile_time = results[position]
+                position += 1
+                found = tile_matches >= 0
+                matches[tile_m[found]] = tile_s[tile_matches[found]]
+                elapsed += tile_time
+            timings.append({'exact pass': elapsed})
+            exact_m, exact_s, prox_m, candidates = split_matches(matches, exempt_m, exempt_s)
+            exact.append((exact_m, exact_s, prox_m))
+            plane = matchers[number].get_plane()
+            plane_m = plane.get_in_plane_coordinates(coords_m)
+            plane_s = plane.get_in_plane_coordinates(coords_s)
+            tasks.append((plane_m[prox_m], plane_s, candidates, matchers[number].get_search_index()))
+        results = run_tasks(pool, run_proximity_task, tasks, fallbacks)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    # Update the matchers, in the order in which they were given
+    for number in range(0, len(matchers)):
+        exact_m, exact_s, prox_m = exact[number]
+        prox_s, greedy_s, timings[number]['proximity pass'] = results[number]
+        for fallback in sorted(set(fallbacks), key=fallbacks.index):
+            matchers[number].get_profile().add_note('The matching tasks were run in this process instead of in '
+                                                    'parallel (' + fallback + ')')
+        matchers[number].finish_matching(nodes[number], exact_m, exact_s, prox_m, prox_s, timings[number], greedy_s)
+        adapter.store_matcher(matchers[number].get_name(), matchers[number])
+
+
+# Runs the script to make an RVE periodic in all three directions at once. The faces are given as the indices of six
+# surfaces: the master and slave surfaces for the x, y and z directions. A periodic boundary condition is created for
+# each direction (named after the RVE, with the direction as suffix), of which the nodes are exempted which are shared
+# with the master surfaces of the previous directions, so that the edges and corners are not over-constrained (see
+# the README). The three matchers are matched together with match_nodes_parallel, which extracts the nodes of each
+# face only once, after which the constraints are applied. Returns the names of the periodic boundary conditions.
+def create_rve(name, model, part, faces, tol=0.0, search=0, output=0, formulation=0, ordering=0, processes=0):
+    adapter = get_adapter()
+    names = list()
+    for direction in range(0, 3):
+        names.append(name + '_' + AXES[direction])
+        if not adapter.has_matcher(names[-1]):
+            create_matcher(names[-1], model, part, faces[2 * direction], faces[2 * direction + 1], -1, -1,
+                           RVE_PLANES[direction], 0, tol, search, output, formulation, ordering,
+                           [faces[2 * previous] for previous in range(0, direction)])
+    match_nodes_parallel(names, processes)
+    for matcher_name in names:
+        apply_constraints(matcher_name)
+    return names
+
+
+# Creates a pool of worker processes for match_nodes_parallel, returns None if the tasks should be run in this
+# process instead: for a single process, or if no pool can be created. Where the workers can not be forked, they are
+# started with the Python executable, which is not the executable of Abaqus CAE on Windows.
+def create_pool(processes):
+    try:
+        if processes <= 0:
+            processes = multiprocessing.cpu_count()
+        if processes <= 1:
+            return None
+        if sys.platform.startswith('win') and not os.path.basename(sys.executable).lower().startswith('python'):
+            return None
+        return multiprocessing.Pool(processes)
+    except (NotImplementedError, OSError, ValueError):
+        return None
+
+
+# Runs a function for each of the tasks, in the pool if there is one, returns the results in the order of the tasks.
+# If the pool can not run the tasks, because they can not be pickled, the workers can not import this module or the
+# workers fail, the tasks are run in this process instead, and the reason is added to the given list of fallbacks.
+def run_tasks(pool, function, tasks, fallbacks):
+    if pool is not None:
+        try:
+            return pool.map(function, tasks)
+        except get_pool_errors() as error:
+            fallbacks.append(type(error).__name__ + ': ' + str(error))
+    return [function(task) for task in tasks]
+
+
+# Gets the types of the errors of a pool which can not run the tasks (see run_tasks): pickling errors (in Python 2 the
+# pool pickles with cPickle, of which the errors are distinct from those of pickle), import errors and errors of the
+# worker processes
+def get_pool_errors():
+    try:
+        import cPickle
+        return pickle.PicklingError, cPickle.PicklingError, ImportError, OSError
+    except ImportError:
+        return pickle.PicklingError, ImportError, OSError
+
+
+# Task of match_nodes_parallel for the exact pass of a tile, returns the matches (see match_coordinates) and the run
+# time
+def run_exact_task(task):
+    start = timeit.default_timer()
+    coords_m, coords_s, tolerance = task
+    matches = match_coordinates(coords_m, coords_s, tolerance)
+    return matches, timeit.default_timer() - start
+
+
+# Task of match_nodes_parallel for the proximity pass of a matcher, returns the matches (see match_closest), the
+# greedy matches for the assignment search (None otherwise) and the run time
+def run_proximity_task(task):
+    start = timeit.default_timer()
+    coords_m, coords_s, candidates, search = task
+    greedy = -numpy.ones(len(coords_m), dtype=int) if search == 2 else None
+    matches = match_closest(coords_m, coords_s, candidates, search, greedy)
+    return matches, greedy, timeit.default_timer() - start
+
+
+# Runs the script to start matching the nodes as a job (see match_nodes for the arguments), the job is then
+# processed in steps with step_job, so that the GUI remains responsive and the job can be cancelled
+def start_match_job(name, model, part, master, slave, ex_m, ex_s, plane, mode, tol=0.0, search=0, output=0,
+                    formulation=0, ordering=0):
+    adapter = get_adapter()
+    created = not adapter.has_matcher(name)
+    if created:
+        matcher = create_matcher(name, model, part, master, slave, ex_m, ex_s, plane, mode, tol, search, output,
+                                 formulation, ordering)
+    else:
+        matcher = adapter.get_matcher(name)
+    start_job(MatcherJob(name, matcher, 'match', matcher.iterate_match_nodes(), created))
+
+
+# Runs the script to start applying the constraints as a job, which is then processed in steps with step_job
+def start_pair_job(name):
+    adapter = get_adapter()
+    if adapter.has_matcher(name):
+        matcher = adapter.get_matcher(name)
+        start_job(MatcherJob(name, matcher, 'pair', matcher.iterate_apply_constraints(), False))
+
+
+# Registers a job and publishes its initial progress, a running job with the same name is cancelled first
+def start_job(job):
+    cancel_job(job.get_name())
+    JOBS[job.get_name()] = job
+    get_adapter().publish_progress(job.get_name(), job.get_progress())
+
+
+# Runs the script to process the next steps of a job, until the time budget (in seconds) has been used
+def step_job(name, budget=0.25):
+    if name not in JOBS:
+        return
+    job = JOBS[name]
+    try:
+        finished = job.step(budget)
+    except Exception:
+        # Undo the partial work of the failed job and report the failure
+        del JOBS[name]
+        job.cancel('failed')
+        get_adapter().publish_progress(name, job.get_progress())
+        raise
+    if finished:
+        del JOBS[name]
+        job.finish()
+    get_adapter().publish_progress(name, job.get_progress())
+
+
+# Runs the script to cancel a job, the partial work of the job is undone
+def cancel_job(name):
+    if name in JOBS:
+        job = JOBS.pop(name)
+        job.cancel('cancelled')
+        get_adapter().publish_progress(name, job.get_progress())
+
+
+# Gets the progress of the job with the given name (see MatcherJob.get_progress), None if there is no such job
+def get_job_progress(name):
+    return get_adapter().get_progress(name)
+
+
+# Gets a summary of all matchers in the repository as one dict of plain values: the names of the matchers (in the order
+# of the repository) and the header of each matcher by name (see NodeMatcher.get_header), which are read without
+# unpickling the matchers
+def get_summary():
+    adapter = get_adapter()
+    names = list(adapter.get_matcher_names())
+    headers = dict()
+    for name in names:
+        headers[name] = adapter.get_header(name)
+    return {'names': names, 'headers': headers}
+
+
+# Interface through which the core accesses the model database. Models, parts, surfaces and sets are identified by
+# their names, nodes by their labels, and node data is exchanged as NumPy arrays. The sets which are created are
+# assembly sets on the instance of the part. Implementations: AbaqusAdapter (in the kernel module) for Abaqus CAE,
+# and MemoryAdapter (in the memory module), an in-memory stand-in for the model database.
+#
+# The contract of the abstract methods, which every implementation must provide:
+# - Names are strings and the names of models, parts, surfaces and sets are listed in the order of the model database,
+#   the core refers to them by their index in these lists (see get_model_name and the like). Accessing a model, part,
+#   surface or set which does not exist raises KeyError.
+# - Label arrays are one-dimensional int arrays and coordinate arrays float arrays with one row (x, y, z) per node, in
+#   the same order. The returned arrays are owned by the caller, which may modify them.
+# - The core deletes the sets, equations, coordinate systems and reference points of a matcher before it creates them
+#   again. Deleting returns or ignores what does not exist, so that a partially applied matcher can always be cleared.
+# - Each request to the model database is counted with count_calls, batched requests count as few calls, so that the
+#   call counts of the profile (see PhaseProfile) compare the implementations.
+# - The repository stores the matchers by name, along with their header (see NodeMatcher.get_header), which can be
+#   fetched without loading the matcher. A matcher fetched with get_matcher may be a copy, modifications are only kept
+#   once it is stored again with store_matcher.
+class ModelAdapter(abc.ABCMeta('AbstractAdapter', (object,), {})):
+    # Constructor
+    def __init__(self):
+        self.depth = 0
+        self.calls = 0
+        self.progress = dict()
+
+    # Called when an operation on the model database starts, operations can be nested
+    def begin_operation(self):
+        self.depth += 1
+
+    # Called when an operation on the model database has finished
+    def end_operation(self):
+        self.depth -= 1
+
+    # Checks if an operation on the model database is running
+    def is_operation_running(self):
+        return self.depth > 0
+
+    # Counts calls which are issued to the model database, implementations call this for each request they make
+    def count_calls(self, number=1):
+        self.calls += number
+
+    # Gets the number of calls which have been issued to the model database
+    def get_call_count(self):
+        return self.calls
+
+    # Publishes the progress of a job (a dict, see MatcherJob.get_progress), so that it can be polled
+    def publish_progress(self, name, progress):
+        self.progress[name] = progress
+
+    # Publishes the summary of the matchers (see get_summary) after the repository has been modified, so that it can be
+    # fetched at once (nothing to publish by default, get_summary can be called directly)
+    def publish_summary(self):
+        pass
+
+    # Gets the last published progress of a job, None if no progress has been published
+    def get_progress(self, name):
+        return self.progress.get(name)
+
+    # Getter for the names of the models
+    @abc.abstractmethod
+    def get_model_names(self):
+        raise NotImplementedError()
+
+    # Getter for the names of the parts of a model
+    @abc.abstractmethod
+    def get_part_names(self, model):
+        raise NotImplementedError()
+
+    # Getter for the names of the surfaces of a part
+    @abc.abstractmethod
+    def get_surface_names(self, model, part):
+        raise NotImplementedError()
+
+    # Getter for the names of the sets of a part
+    @abc.abstractmethod
+    def get_set_names(self, model, part):
+        raise NotImplementedError()
+
+    # Gets the number of nodes of a surface
+    @abc.abstractmethod
+    def get_surface_node_count(self, model, part, surface):
+        raise NotImplementedError()
+
+    # Gets the labels (int array) and coordinates (float array, one row per node) of the nodes of a surface
+    @abc.abstractmethod
+    def get_surface_nodes(self, model, part, surface):
+        raise NotImplementedError()
+
+    # Gets the labels of the nodes of a set as an int array
+    @abc.abstractmethod
+    def get_set_labels(self, model, part, set_name):
+        raise NotImplementedError()
+
+    # Getter for the name of the instance of a part in the assembly
+    def get_instance_name(self, model, part):
+        return part + '-1'
+
+    # Creates a set with the nodes with the given labels
+    @abc.abstractmethod
+    def create_set(self, model, part, name, labels):
+        raise NotImplementedError()
+
+    # Creates a set for each of the given names, containing the single node with the corresponding label
+    @abc.abstractmethod
+    def create_node_sets(self, model, part, names, labels):
+        raise NotImplementedError()
+
+    # Deletes the sets with the given names which exist, returns the names of the deleted sets
+    @abc.abstractmethod
+    def delete_sets(self, model, names):
+        raise NotImplementedError()
+
+    # Creates an equation constraint, the terms are (coefficient, set name, dof[, datum id]) tuples
+    @abc.abstractmethod
+    def create_equation(self, model, name, terms):
+        raise NotImplementedError()
+
+    # Deletes the equation constraints with the given names which exist, returns the names of the deleted constraints
+    @abc.abstractmethod
+    def delete_equations(self, model, names):
+        raise NotImplementedError()
+
+    # Creates a cylindrical coordinate system with the given axis (index) as axial direction, returns its id
+    @abc.abstractmethod
+    def create_cylindrical_datum(self, model, name, normal):
+        raise NotImplementedError()
+
+    # Gets the id of a coordinate system, -1 if it does not exist
+    @abc.abstractmethod
+    def get_datum_id(self, model, name):
+        raise NotImplementedError()
+
+    # Deletes a coordinate system (ignored if it does not exist)
+    @abc.abstractmethod
+    def delete_datum(self, model, name):
+        raise NotImplementedError()
+
+    # Creates a reference point at the given coordinates, with an assembly set of the same name which contains it
+    @abc.abstractmethod
+    def create_reference_point(self, model, name, point):
+        raise NotImplementedError()
+
+    # Deletes a reference point and its set (ignored if they do not exist)
+    @abc.abstractmethod
+    def delete_reference_point(self, model, name):
+        raise NotImplementedError()
+
+    # Inserts a keyword line at the end of the assembly definition of a model
+    @abc.abstractmethod
+    def insert_keyword(self, model, keyword):
+        raise NotImplementedError()
+
+    # Removes a keyword line from the input file of a model
+    @abc.abstractmethod
+    def remove_keyword(self, model, keyword):
+        raise NotImplementedError()
+
+    # Checks if a matcher with the given name exists in the repository
+    @abc.abstractmethod
+    def has_matcher(self, name):
+        raise NotImplementedError()
+
+    # Getter for the names of the matchers in the repository
+    @abc.abstractmethod
+    def get_matcher_names(self):
+        raise NotImplementedError()
+
+    # Fetches a matcher from the repository
+    @abc.abstractmethod
+    def get_matcher(self, name):
+        raise NotImplementedError()
+
+    # Fetches the header of a matcher from the repository (see NodeMatcher.get_header)
+    @abc.abstractmethod
+    def get_header(self, name):
+        raise NotImplementedError()
+
+    # Stores a new or modified matcher in the repository
+    @abc.abstractmethod
+    def store_matcher(self, name, matcher):
+        raise NotImplementedError()
+
+    # Deletes a matcher from the repository
+    @abc.abstractmethod
+    def delete_matcher(self, name):
+        raise NotImplementedError()
+
+
+# Decorator for NodeMatcher methods which perform an operation on the model database, the adapter is notified when
+# the operation starts and finishes (the Abaqus adapter caches the objects it resolves while an operation runs).
+# When the (outermost) operation finishes, the last phase of the profile of the matcher is stopped, and the operation
+# is run through the profilers which are enabled with the PBC_PROFILE environment variable (see run_profilers).
+def mdb_operation(method):
+    @functools.wraps(method)
+    def wrapper(matcher, *args, **kwargs):
+        adapter = get_adapter()
+        if adapter.is_operation_running():
+            return method(matcher, *args, **kwargs)
+        adapter.begin_operation()
+        try:
+            return run_profilers('pbc_' + matcher.get_name() + '_' + method.__name__, method, matcher, *args, **kwargs)
+        finally:
+            matcher.get_profile().stop()
+            adapter.end_operation()
+    return wrapper
+
+
+# Runs a function through the profilers listed (comma separated) in the PBC_PROFILE environment variable:
+#  - cprofile: the cProfile statistics are written to <name>.prof
+#  - tracemalloc: the peak traced memory and the lines which allocated the most memory are written to
+#    <name>.tracemalloc.txt (only available in Python 3)
+# The files are written to the directory in the PBC_PROFILE_DIR environment variable (the working directory if unset)
+def run_profilers(name, function, *args, **kwargs):
+    profilers = [tool.strip().lower() for tool in os.environ.get('PBC_PROFILE', '').split(',') if tool.strip()]
+    if len(profilers) == 0:
+        return function(*args, **kwargs)
+    path = os.path.join(os.environ.get('PBC_PROFILE_DIR', os.getcwd()), name)
+    profiler = None
+    tracer = None
+    if 'cprofile' in profilers:
+        import cProfile
+        profiler = cProfile.Profile()
+    if 'tracemalloc' in profilers:
+        try:
+            import tracemalloc
+            tracer = tracemalloc
+        except ImportError:
+            tracer = None
+    if tracer is not None:
+        tracer.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(path + '.prof')
+        if tracer is not None:
+            snapshot = tracer.take_snapshot()
+            current, peak = tracer.get_traced_memory()
+            tracer.stop()
+            stream = open(path + '.tracemalloc.txt', 'w')
+            try:
+                stream.write('Peak traced memory: ' + str(peak) + ' bytes\n')
+                for stat in snapshot.statistics('lineno')[:25]:
+                    stream.write(str(stat) + '\n')
+            finally:
+                stream.close()
+
+
+# Gets the peak memory usage (resident set size) of the process in bytes, returns 0 if it can not be determined
+def get_peak_memory():
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows, ask the operating system instead
+        return get_peak_memory_windows()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # The peak is reported in bytes on macOS, and in kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# Gets the peak memory usage (working set) of the process in bytes on Windows, returns 0 if it can not be determined
+def get_peak_memory_windows():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    except (ImportError, AttributeError, OSError):
+        pass
+    return 0
+
+
+# An index of the nodes of the surfaces of the parts, each surface is extracted from the model database when its nodes
+# are first needed, after which the arrays are shared by all matchers which use the surface (for instance the faces
+# of an RVE, which are also the exempted surfaces of other directions). The arrays must not be modified.
+class SurfaceIndex:
+    # Constructor
+    def __init__(self):
+        self.nodes = dict()
+
+    # Gets the labels and coordinates of the nodes of a surface as arrays (see ModelAdapter.get_surface_nodes)
+    def get_surface_nodes(self, model, part, surface):
+        key = (model, part, surface)
+        if key not in self.nodes:
+            self.nodes[key] = get_adapter().get_surface_nodes(model, part, surface)
+        return self.nodes[key]
+
+
+# A helper class to match the master and slave nodes, and apply the constraint for periodic boundary conditions
+class NodeMatcher:
+    # Default values for fields which have been added in later versions (used for matchers unpickled from older mdbs)
+    tolerance = 0.0
+    search_index = 0
+    output_index = 0
+    formulation_index = 0
+    ordering_index = 0
+    exempt_surfaces = ()
+    metrics = None
+    profile = None
+    fingerprint = None
+    kept = -1
+    cached = False
+    greedy = None
+    include_file = None
+    applied = None
+    outdated = False
+
+    def __init__(self, name, model, part, master, slave, ex_m, ex_s, plane, mode, tol=0.0, search=0, output=0,
+                 formulation=0, ordering=0, exempt_surfaces=()):
+        # Set fields
+        self.name = name
+        self.modelName = model
+        self.partName = part
+        self.masterName = master
+        self.slaveName = slave
+        self.masterExemptName = ex_m
+        self.slaveExemptName = ex_s
+        self.plane_index = plane
+        self.mode_index = mode
+        self.tolerance = max(0.0, tol)
+        self.search_index = search
+        self.output_index = output
+        self.formulation_index = formulation
+        self.ordering_index = ordering
+        # Names of the surfaces of which the nodes are exempted from both the master and slave surfaces
+        self.exempt_surfaces = tuple(exempt_surfaces)
+        # Define status flags
+        self.valid = False
+        self.matched = False
+        self.paired = False
+        # Flag which tracks if the pairs have changed since the constraints were applied, and the pair table for which
+        # the constraints were applied
+        self.outdated = False
+        self.applied = None
+        # Initialize pair sets
+        self.pairs = PairTable(name, plane)
+        # Initialize statistics
+        self.number = 0
+        self.exempts = 0
+        self.exact = 0
+        self.prox = 0
+        self.mn = 0
+        self.mx = 0
+        self.tot = 0
+        # Fingerprint of the matched nodes, and the number of pairs which were kept by the last re-matching
+        # (-1 if the nodes have not been re-matched)
+        self.fingerprint = None
+        self.kept = -1
+        # Flag which tracks if the matches were loaded from the cache (see load_cached_matches)
+        self.cached = False
+        # Total and maximum distance of the greedy proximity matches, to compare with the assignment search
+        self.greedy = None
+        # Absolute path of the include file, once it has been written
+        self.include_file = None
+        # Locality of the chained equations before and after ordering the pairs (see order_pairs)
+        self.metrics = None
+        # Initialize the profile of the operations
+        self.profile = PhaseProfile()
+        # Validate
+        self.check_validity()
+
+    # Restores the state when unpickling, matchers from older versions store their pairs as a list of NodePair
+    # objects, which are converted to a pair table
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if isinstance(self.pairs, list):
+            self.pairs = PairTable.from_pairs(self.get_name(), self.get_plane_index(), self.pairs)
+
+    # getter for the name of the periodic boundary condition
+    def get_name(self):
+        return self.name
+
+    # getter for the name of the model
+    def get_model_name(self):
+        return self.modelName
+
+    # getter for the name of the part
+    def get_part_name(self):
+        return self.partName
+
+    # getter for the name of the master surface
+    def get_master_name(self):
+        return self.masterName
+
+    # getter for the name of the slave surface
+    def get_slave_name(self):
+        return self.slaveName
+
+    # Getter for the match plane index
+    def get_plane_index(self):
+        return self.plane_index
+
+    # Getter for the mode index
+    def get_mode_index(self):
+        return self.mode_index
+
+    # Getter for the tolerance used to quantize the coordinates for the exact matches (0 means bit-identical)
+    def get_tolerance(self):
+        return self.tolerance
+
+    # Getter for the index of the search method for proximity matches (0: grid, 1: linear, 2: assignment)
+    def get_search_index(self):
+        return self.search_index
+
+    # Getter for the index of the output mode for the constraints (0: sets and equations in the mdb, 1: include file)
+    def get_output_index(self):
+        return self.output_index
+
+    # Getter for the index of the formulation of the translational constraints (0: each pair is chained to the next
+    # pair, 1: each pair is tied to a reference point)
+    def get_formulation_index(self):
+        return self.formulation_index
+
+    # Getter for the index of the ordering of the pairs (0: order of the matching, 1: along a Morton curve, 2: along a
+    # Hilbert curve)
+    def get_ordering_index(self):
+        return self.ordering_index
+
+    # Getter for the names of the surfaces of which the nodes are exempted from the master and slave surfaces (the
+    # exemptions of an RVE, see create_rve)
+    def get_exempt_surface_names(self):
+        return self.exempt_surfaces
+
+    # Getter for the locality metrics (see get_chain_metrics) of the pairs before and after ordering them, as a
+    # (before, after) tuple, None if the pairs have not been ordered
+    def get_ordering_metrics(self):
+        return self.metrics
+
+    # Getter for the name of the reference point (and its set) of the reference point formulation
+    def get_reference_point_name(self):
+        return 'RP_PBC_' + self.get_name()
+
+    # Calculates the location of the reference point: the centroid of the master nodes of the pairs
+    def get_reference_point(self):
+        coords = self.pairs.get_master_coordinates()
+        if len(coords) == 0:
+            return 0.0, 0.0, 0.0
+        return tuple(coords.mean(axis=0).tolist())
+
+    # Creates the reference point of the reference point formulation
+    def create_reference_point(self):
+        if self.get_formulation_index() == 1:
+            self.get_adapter().create_reference_point(self.get_model_name(), self.get_reference_point_name(),
+                                                      self.get_reference_point())
+
+    # Fetches the match plane
+    def get_plane(self):
+        return PLANES[self.get_plane_index()]
+
+    # Fetches the adapter through which the model database is accessed
+    def get_adapter(self):
+        return get_adapter()
+
+    # Getter for the profile with the timings, model database calls and peak memory of the phases of the operations
+    def get_profile(self):
+        if self.profile is None:
+            # Matchers from older versions have not been profiled
+            self.profile = PhaseProfile()
+        return self.profile
+
+    # Fetches the name of the part instance in the assembly
+    def get_instance_name(self):
+        return self.get_adapter().get_instance_name(self.get_model_name(), self.get_part_name())
+
+    # Getter for the flag which tracks if the match configuration is valid
+    def is_valid(self):
+        return self.valid
+
+    # Getter for the flag which tracks if the node pairs have been matched
+    def is_matched(self):
+        return self.matched
+
+    # Getter for the flag which tracks if the node pairs have been paired
+    def is_paired(self):
+        return self.paired
+
+    # Getter for the flag which tracks if the pairs have changed since the constraints were applied
+    def is_outdated(self):
+        return self.outdated
+
+    # Getter for the pair table for which the constraints in the model were applied (the current pair table for
+    # matchers paired by older versions, or if no constraints were applied)
+    def get_applied_pairs(self):
+        if self.applied is None:
+            return self.pairs
+        return self.applied
+
+    # Returns the labels and coordinates of all the nodes to consider for the master surface as arrays, from the given
+    # surface index if there is one (see SurfaceIndex)
+    def get_master_node_arrays(self, index=None):
+        if index is None:
+            index = SurfaceIndex()
+        return index.get_surface_nodes(self.get_model_name(), self.get_part_name(), self.get_master_name())
+
+    # Returns the labels and coordinates of all the nodes to consider for the slave surface as arrays, from the given
+    # surface index if there is one (see SurfaceIndex)
+    def get_slave_node_arrays(self, index=None):
+        if index is None:
+            index = SurfaceIndex()
+        return index.get_surface_nodes(self.get_model_name(), self.get_part_name(), self.get_slave_name())
+
+    # Returns the labels of all the exempted master nodes as an array
+    def get_master_exempt_labels(self):
+        if self.masterExemptName == '':
+            return numpy.array([], dtype=int)
+        return self.get_adapter().get_set_labels(self.get_model_name(), self.get_part_name(), self.masterExemptName)
+
+    # Returns the labels of all the exempted slave nodes as an array
+    def get_slave_exempt_labels(self):
+        if self.slaveExemptName == '':
+            return numpy.array([], dtype=int)
+        return self.get_adapter().get_set_labels(self.get_model_name(), self.get_part_name(), self.slaveExemptName)
+
+    # Returns the labels of the nodes of the exempted surfaces as an array, from the given surface index
+    def get_surface_exempt_labels(self, index):
+        labels = [index.get_surface_nodes(self.get_model_name(), self.get_part_name(), surface)[0]
+                  for surface in self.get_exempt_surface_names()]
+        return numpy.concatenate(labels + [numpy.array([], dtype=int)])
+
+    # Checks if the matching setup is valid before execution
+    # (meaning the master and slaves contain an equal number of nodes)
+    @mdb_operation
+    def check_validity(self):
+        adapter = self.get_adapter()
+        n_m = adapter.get_surface_node_count(self.get_model_name(), self.get_part_name(), self.get_master_name())
+        n_s = adapter.get_surface_node_count(self.get_model_name(), self.get_part_name(), self.get_slave_name())
+        self.valid = n_m == n_s
+        # Keep track of total number of nodes
+        if self.is_valid():
+            self.number = n_m
+
+    # Uniquely matches each of the master nodes to a slave node
+    @mdb_operation
+    def match_nodes(self):
+        for progress in self.iterate_match_nodes():
+            pass
+
+    # Runs a chunked operation (see iterate_match_nodes and iterate_apply_constraints) until it is finished or the
+    # time budget (in seconds) has been used, returns a flag which is True if the operation has finished, and the
+    # last progress tuple (None if no progress has been made)
+    @mdb_operation
+    def run_steps(self, steps, budget):
+        self.get_profile().resume()
+        end = timeit.default_timer() + budget
+        progress = None
+        for progress in steps:
+            if timeit.default_timer() >= end:
+                # Keep track of the interrupted phase, it is resumed in the next run
+                self.get_profile().stop(True)
+                return False, progress
+        return True, progress
+
+    # Matches the nodes in steps, this is a generator which yields (phase, done, total) progress tuples, in which done
+    # and total are numbers of nodes. The matcher is only updated in the last step, so that the matching can be
+    # abandoned between any two steps without side effects. This includes the profile: the phases are measured in a
+    # separate profile, which is paused between the steps, and added to the profile of the matcher in the last step.
+    def iterate_match_nodes(self):
+        if self.is_valid() and (not self.is_matched()):
+            profile = PhaseProfile()
+            # fetch the labels and coordinates of the nodes
+            profile.start('extraction')
+            nodes = self.extract_nodes()
+            # Reuse the matches of an identical mesh from the cache
+            matches = self.read_cached_matches(nodes, profile)
+            if matches is not None:
+                profile.stop()
+                self.get_profile().add_profile(profile)
+                self.commit_cached_matches(nodes, matches)
+                return
+            labels_m, coords_m, labels_s, coords_s, exempt_m, exempt_s = nodes
+            # project the coordinates on the match plane
+            profile.start('exact pass')
+            plane_m = self.get_plane().get_in_plane_coordinates(coords_m)
+            plane_s = self.get_plane().get_in_plane_coordinates(coords_s)
+            # First match all nodes whose coordinates match exactly
+            matches = match_coordinates(plane_m, plane_s, self.get_tolerance())
+            exact_m, exact_s, prox_m, candidates = split_matches(matches, exempt_m, exempt_s)
+            profile.stop(True)
+            yield 'exact pass', len(exact_m), len(labels_m)
+            profile.resume()
+            # Second, match the remaining nodes which are not exempted with the closest node
+            profile.start('proximity pass')
+            prox_s = -numpy.ones(len(prox_m), dtype=int)
+            greedy_s = -numpy.ones(len(prox_m), dtype=int) if self.get_search_index() == 2 else None
+            for done in iterate_match_closest(plane_m[prox_m], plane_s, candidates, self.get_search_index(), prox_s,
+                                              greedy_s):
+                profile.stop(True)
+                yield 'proximity pass', len(exact_m) + done, len(labels_m)
+                profile.resume()
+            profile.stop()
+            self.get_profile().add_profile(profile)
+            self.commit_matches(nodes, exact_m, exact_s, prox_m, prox_s, greedy_s=greedy_s)
+            self.store_cached_matches(nodes, exact_m, exact_s, prox_m, prox_s, greedy_s)
+
+    # Matches the nodes again after the mesh has been modified. The nodes are compared with the nodes of the pairs:
+    # pairs of which both nodes still exist with the same coordinates, and have not been exempted, are kept as they are
+    # (with the same names), only the nodes which have been added or moved, or whose partner has, are matched again.
+    # If any node has changed, the constraints of a paired matcher become outdated, they are brought up to date with
+    # update_constraints.
+    @mdb_operation
+    def rematch_nodes(self):
+        if not self.is_matched():
+            self.match_nodes()
+            return
+        self.check_validity()
+        if not self.is_valid():
+            return
+        self.get_profile().start('extraction')
+        nodes = self.extract_nodes()
+        if get_fingerprint(nodes) == self.fingerprint:
+            # The mesh has not changed
+            self.kept = len(self.pairs)
+            return
+        labels_m, coords_m, labels_s, coords_s, exempt_m, exempt_s = nodes
+        if self.is_paired():
+            # The constraints of the current pairs remain in the model until they are updated
+            self.applied = self.get_applied_pairs()
+            self.outdated = True
+        # Find the pairs which have not changed
+        self.get_profile().start('comparison')
+        pairs = self.pairs
+        pos_m = find_labels(labels_m, pairs.get_master_labels())
+        pos_s = find_labels(labels_s, pairs.get_slave_labels())
+        kept = numpy.nonzero((pos_m >= 0) & (pos_s >= 0))[0]
+        kept = kept[~(exempt_m[pos_m[kept]] | exempt_s[pos_s[kept]])]
+        kept = kept[numpy.all(coords_m[pos_m[kept]] == pairs.get_master_coordinates()[kept], axis=1) &
+                    numpy.all(coords_s[pos_s[kept]] == pairs.get_slave_coordinates()[kept], axis=1)]
+        proximity = self.get_proximity_flags()
+        kept_exact = kept[~proximity[kept]]
+        kept_prox = kept[proximity[kept]]
+        # Match the other nodes, first exactly and then by proximity
+        self.get_profile().start('exact pass')
+        free_m = numpy.ones(len(labels_m), dtype=bool)
+        free_m[pos_m[kept]] = False
+        free_m = numpy.nonzero(free_m)[0]
+        free_s = numpy.ones(len(labels_s), dtype=bool)
+        free_s[pos_s[kept]] = False
+        free_s = numpy.nonzero(free_s)[0]
+        plane_m = self.get_plane().get_in_plane_coordinates(coords_m[free_m])
+        plane_s = self.get_plane().get_in_plane_coordinates(coords_s[free_s])
+        matches = match_coordinates(plane_m, plane_s, self.get_tolerance())
+        exact_m, exact_s, prox_m, candidates = split_matches(matches, exempt_m[free_m], exempt_s[free_s])
+        self.get_profile().start('proximity pass')
+        prox_s = match_closest(plane_m[prox_m], plane_s, candidates, self.get_search_index())
+        prox_m = prox_m[prox_s >= 0]
+        prox_s = prox_s[prox_s >= 0]
+        # The kept pairs keep their ids, the new pairs get new ids
+        ids = pairs.get_ids()
+        new_ids = numpy.arange(pairs.get_next_id(), pairs.get_next_id() + len(exact_m) + len(prox_m))
+        ids = numpy.concatenate((ids[kept_exact], new_ids[:len(exact_m)], ids[kept_prox], new_ids[len(exact_m):]))
+        # Remove the previous sets for the proximity matched nodes, and update the matcher
+        set_name = 'pbc_' + self.get_name() + '_proximity_'
+        self.get_adapter().delete_sets(self.get_model_name(), [set_name + 'masters', set_name + 'slaves'])
+        self.commit_matches(nodes, numpy.concatenate((pos_m[kept_exact], free_m[exact_m])),
+                            numpy.concatenate((pos_s[kept_exact], free_s[exact_s])),
+                            numpy.concatenate((pos_m[kept_prox], free_m[prox_m])),
+                            numpy.concatenate((pos_s[kept_prox], free_s[prox_s])), ids, pairs.get_next_id())
+        self.kept = len(kept)
+
+    # Extracts the nodes to match for match_nodes_parallel (see extract_nodes), returns None if the matches were found
+    # in the cache instead, the matcher is then updated with these
+    @mdb_operation
+    def prepare_matching(self, index=None):
+        self.get_profile().start('extraction')
+        nodes = self.extract_nodes(index)
+        if self.load_cached_matches(nodes):
+            return None
+        return nodes
+
+    # Updates the matcher with the matches found by match_nodes_parallel (see commit_matches), the run times of the
+    # passes (in seconds, summed over the tasks) are added to the profile
+    @mdb_operation
+    def finish_matching(self, nodes, exact_m, exact_s, prox_m, prox_s, timings, greedy_s=None):
+        for phase in ['exact pass', 'proximity pass']:
+            self.get_profile().add(phase, timings[phase])
+        self.commit_matches(nodes, exact_m, exact_s, prox_m, prox_s, greedy_s=greedy_s)
+        self.store_cached_matches(nodes, exact_m, exact_s, prox_m, prox_s, greedy_s)
+
+    # Extracts the labels and coordinates of the master and slave nodes to match, and flags the exempted nodes, returns
+    # a (master labels, master coordinates, slave labels, slave coordinates, master exempt flags, slave exempt flags)
+    # tuple of arrays. The exempted nodes are not removed: they are matched exactly like the other nodes, so that their
+    # partners are not matched to another node by proximity, and the pairs with an exempted node are then dropped (see
+    # split_matches). The nodes of the surfaces are taken from the given surface index, which is shared by matchers
+    # that use the same surfaces.
+    def extract_nodes(self, index=None):
+        if index is None:
+            index = SurfaceIndex()
+        labels_m, coords_m = self.get_master_node_arrays(index)
+        labels_s, coords_s = self.get_slave_node_arrays(index)
+        # flag the exempted nodes
+        exempt = self.get_surface_exempt_labels(index)
+        exempt_m = numpy.in1d(labels_m, self.get_master_exempt_labels()) | numpy.in1d(labels_m, exempt)
+        exempt_s = numpy.in1d(labels_s, self.get_slave_exempt_labels()) | numpy.in1d(labels_s, exempt)
+        return labels_m, coords_m, labels_s, coords_s, exempt_m, exempt_s
+
+    # Updates the matcher with the matches for the extracted nodes (see extract_nodes): the indices of the exactly
+    # matched masters and slaves, and of the masters which were matched by proximity and their slaves (-1 if
+    # unmatched). Also creates the sets for the proximity matched nodes. The ids of the pairs (see PairTable) can be
+    # given for the matched pairs, in the same order, they are numbered from 0 otherwise. For the assignment search,
+    # the slaves of the greedy matches of the same masters can be given, to compare the distances of both.
+    def commit_matches(self, nodes, exact_m, exact_s, prox_m, prox_s, ids=None, next_id=0, greedy_s=None):
+        labels_m, coords_m, labels_s, coords_s = nodes[:4]
+        self.fingerprint = get_fingerprint(nodes)
+        self.cached = False
+        self.greedy = None
+        if greedy_s is not None:
+            found = greedy_s >= 0
+            plane = self.get_plane()
+            dist = numpy.sqrt(plane.dist_sq_arrays(plane.get_in_plane_coordinates(coords_m[prox_m[found]]),
+                                                   plane.get_in_plane_coordinates(coords_s[greedy_s[found]])))
+            self.greedy = {'total': float(dist.sum()), 'max': float(dist.max()) if len(dist) > 0 else 0.0}
+        # Masters can remain unmatched if more slaves than masters are exempted
+        prox_m = prox_m[prox_s >= 0]
+        prox_s = prox_s[prox_s >= 0]
+        # Update the counters, all nodes which have not been paired are exempted
+        self.exact = len(exact_m)
+        self.prox = len(prox_m)
+        self.exempts = self.number - self.exact - self.prox
+        # Update statistics
+        plane_m = self.get_plane().get_in_plane_coordinates(coords_m)
+        plane_s = self.get_plane().get_in_plane_coordinates(coords_s)
+        dist = numpy.sqrt(self.get_plane().dist_sq_arrays(plane_m[prox_m], plane_s[prox_s]))
+        self.mn = 0
+        self.mx = 0
+        self.tot = 0
+        if len(dist) > 0:
+            self.mn = float(dist.min())
+            self.mx = float(dist.max())
+            self.tot = float(dist.sum())
+        # Create the node pairs, first the exact matches and then the proximity matches
+        pairs_m = numpy.concatenate((exact_m, prox_m))
+        pairs_s = numpy.concatenate((exact_s, prox_s))
+        proximity = numpy.arange(len(pairs_m)) >= len(exact_m)
+        self.pairs = PairTable(self.get_name(), self.get_plane_index(), labels_m[pairs_m], labels_s[pairs_s],
+                               coords_m[pairs_m], coords_s[pairs_s], ids=ids, next_id=next_id, proximity=proximity)
+        # Sort the pairs along a space filling curve
+        if self.get_ordering_index() > 0:
+            self.get_profile().start('ordering')
+            self.order_pairs()
+        # Update the matched status
+        self.matched = True
+        # Create the sets for the proximity matched nodes
+        if self.prox > 0:
+            self.get_profile().start('proximity sets')
+            set_name = 'pbc_' + self.get_name() + '_proximity_'
+            self.get_adapter().create_set(self.get_model_name(), self.get_part_name(), set_name + 'masters',
+                                          labels_m[prox_m])
+            self.get_adapter().create_set(self.get_model_name(), self.get_part_name(), set_name + 'slaves',
+                                          labels_s[prox_s])
+
+    # Gets the key of the matches of the extracted nodes in the cache: a digest of the nodes (see get_fingerprint) and
+    # of the options which determine the matches (the grid and linear searches give the same matches)
+    def get_cache_key(self, nodes):
+        key = '%d|%s|%d|%d|%r' % (CACHE_VERSION, get_fingerprint(nodes), self.get_plane_index(), self.get_mode_index(),
+                                  float(self.get_tolerance()))
+        if self.get_search_index() == 2:
+            key = key + '|assignment'
+        digest = hashlib.sha1()
+        digest.update(key.encode('ascii'))
+        return digest.hexdigest()
+
+    # Updates the matcher with the matches of the extracted nodes from the cache (see read_cached_matches), returns
+    # False if the cache is disabled or does not contain the matches
+    def load_cached_matches(self, nodes):
+        matches = self.read_cached_matches(nodes, self.get_profile())
+        if matches is None:
+            return False
+        self.commit_cached_matches(nodes, matches)
+        return True
+
+    # Reads the matches of the extracted nodes from the cache (see read_cache_file) without updating the matcher, the
+    # time is measured as the cache phase of the given profile. Returns None if the cache is disabled or does not
+    # contain the matches.
+    def read_cached_matches(self, nodes, profile):
+        path = get_cache_path(self.get_cache_key(nodes))
+        if path is None:
+            return None
+        profile.start('cache')
+        return read_cache_file(path)
+
+    # Updates the matcher with the matches of the extracted nodes which have been read from the cache
+    def commit_cached_matches(self, nodes, matches):
+        exact_m, exact_s, prox_m, prox_s, greedy_s = matches
+        self.commit_matches(nodes, exact_m, exact_s, prox_m, prox_s,
+                            greedy_s=greedy_s if self.get_search_index() == 2 else None)
+        self.cached = True
+
+    # Stores the matches of the extracted nodes in the cache (see commit_matches for the arguments), if it is enabled.
+    # The greedy matches of the assignment search are stored as well, so that the comparison is kept for cached matches.
+    def store_cached_matches(self, nodes, exact_m, exact_s, prox_m, prox_s, greedy_s=None):
+        path = get_cache_path(self.get_cache_key(nodes))
+        if path is not None:
+            if greedy_s is None:
+                greedy_s = numpy.array([], dtype=int)
+            write_cache_file(path, (exact_m, exact_s, prox_m, prox_s, greedy_s))
+
+    # Checks if the matches were loaded from the cache
+    def is_cached(self):
+        return self.cached
+
+    # Sorts the pairs along a space filling curve through the master nodes in the match plane, so that consecutive
+    # pairs, which are coupled by the chained equations, are close to each other. The locality of the equations is
+    # measured before and after sorting (see get_chain_metrics).
+    def order_pairs(self):
+        before = get_chain_metrics(self.pairs, self.get_plane())
+        keys = get_curve_keys(self.get_plane().get_in_plane_coordinates(self.pairs.get_master_coordinates()),
+                              self.get_ordering_index())
+        self.pairs = self.pairs.take(numpy.argsort(keys, kind='mergesort'))
+        self.metrics = (before, get_chain_metrics(self.pairs, self.get_plane()))
+
+    # Flags the pairs which were matched by proximity (for tables from older versions, the exact matches are first)
+    def get_proximity_flags(self):
+        flags = self.pairs.get_proximity_flags()
+        if flags is None:
+            return numpy.arange(len(self.pairs)) >= self.get_exact_count()
+        return flags
+
+    # Gets the number of pairs which were kept by the last re-matching (-1 if the nodes have not been re-matched)
+    def get_kept_count(self):
+        return self.kept
+
+    # Gets the total number of node pairs
+    def get_pair_count(self):
+        return self.number
+
+    # Gets the total number of exempted node pairs
+    def get_exempt_count(self):
+        return self.exempts
+
+    # Gets the number of node pairs which were exactly matched
+    def get_exact_count(self):
+        return self.exact
+
+    # Gets the number of node pairs which were matched by proximity
+    def get_proximity_count(self):
+        return self.prox
+
+    # Gets the minimum distance of the node pairs matched by proximity
+    def get_min_proximity(self):
+        return self.mn
+
+    # Gets the maximum distance of the node pairs matched by proximity
+    def get_max_proximity(self):
+        return self.mx
+
+    # Gets the total and maximum distance (as a dict) of the greedy proximity matches which were improved by the
+    # assignment search, None if the assignment search was not used by the last matching
+    def get_greedy_proximity(self):
+        return self.greedy
+
+    # Gets the average distance of the node pairs matched by proximity
+    def get_av_proximity(self):
+        return 0 if self.get_proximity_count() == 0 else self.tot / self.get_proximity_count()
+
+    # Applies the constraint for a periodic boundary condition to all paired nodes
+    @mdb_operation
+    def apply_constraints(self):
+        for progress in self.iterate_apply_constraints():
+            pass
+
+    # Updates the constraints of a paired matcher of which the nodes have been re-matched (see rematch_nodes). The pairs
+    # of the applied pair table are compared with those of the current pair table by id (see compare_pairs), and only
+    # the differences are applied to the model: the sets of removed, added or modified pairs are deleted and created,
+    # and the equations of the pairs which can have changed are generated for both tables, those of which the terms
+    # differ are deleted and created again. As the equations are chained to the next pair, this includes the equations
+    # of the neighbours of changed pairs. The equations of the other pairs are not generated. With include file output,
+    # the include file is written again. The reference point of the reference point formulation is not moved to the
+    # centroid of the new pairs: its location does not enter the equations, while moving it would recreate its set,
+    # and with it every equation of the matcher. Returns the number of deleted and created sets and equations as a dict.
+    @mdb_operation
+    def update_constraints(self):
+        changes = {'deleted sets': 0, 'created sets': 0, 'deleted equations': 0, 'created equations': 0}
+        if not (self.is_paired() and self.is_outdated()):
+            return changes
+        if self.get_output_index() == 1:
+            self.get_profile().start('include file')
+            self.write_include_file()
+        else:
+            adapter = self.get_adapter()
+            # Compare the pairs, and the equations of the pairs which can have changed
+            self.get_profile().start('comparison')
+            deleted_sets, created_sets, changed_old, changed_new = compare_pairs(self.get_applied_pairs(), self.pairs)
+            datum_id = -1
+            if self.get_mode_index() == 1:
+                datum_id = adapter.get_datum_id(self.get_model_name(), 'CSYS_PBC_' + self.get_name())
+            old_equations = list(self.iterate_equations(datum_id, self.get_applied_pairs(), changed_old))
+            new_equations = list(self.iterate_equations(datum_id, self.pairs, changed_new))
+            old_terms = dict(old_equations)
+            new_terms = dict(new_equations)
+            deleted_equations = [name for name, terms in old_equations if new_terms.get(name) != terms]
+            created_equations = [(name, terms) for name, terms in new_equations if old_terms.get(name) != terms]
+            # Delete the equations and then the sets, before creating the new sets and then the new equations
+            self.get_profile().start('deletion')
+            adapter.delete_equations(self.get_model_name(), deleted_equations)
+            adapter.delete_sets(self.get_model_name(), deleted_sets)
+            self.get_profile().start('sets')
+            adapter.create_node_sets(self.get_model_name(), self.get_part_name(),
+                                     [name for name, label in created_sets], [label for name, label in created_sets])
+            self.get_profile().start('equations')
+            for name, terms in created_equations:
+                adapter.create_equation(self.get_model_name(), name, terms)
+            changes = {'deleted sets': len(deleted_sets), 'created sets': len(created_sets),
+                       'deleted equations': len(deleted_equations), 'created equations': len(created_equations)}
+        self.applied = self.pairs
+        self.outdated = False
+        return changes
+
+    # Applies the constraints in steps, this is a generator which yields (phase, done, total) progress tuples, in which
+    # done and total are numbers of sets and equations. If the pairing is abandoned between two steps, the sets and
+    # equations which have been created already are removed with rollback_constraints.
+    def iterate_apply_constraints(self):
+        if self.is_paired() and self.is_outdated():
+            # Update the outdated constraints at once, so that the update can not be interrupted
+            self.update_constraints()
+            return
+        if self.is_matched() and (not self.is_paired()):
+            if self.get_output_index() == 1:
+                # Write the sets and equations to an include file, and include it in the input file of the model
+                self.get_profile().start('include file')
+                self.create_reference_point()
+                self.write_include_file()
+                self.insert_include_keyword()
+            else:
+                # Define the sets for each node pair
+                self.get_profile().start('sets')
+                count = len(self.pairs)
+                total = 2 * count + self.get_equation_count()
+                for start in range(0, count, CHUNK_SIZE):
+                    self.create_pair_sets(start, start + CHUNK_SIZE)
+                    yield 'sets', 2 * min(count, start + CHUNK_SIZE), total
+                # Define the datum ID (-1 means no datum should be used, and the global coordinate system will be used)
+                datum_id = -1
+                # For axial periodic boundary conditions, a cylindrical coordinate system needs to be defined and used
+                if self.get_mode_index() == 1:
+                    # Create a cylindrical coordinate system and store its id
+                    datum_id = self.get_adapter().create_cylindrical_datum(
+                        self.get_model_name(), 'CSYS_PBC_' + self.get_name(), self.get_plane().get_normal_axis_index())
+                # Add the constraints for the displacements
+                self.get_profile().start('equations')
+                self.create_reference_point()
+                done = 2 * count
+                for name, terms in self.iterate_equations(datum_id):
+                    self.get_adapter().create_equation(self.get_model_name(), name, terms)
+                    done += 1
+                    if done % CHUNK_SIZE == 0:
+                        yield 'equations', done, total
+            # Update paired status
+            self.paired = True
+            self.applied = self.pairs
+
+    # Iterates over the equations for the displacements of all node pairs (of the current pair table by default), or
+    # of the pairs at the given indices (in ascending order), yielding (name, terms) tuples one at a time so that they
+    # can be consumed without storing all of them.
+    # The equations for each axis are:
+    #  - translational: (u_i - u'_i) - (u_j - u'_j) = 0 (not for the last pair)
+    #  - translational, with the reference point formulation: (u_i - u'_i) - u_RP = 0
+    #  - radial: (u_i - u'_i) = 0
+    #  - hoop: (u_i - u'_i)/r_i - (u_j - u'_j)/r_j = 0 (not for the last pair)
+    def iterate_equations(self, datum_id, pairs=None, indices=None):
+        # Define the constraint type for each axis, only needs to be done once
+        axes = self.get_equation_axes()
+        if pairs is None:
+            pairs = self.pairs
+        # For axial periodic boundary conditions, calculate the radii of all nodes at once
+        if self.get_mode_index() == 1:
+            radii_m, radii_s = self.get_radii(pairs)
+        # Set name of the reference point, for the reference point formulation
+        reference = self.get_reference_point_name() if self.get_formulation_index() == 1 else None
+        # Iterate over the pairs, the equations are chained with the next pair
+        count = len(pairs)
+        if indices is None:
+            indices = range(0, count)
+        for pair_index in indices:
+            # Do not apply the constraint in case of an exempted node pair
+            if pairs.is_exempted(pair_index):
+                continue
+            # Fetch the set names
+            set_m = pairs.get_master_set_name(pair_index)
+            set_s = pairs.get_slave_set_name(pair_index)
+            next_index = pair_index + 1
+            if next_index < count:
+                next_m = pairs.get_master_set_name(next_index)
+                next_s = pairs.get_slave_set_name(next_index)
+            for axis, constraint, dof in axes:
+                if constraint == CONSTRAINT_RADIAL:
+                    terms = ((1, set_m, dof, datum_id), (-1, set_s, dof, datum_id))
+                elif constraint == CONSTRAINT_TRANSLATIONAL and reference is not None:
+                    if datum_id < 0:
+                        terms = ((1.0, set_m, dof), (-1.0, set_s, dof), (-1.0, reference, dof))
+                    else:
+                        terms = ((1.0, set_m, dof, datum_id), (-1.0, set_s, dof, datum_id),
+                                 (-1.0, reference, dof, datum_id))
+                elif next_index >= count:
+                    # Do not add chained constraints to the last node
+                    continue
+                elif constraint == CONSTRAINT_HOOP:
+                    terms = ((1.0/radii_m[pair_index], set_m, dof, datum_id),
+                             (-1.0/radii_s[pair_index], set_s, dof, datum_id),
+                             (-1.0/radii_m[next_index], next_m, dof, datum_id),
+                             (1.0/radii_s[next_index], next_s, dof, datum_id))
+                elif datum_id < 0:
+                    terms = ((1.0, set_m, dof), (-1.0, set_s, dof), (-1.0, next_m, dof), (1.0, next_s, dof))
+                else:
+                    terms = ((1.0, set_m, dof, datum_id), (-1.0, set_s, dof, datum_id),
+                             (-1.0, next_m, dof, datum_id), (1.0, next_s, dof, datum_id))
+                yield 'eq_' + AXES[axis] + '_' + pairs.get_name(pair_index), terms
+
+    # Defines how each axis of the match plane is constrained, as a list of (axis index, constraint type, dof) tuples
+    # for the first, second and normal axes. In axial mode, the first axis is the radial direction, the second the
+    # hoop direction, and the normal axis is the axial direction, which is constrained as a translation.
+    def get_equation_axes(self):
+        i = self.get_plane().get_first_axis_index()
+        j = self.get_plane().get_second_axis_index()
+        k = self.get_plane().get_normal_axis_index()
+        if self.get_mode_index() == 0:
+            return [(i, CONSTRAINT_TRANSLATIONAL, i + 1), (j, CONSTRAINT_TRANSLATIONAL, j + 1),
+                    (k, CONSTRAINT_TRANSLATIONAL, k + 1)]
+        else:
+            return [(i, CONSTRAINT_RADIAL, i + 1), (j, CONSTRAINT_HOOP, j + 1), (k, CONSTRAINT_TRANSLATIONAL, k + 1)]
+
+    # Calculates the radii of the master and slave nodes of all pairs (of the current pair table by default) in the
+    # match plane (as lists), the slave radius can differ slightly in case the pair is not an exact match
+    def get_radii(self, pairs=None):
+        if pairs is None:
+            pairs = self.pairs
+        i = self.get_plane().get_first_axis_index()
+        j = self.get_plane().get_second_axis_index()
+        coords_m = pairs.get_master_coordinates()
+        coords_s = pairs.get_slave_coordinates()
+        radii_m = numpy.sqrt(coords_m[:, i] * coords_m[:, i] + coords_m[:, j] * coords_m[:, j])
+        radii_s = numpy.sqrt(coords_s[:, i] * coords_s[:, i] + coords_s[:, j] * coords_s[:, j])
+        return radii_m.tolist(), radii_s.tolist()
+
+    # Getter for the path of the include file to which the constraints are written in keyword output mode: the path
+    # at which it was written, so that it is found after the working directory has changed, or a path in the working
+    # directory if it has not been written yet (or was written by an older version)
+    def get_include_file(self):
+        if self.include_file is None:
+            return os.path.abspath('pbc_' + self.get_name() + '.inp')
+        return self.include_file
+
+    # Getter for the keyword line which includes the include file in the input file of the model
+    def get_include_keyword(self):
+        return '*Include, input=' + self.get_include_file()
+
+    # Writes the sets and equations for all node pairs as keywords to the include file
+    def write_include_file(self):
+        self.include_file = self.get_include_file()
+        instance = self.get_instance_name()
+        stream = open(self.get_include_file(), 'w')
+        try:
+            stream.write('** Periodic boundary condition: ' + self.get_name() + '\n')
+            # Write the sets for each node pair
+            pairs = self.pairs
+            labels_m = pairs.get_master_labels().tolist()
+            labels_s = pairs.get_slave_labels().tolist()
+            for pair_index in range(0, len(pairs)):
+                stream.write('*Nset, nset=' + pairs.get_master_set_name(pair_index) + ', instance=' + instance + '\n')
+                stream.write(' ' + str(labels_m[pair_index]) + ',\n')
+                stream.write('*Nset, nset=' + pairs.get_slave_set_name(pair_index) + ', instance=' + instance + '\n')
+                stream.write(' ' + str(labels_s[pair_index]) + ',\n')
+            # Define the datum ID (-1 means the global coordinate system is used)
+            datum_id = -1
+            if self.get_mode_index() == 1:
+                # For axial periodic boundary conditions, the nodes are transformed to a cylindrical coordinate system
+                datum_id = 0
+                set_name = 'pbc_' + self.get_name() + '_nodes'
+                labels = numpy.column_stack((pairs.get_master_labels(), pairs.get_slave_labels())).ravel().tolist()
+                stream.write('*Nset, nset=' + set_name + ', instance=' + instance + '\n')
+                for start in range(0, len(labels), 16):
+                    stream.write(' ' + ', '.join([str(label) for label in labels[start:start + 16]]) + '\n')
+                stream.write('*Transform, nset=' + set_name + ', type=C\n')
+                stream.write(self.get_plane().get_cylindrical_transform() + '\n')
+            # Write the equations, the coordinate system (if any) is defined by the transform
+            for name, terms in self.iterate_equations(datum_id):
+                stream.write('** Constraint: ' + name + '\n')
+                stream.write('*Equation\n')
+                stream.write(str(len(terms)) + '\n')
+                for term in terms:
+                    stream.write(term[1] + ', ' + str(term[2]) + ', ' + repr(float(term[0])) + '\n')
+        finally:
+            stream.close()
+
+    # Inserts the keyword to include the include file at the end of the assembly definition of the model
+    def insert_include_keyword(self):
+        self.get_adapter().insert_keyword(self.get_model_name(), self.get_include_keyword())
+
+    # Removes the keyword to include the include file from the input file of the model
+    def remove_include_keyword(self):
+        self.get_adapter().remove_keyword(self.get_model_name(), self.get_include_keyword())
+
+    # Creates the sets for the master and slave nodes of the node pairs with indices from start to stop (all pairs by
+    # default), the adapter creates them in a single pass
+    def create_pair_sets(self, start=0, stop=None):
+        pairs = self.pairs
+        stop = len(pairs) if stop is None else min(stop, len(pairs))
+        labels = numpy.column_stack((pairs.get_master_labels()[start:stop], pairs.get_slave_labels()[start:stop]))
+        names = list()
+        for pair_index in range(start, stop):
+            names.append(pairs.get_master_set_name(pair_index))
+            names.append(pairs.get_slave_set_name(pair_index))
+        self.get_adapter().create_node_sets(self.get_model_name(), self.get_part_name(), names, labels.ravel())
+
+    # Gets the sets of all node pairs of a pair table as a list of (name, label) tuples (master and slave alternating)
+    def get_pair_sets(self, pairs):
+        labels = numpy.column_stack((pairs.get_master_labels(), pairs.get_slave_labels())).ravel().tolist()
+        return list(zip(self.get_pair_set_names(pairs), labels))
+
+    # Gets the names of the sets of all node pairs (master and slave alternating), of the current pair table by default
+    def get_pair_set_names(self, pairs=None):
+        if pairs is None:
+            pairs = self.pairs
+        names = list()
+        for pair_index in range(0, len(pairs)):
+            names.append(pairs.get_master_set_name(pair_index))
+            names.append(pairs.get_slave_set_name(pair_index))
+        return names
+
+    # Gets the names of the equations of all node pairs which are not exempted, of the current pair table by default
+    def get_equation_names(self, pairs=None):
+        if pairs is None:
+            pairs = self.pairs
+        # Constraints which are not chained with the next pair also apply to the last pair (see iterate_equations)
+        reference = self.get_formulation_index() == 1
+        axes = [(AXES[axis], constraint == CONSTRAINT_RADIAL or (constraint == CONSTRAINT_TRANSLATIONAL and reference))
+                for axis, constraint, dof in self.get_equation_axes()]
+        names = list()
+        count = len(pairs)
+        for pair_index in range(0, count):
+            # There are no equations in case of an exempted node pair
+            if pairs.is_exempted(pair_index):
+                continue
+            for axis, unchained in axes:
+                if unchained or pair_index + 1 < count:
+                    names.append('eq_' + axis + '_' + pairs.get_name(pair_index))
+        return names
+
+    # Gets the number of equations of all node pairs which are not exempted, of the current pair table by default (the
+    # length of get_equation_names, counted without building the names)
+    def get_equation_count(self, pairs=None):
+        if pairs is None:
+            pairs = self.pairs
+        count = len(pairs)
+        if count == 0:
+            return 0
+        reference = self.get_formulation_index() == 1
+        axes = self.get_equation_axes()
+        unchained = len([constraint for axis, constraint, dof in axes
+                         if constraint == CONSTRAINT_RADIAL or (constraint == CONSTRAINT_TRANSLATIONAL and reference)])
+        chained = len(axes) - unchained
+        exempted = numpy.asarray(pairs.get_exempted_flags(), dtype=bool)
+        free = count - int(numpy.count_nonzero(exempted))
+        # Constraints which are chained with the next pair do not apply to the last pair (see iterate_equations)
+        last = 0 if exempted[-1] else 1
+        return unchained * free + chained * (free - last)
+
+    # Removes the constraint for a periodic boundary condition for all paired nodes, returns the report of the deletion
+    # (see clear_constraints), None if the nodes are not paired
+    @mdb_operation
+    def delete_constraints(self):
+        if self.is_paired():
+            self.get_profile().start('deletion')
+            return self.clear_constraints()
+        return None
+
+    # Removes the sets and equations which have been created by an interrupted pairing (see iterate_apply_constraints)
+    @mdb_operation
+    def rollback_constraints(self):
+        if not self.is_paired():
+            self.get_profile().start('deletion')
+            self.clear_constraints()
+
+    # Removes all the sets, equations and coordinate systems, or the include file, which can have been created by the
+    # pairing (those which do not exist are skipped). The names of the sets and equations are determined once, and
+    # only those which exist in the model are deleted, in bulk (see ModelAdapter.delete_sets). Returns a report with
+    # the numbers of deleted sets and equations, and of those which were already missing.
+    def clear_constraints(self):
+        report = {'deleted sets': 0, 'missing sets': 0, 'deleted equations': 0, 'missing equations': 0}
+        if self.get_formulation_index() == 1:
+            # Delete the reference point
+            self.get_adapter().delete_reference_point(self.get_model_name(), self.get_reference_point_name())
+        if self.get_output_index() == 1:
+            # Remove the include keyword and the include file, no sets or equations have been created in the mdb
+            self.remove_include_keyword()
+            try:
+                os.remove(self.get_include_file())
+            except OSError:
+                pass
+            self.include_file = None
+        else:
+            if self.get_mode_index() == 1:
+                # Delete the cylindrical coordinate system
+                self.get_adapter().delete_datum(self.get_model_name(), 'CSYS_PBC_' + self.get_name())
+            # Delete the sets and the equations of the pairs for which they were applied
+            pairs = self.get_applied_pairs()
+            set_names = self.get_pair_set_names(pairs)
+            equation_names = self.get_equation_names(pairs)
+            deleted_sets = self.get_adapter().delete_sets(self.get_model_name(), set_names)
+            deleted_equations = self.get_adapter().delete_equations(self.get_model_name(), equation_names)
+            report = {'deleted sets': len(deleted_sets), 'missing sets': len(set_names) - len(deleted_sets),
+                      'deleted equations': len(deleted_equations),
+                      'missing equations': len(equation_names) - len(deleted_equations)}
+        self.applied = None
+        self.outdated = False
+        return report
+
+    # Gets a summary of the status and statistics of the matcher as a dict of plain values
+    def get_header(self):
+        return {'name': self.get_name(), 'model': self.get_model_name(), 'part': self.get_part_name(),
+                'master': self.get_master_name(), 'slave': self.get_slave_name(), 'plane': self.get_plane_index(),
+                'mode': self.get_mode_index(), 'formulation': self.get_formulation_index(),
+                'ordering': self.get_ordering_index(), 'exempt surfaces': list(self.get_exempt_surface_names()),
+                'metrics': self.get_ordering_metrics(),
+                'valid': self.is_valid(), 'matched': self.is_matched(), 'paired': self.is_paired(),
+                'pairs': self.get_pair_count(), 'exempts': self.get_exempt_count(),
+                'exact': self.get_exact_count(), 'proximity': self.get_proximity_count(),
+                'min': self.get_min_proximity(), 'max': self.get_max_proximity(), 'avg': self.get_av_proximity(),
+                'greedy': self.get_greedy_proximity(),
+                'timings': self.get_profile().get_timings(), 'calls': self.get_profile().get_calls(),
+                'memory': self.get_profile().get_peak_memory(), 'kept': self.get_kept_count(),
+                'outdated': self.is_outdated(), 'cached': self.is_cached(), 'messages': self.get_status_messages()}
+
+    # Gets the status message for the confirmation dialog between the matching and pairing steps
+    def get_status_messages(self):
+        msg = []
+        if self.is_valid():
+            msg.append('Exact matches: ' + str(self.get_exact_count()) + '/' + str(self.get_pair_count()) +
+                       ', Proximity matches: ' + str(self.get_proximity_count()) + '/' + str(self.get_pair_count()) +
+                       ', Exempts: ' + str(self.get_exempt_count()) + '/' + str(self.get_pair_count()))
+            if len(self.get_exempt_surface_names()) > 0:
+                msg.append('Nodes which are shared with ' + ', '.join(self.get_exempt_surface_names()) +
+                           ' were exempted')
+            if self.get_tolerance() > 0:
+                msg.append('Exact matches were found with a tolerance of ' + str(self.get_tolerance()))
+            if self.is_cached():
+                msg.append('The matches of an identical mesh were loaded from the cache')
+            msg.append('From proximity matches: min = ' + str(self.get_min_proximity()) + ', max = ' +
+                       str(self.get_max_proximity()) + ', avg = ' + str(self.get_av_proximity()))
+            if self.get_greedy_proximity() is not None and self.get_proximity_count() > 0:
+                greedy = self.get_greedy_proximity()
+                msg.append('Assignment of the proximity matches: total distance = ' + ('%.6g' % self.tot) +
+                           ' (greedy: ' + ('%.6g' % greedy['total']) + '), max = ' +
+                           ('%.6g' % self.get_max_proximity()) + ' (greedy: ' + ('%.6g' % greedy['max']) + ')')
+            if self.get_ordering_metrics() is not None:
+                before, after = self.get_ordering_metrics()
+                msg.append('Pairs ordered along a ' + CURVES[self.get_ordering_index()] + ' curve: mean distance '
+                           'between consecutive pairs ' + ('%.3g' % before['distance']) + ' -> ' +
+                           ('%.3g' % after['distance']) + ', max ' + ('%.3g' % before['max distance']) + ' -> ' +
+                           ('%.3g' % after['max distance']) + ', adjacent pairs ' +
+                           ('%.1f%%' % (100 * before['adjacent'])) + ' -> ' + ('%.1f%%' % (100 * after['adjacent'])))
+                msg.append('Label bandwidth of the equations ' +
+                           describe_change(before['label bandwidth'], after['label bandwidth']) +
+                           ' (depends on the mesh numbering, which the ordering does not follow)')
+            if self.get_kept_count() >= 0:
+                msg.append('Re-matching kept ' + str(self.get_kept_count()) + ' unchanged node pairs, the other nodes '
+                           'were matched again')
+            if self.is_outdated():
+                msg.append('The node pairs have changed since the constraints were applied: pair the nodes again to '
+                           'update the constraints')
+            if self.get_proximity_count() > 0:
+                msg.append('Sets identifying the proximity matches have been created under the assembly module')
+            msg.extend(self.get_profile().get_messages())
+        else:
+            msg.append('Amount of nodes on the master and slave surfaces are not equal: nodes could not be paired')
+        return msg
+
+
+# A chunked operation of a matcher (matching or pairing) which is processed in steps, see start_match_job,
+# start_pair_job and step_job. The matcher is stored in the repository when the job has finished.
+class MatcherJob:
+    # Constructor, the steps are a generator yielding (phase, done, total) progress tuples
+    def __init__(self, name, matcher, operation, steps, created):
+        self.name = name
+        self.matcher = matcher
+        self.operation = operation
+        self.steps = steps
+        # Flag which tracks if the matcher has been created for this job
+        self.created = created
+        self.status = 'running'
+        self.phase = ''
+        self.done = 0
+        self.total = 0
+
+    # Getter for the name of the matcher
+    def get_name(self):
+        return self.name
+
+    # Getter for the matcher
+    def get_matcher(self):
+        return self.matcher
+
+    # Gets the progress as a dict of plain values: the operation ('match' or 'pair'), the status ('running',
+    # 'finished', 'cancelled' or 'failed'), the current phase, and the amount of work which is done out of the total
+    def get_progress(self):
+        return {'name': self.name, 'operation': self.operation, 'status': self.status, 'phase': self.phase,
+                'done': self.done, 'total': self.total}
+
+    # Processes the next steps until the time budget (in seconds) has been used, returns True if the job has finished
+    def step(self, budget):
+        finished, progress = self.matcher.run_steps(self.steps, budget)
+        if progress is not None:
+            self.phase, self.done, self.total = progress
+        return finished
+
+    # Stores the matcher after the job has finished
+    def finish(self):
+        self.status = 'finished'
+        self.done = self.total
+        get_adapter().store_matcher(self.name, self.matcher)
+
+    # Cancels the job and undoes its partial work: the steps of a matching do not modify the model or the matcher
+    # until the last step, while the sets and equations of a partial pairing need to be removed
+    def cancel(self, status):
+        self.status = status
+        self.steps.close()
+        if self.operation == 'pair':
+            self.matcher.rollback_constraints()
+            get_adapter().store_matcher(self.name, self.matcher)
+        elif self.created:
+            # The matcher has been created for this job, remove it again
+            get_adapter().delete_matcher(self.name)
+
+
+# Keeps track of the wall time and the number of model database calls of each phase of the operations of a matcher,
+# and the peak memory usage. The phases are measured one after another: starting a phase stops the previous one.
+class PhaseProfile:
+    # Default value for profiles from earlier versions
+    notes = ()
+
+    # Constructor
+    def __init__(self):
+        self.timings = dict()
+        self.calls = dict()
+        self.notes = list()
+        self.memory = 0
+        self.phase = None
+        self.interrupted = None
+        self.start_time = 0.0
+        self.start_calls = 0
+
+    # Starts measuring a phase (and stops the current one)
+    def start(self, phase):
+        self.stop()
+        self.interrupted = None
+        self.phase = phase
+        self.start_calls = get_adapter().get_call_count()
+        self.start_time = timeit.default_timer()
+
+    # Stops measuring the current phase, the time and calls are added to those of earlier runs of the same phase.
+    # An interrupted phase can be resumed later on (used for operations which run in steps).
+    def stop(self, interrupt=False):
+        if self.phase is None:
+            return
+        self.interrupted = self.phase if interrupt else None
+        elapsed = timeit.default_timer() - self.start_time
+        self.timings[self.phase] = self.timings.get(self.phase, 0.0) + elapsed
+        self.calls[self.phase] = self.calls.get(self.phase, 0) + get_adapter().get_call_count() - self.start_calls
+        self.memory = max(self.memory, get_peak_memory())
+        self.phase = None
+
+    # Adds the time of a phase which has been measured elsewhere (for instance in another process)
+    def add(self, phase, elapsed):
+        self.timings[phase] = self.timings.get(phase, 0.0) + elapsed
+        self.calls[phase] = self.calls.get(phase, 0)
+
+    # Adds the phases which have been measured by another profile, for instance by the steps of an operation, which
+    # are only added to the profile of the matcher in the last step
+    def add_profile(self, profile):
+        calls = profile.get_calls()
+        for phase, elapsed in profile.get_timings().items():
+            self.timings[phase] = self.timings.get(phase, 0.0) + elapsed
+            self.calls[phase] = self.calls.get(phase, 0) + calls.get(phase, 0)
+        self.memory = max(self.memory, profile.get_peak_memory())
+
+    # Adds a note on how the phases were run (for instance if they could not be run in parallel), which is reported
+    # along with the timings
+    def add_note(self, note):
+        self.notes = list(self.notes) + [note]
+
+    # Resumes measuring the interrupted phase, if any
+    def resume(self):
+        if self.interrupted is not None:
+            self.start(self.interrupted)
+
+    # Gets the wall time of each phase in seconds, as a dict
+    def get_timings(self):
+        return dict(self.timings)
+
+    # Gets the number of model database calls of each phase, as a dict
+    def get_calls(self):
+        return dict(self.calls)
+
+    # Gets the peak memory usage of the process in bytes (0 if unknown)
+    def get_peak_memory(self):
+        return self.memory
+
+    # Gets the messages which report the measured phases, in order of execution, and the notes
+    def get_messages(self):
+        phases = [phase for phase in PHASES if phase in self.timings]
+        if len(phases) == 0:
+            return list(self.notes)
+        msg = ['Timings: ' + ', '.join([phase + ' ' + ('%.3f' % self.timings[phase]) + ' s' for phase in phases]),
+               'Model database calls: ' + str(sum([self.calls[phase] for phase in phases])) +
+               ', peak memory: ' + ('%.1f' % (self.memory / 1048576.0)) + ' MB']
+        return msg + list(self.notes)
+
+
+# A table of node pairs, which stores the labels, coordinates and exemption flags of all pairs in arrays (one row per
+# pair) rather than as separate objects. The names of the pairs are derived from their id when needed,
+# and NodePair objects are only created on demand when the table is indexed or iterated.
+# The ids of the pairs are their indices by default, but are kept when the nodes are re-matched, so that unchanged
+# pairs keep their names (new pairs get new ids, starting from the next id, which is never reused).
+class PairTable:
+    # Default values for fields which have been added in later versions (used for tables unpickled from older mdbs)
+    ids = None
+    next_id = 0
+    proximity = None
+
+    # Constructor
+    def __init__(self, name, plane, labels_m=None, labels_s=None, coords_m=None, coords_s=None, exempted=None,
+                 ids=None, next_id=0, proximity=None):
+        self.name = name
+        self.plane_index = plane
+        self.master_labels = numpy.array([] if labels_m is None else labels_m, dtype=int)
+        self.slave_labels = numpy.array([] if labels_s is None else labels_s, dtype=int)
+        self.master_coordinates = numpy.array([] if coords_m is None else coords_m, dtype=float).reshape((-1, 3))
+        self.slave_coordinates = numpy.array([] if coords_s is None else coords_s, dtype=float).reshape((-1, 3))
+        if exempted is None:
+            self.exempted = numpy.zeros(len(self.master_labels), dtype=bool)
+        else:
+            self.exempted = numpy.array(exempted, dtype=bool)
+        if ids is None:
+            self.ids = numpy.arange(len(self.master_labels))
+        else:
+            self.ids = numpy.array(ids, dtype=int)
+        self.next_id = next_id
+        if len(self.ids) > 0:
+            self.next_id = max(next_id, int(self.ids.max()) + 1)
+        # Flags for the pairs which were matched by proximity (None if unknown)
+        self.proximity = None if proximity is None else numpy.array(proximity, dtype=bool)
+
+    # Creates a pair table with the pairs at the given indices, in the given order
+    def take(self, indices):
+        proximity = self.get_proximity_flags()
+        return PairTable(self.name, self.plane_index, self.master_labels[indices], self.slave_labels[indices],
+                         self.master_coordinates[indices], self.slave_coordinates[indices], self.exempted[indices],
+                         self.get_ids()[indices], self.get_next_id(), None if proximity is None else proximity[indices])
+
+    # Creates a pair table from a list of NodePair objects (used to migrate matchers from older versions)
+    @staticmethod
+    def from_pairs(name, plane, pairs):
+        return PairTable(name, plane,
+                         [pair.get_master_label() for pair in pairs], [pair.get_slave_label() for pair in pairs],
+                         [pair.get_master_coordinates() for pair in pairs],
+                         [pair.get_slave_coordinates() for pair in pairs],
+                         [pair.is_exempted() for pair in pairs], [pair.get_index() for pair in pairs])
+
+    # Gets the number of pairs
+    def __len__(self):
+        return len(self.master_labels)
+
+    # Creates a NodePair object for the pair at the given index
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError('pair index out of range')
+        return NodePair(self.name, int(self.master_labels[index]), int(self.slave_labels[index]),
+                        tuple(self.master_coordinates[index].tolist()), tuple(self.slave_coordinates[index].tolist()),
+                        self.plane_index, bool(self.exempted[index]), int(self.get_ids()[index]))
+
+    # Iterates over all pairs as NodePair objects
+    def __iter__(self):
+        for index in range(0, len(self)):
+            yield self[index]
+
+    # Getter for the ids of all pairs (tables from older versions are numbered by index)
+    def get_ids(self):
+        if self.ids is None:
+            return numpy.arange(len(self))
+        return self.ids
+
+    # Getter for the id which will be given to the next new pair
+    def get_next_id(self):
+        return max(self.next_id, int(self.get_ids().max()) + 1 if len(self) > 0 else 0)
+
+    # Getter for the flags of the pairs which were matched by proximity (None for tables from older versions)
+    def get_proximity_flags(self):
+        return self.proximity
+
+    # Getter for the name of the pair at the given index
+    def get_name(self, index):
+        return 'pbc_' + self.name + '_node_' + str(self.get_ids()[index])
+
+    # Getter for the name of the set for the master node of the pair at the given index
+    def get_master_set_name(self, index):
+        return self.get_name(index) + '_master'
+
+    # Getter for the name of the set for the slave node of the pair at the given index
+    def get_slave_set_name(self, index):
+        return self.get_name(index) + '_slave'
+
+    # Checks if the pair at the given index is exempted from the pbc
+    def is_exempted(self, index):
+        return self.exempted[index]
+
+    # Getter for the flags of all pairs which are exempted from the pbc
+    def get_exempted_flags(self):
+        return self.exempted
+
+    # Getter for the labels of the master nodes of all pairs
+    def get_master_labels(self):
+        return self.master_labels
+
+    # Getter for the labels of the slave nodes of all pairs
+    def get_slave_labels(self):
+        return self.slave_labels
+
+    # Getter for the coordinates of the master nodes of all pairs (one row per pair)
+    def get_master_coordinates(self):
+        return self.master_coordinates
+
+    # Getter for the coordinates of the slave nodes of all pairs (one row per pair)
+    def get_slave_coordinates(self):
+        return self.slave_coordinates
+
+
+# A class which represent two paired nodes: one master and one slave, the index is the id of the pair in the table.
+# A pointer to the matching plane is stored as well
+class NodePair:
+    # Constructor
+    def __init__(self, name, m, s, c_m, c_s, plane, exempted, index):
+        self.name = 'pbc_' + name + '_node_' + str(index)
+        self.master_label = m
+        self.slave_label = s
+        self.master_coordinates = c_m
+        self.slave_coordinates = c_s
+        self.plane_index = plane
+        self.exempted = exempted
+        self.index = index
+
+    # Getter for the name of the pair
+    def get_name(self):
+        return self.name
+
+    # Getter for the master label
+    def get_master_label(self):
+        return self.master_label
+
+    # Getter for the slave label
+    def get_slave_label(self):
+        return self.slave_label
+
+    # Getter for the coordinates of the master node
+    def get_master_coordinates(self):
+        return self.master_coordinates
+
+    # Getter for the coordinates of the slave node
+    def get_slave_coordinates(self):
+        return self.slave_coordinates
+
+    # Checks if this node pair is exempted from the pbc
+    def is_exempted(self):
+        return self.exempted
+
+    # Getter for the index
+    def get_index(self):
+        return self.index
+
+    # Getter for the match plane
+    def get_plane(self):
+        return PLANES[self.plane_index]
+
+    # Creates the name for the set for the master node
+    def get_master_set_name(self):
+        return self.get_name() + '_master'
+
+    # Creates the name for the set for the slave node
+    def get_slave_set_name(self):
+        return self.get_name() + '_slave'
+
+
+# A uniform grid over in-plane coordinates, used to find the closest point to another point without scanning all
+# the points. Points can be removed from the grid once they have been matched.
+# The closest point is found with the same squared distance and tie-breaking (lowest index) as a linear search,
+# so both give identical results.
+class SpatialGrid:
+    # Constructor
+    def __init__(self, x, y):
+        # Store the coordinates as lists, which are faster to index than arrays
+        self.x = list(x)
+        self.y = list(y)
+        self.count = len(self.x)
+        # Define the grid dimensions, aiming for about one point per cell
+        if self.count > 0:
+            self.x0 = min(self.x)
+            self.y0 = min(self.y)
+            span = max(max(self.x) - self.x0, max(self.y) - self.y0)
+        else:
+            self.x0 = 0.0
+            self.y0 = 0.0
+            span = 0.0
+        cells = max(1, int(sqrt(self.count)))
+        self.size = span / cells if span > 0 else 1.0
+        self.nx = int((max(self.x) - self.x0) / self.size) + 1 if self.count > 0 else 1
+        self.ny = int((max(self.y) - self.y0) / self.size) + 1 if self.count > 0 else 1
+        # Populate the cells with the indices of the points (in ascending order)
+        self.cells = dict()
+        for index in range(0, self.count):
+            key = self.get_cell(self.x[index], self.y[index])
+            if key in self.cells:
+                self.cells[key].append(index)
+            else:
+                self.cells[key] = [index]
+
+    # Fetches the cell indices for in-plane coordinates (can lie outside of the grid)
+    def get_cell(self, x, y):
+        return int((x - self.x0) // self.size), int((y - self.y0) // self.size)
+
+    # Removes a point from the grid
+    def remove(self, index):
+        self.cells[self.get_cell(self.x[index], self.y[index])].remove(index)
+        self.count -= 1
+
+    # Finds the index of the closest point in the grid to the given coordinates, returns -1 if the grid is empty
+    def find_closest(self, x, y):
+        if self.count <= 0:
+            return -1
+        cx, cy = self.get_cell(x, y)
+        best = -1
+        dist = -1
+        # Start from the first ring of cells which overlaps with the grid
+        r = max(0, -cx, -cy, cx - self.nx + 1, cy - self.ny + 1)
+        while True:
+            for index in self.get_ring(cx, cy, r):
+                d_i = x - self.x[index]
+                d_j = y - self.y[index]
+                new_dist = d_i * d_i + d_j * d_j
+                if (dist < 0) or (new_dist < dist) or (new_dist == dist and index < best):
+                    best = index
+                    dist = new_dist
+            # Stop if the grid is exhausted
+            if cx - r <= 0 and cy - r <= 0 and cx + r >= self.nx - 1 and cy + r >= self.ny - 1:
+                break
+            # Stop if no point outside of the searched rings can be closer (or equally close) than the closest point
+            if best >= 0:
+                bound = min(x - (self.x0 + (cx - r) * self.size), self.x0 + (cx + r + 1) * self.size - x,
+                            y - (self.y0 + (cy - r) * self.size), self.y0 + (cy + r + 1) * self.size - y)
+                if bound > 0 and bound * bound > dist * (1 + 1e-12):
+                    break
+            r += 1
+        return best
+
+    # Finds the indices of the (at most) k closest points in the grid to the given coordinates, within the given
+    # distance, sorted by distance (removed points are not found)
+    def find_nearest(self, x, y, k, radius):
+        cx, cy = self.get_cell(x, y)
+        found = list()
+        limit = radius * radius
+        # Start from the first ring of cells which overlaps with the grid
+        r = max(0, -cx, -cy, cx - self.nx + 1, cy - self.ny + 1)
+        while True:
+            for index in self.get_ring(cx, cy, r):
+                d_i = x - self.x[index]
+                d_j = y - self.y[index]
+                dist = d_i * d_i + d_j * d_j
+                if dist <= limit:
+                    found.append((dist, index))
+            # Stop if the grid is exhausted
+            if cx - r <= 0 and cy - r <= 0 and cx + r >= self.nx - 1 and cy + r >= self.ny - 1:
+                break
+            # Stop if no point outside of the searched rings can be within the distance, or closer than the k-th point
+            bound = min(x - (self.x0 + (cx - r) * self.size), self.x0 + (cx + r + 1) * self.size - x,
+                        y - (self.y0 + (cy - r) * self.size), self.y0 + (cy + r + 1) * self.size - y)
+            if bound > radius:
+                break
+            if len(found) >= k:
+                found.sort()
+                if bound > 0 and bound * bound > found[k - 1][0]:
+                    break
+            r += 1
+        found.sort()
+        return [index for dist, index in found[:k]]
+
+    # Iterates over the indices of the points in the ring of cells at a distance r from a given cell
+    def get_ring(self, cx, cy, r):
+        for ix in range(max(cx - r, 0), min(cx + r, self.nx - 1) + 1):
+            if ix == cx - r or ix == cx + r:
+                iy_list = range(max(cy - r, 0), min(cy + r, self.ny - 1) + 1)
+            else:
+                iy_list = [iy for iy in (cy - r, cy + r) if 0 <= iy < self.ny]
+            for iy in iy_list:
+                cell = self.cells.get((ix, iy))
+                if cell:
+                    for index in cell:
+                        yield index
+
+
+# A class which represents a match plane
+# Contains functionality to check if two nodes are matching, to calculate the projected distance,
+# and apply the constraint for a periodic boundary condition
+# (currently only works for the XY-, XZ- and YZ-planes)
+# TODO: extend for any arbitrary plane
+class MatchPlane:
+    # Constructor
+    def __init__(self, i, j):
+        self.i = min(i, j)
+        self.j = max(i, j)
+
+    def get_first_axis_index(self):
+        return self.i
+
+    def get_second_axis_index(self):
+        return self.j
+
+    def get_normal_axis_index(self):
+        return 3 - self.i - self.j
+
+    # Projects an array of coordinates (one row per node) on the plane
+    def get_in_plane_coordinates(self, coords):
+        return coords[:, [self.i, self.j]]
+
+    # Calculates the squares of the in-plane distances between two arrays of in-plane coordinates
+    @staticmethod
+    def dist_sq_arrays(c1, c2):
+        d = c1 - c2
+        return d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1]
+
+    # Defines the data line of a cylindrical *Transform keyword, with the normal axis as the axial direction
+    # (two points on the axis: the origin and a point along the normal axis)
+    def get_cylindrical_transform(self):
+        point = [0.0, 0.0, 0.0]
+        point[self.get_normal_axis_index()] = 1.0
+        return '0., 0., 0., ' + ', '.join([repr(c) for c in point])
+
+
+# Finds the exact matches between two arrays of in-plane coordinates (one row per node), returns for each master the
+# index of the matched slave (-1 if there is no match). With a zero tolerance, the in-plane coordinates must be equal,
+# as in the original node by node comparison (see match_exact), otherwise they must lie within the tolerance (see
+# match_tolerance).
+def match_coordinates(coords_m, coords_s, tolerance):
+    if tolerance > 0:
+        return match_tolerance(coords_m, coords_s, tolerance)
+    return match_exact(coords_m, coords_s)
+
+
+# Finds the matches between two arrays of in-plane coordinates of which the distance is within the tolerance, returns
+# for each master the index of the matched slave (-1 if there is no match). The coordinates are binned in square cells
+# of the size of the tolerance, so that the slaves within the tolerance of a master lie in the cell of the master or
+# in one of its eight neighbours, regardless of where the master lies in its cell. The cells are numbered once (see
+# get_cell_numbers) and the slaves are sorted by cell once, after which the slaves in each neighbouring cell of the
+# masters are looked up with a binary search. A master and a slave are only matched if each is the only node within
+# the tolerance of the other, ambiguous nodes (for instance if the tolerance is larger than the node spacing) are left
+# to the proximity pass.
+def match_tolerance(coords_m, coords_s, tolerance):
+    n_m = len(coords_m)
+    n_s = len(coords_s)
+    matches = -numpy.ones(n_m, dtype=int)
+    if n_m == 0 or n_s == 0:
+        return matches
+    cells_m = numpy.floor(coords_m / tolerance)
+    cells_s = numpy.floor(coords_s / tolerance)
+    columns_s, columns_m, count = get_cell_numbers(cells_m[:, 0], cells_s[:, 0])
+    rows_s, rows_m, count = get_cell_numbers(cells_m[:, 1], cells_s[:, 1])
+    # Sort the slaves by cell
+    keys_s = columns_s * count + rows_s
+    sorter = numpy.argsort(keys_s, kind='mergesort')
+    sorted_keys = keys_s[sorter]
+    pairs_m = list()
+    pairs_s = list()
+    for i in range(0, 3):
+        for j in range(0, 3):
+            # Enumerate the slaves in the neighbouring cell of each master
+            keys_m = columns_m[i] * count + rows_m[j]
+            start = numpy.searchsorted(sorted_keys, keys_m, side='left')
+            counts = numpy.searchsorted(sorted_keys, keys_m, side='right') - start
+            candidates_m = numpy.repeat(numpy.arange(n_m), counts)
+            first = numpy.repeat(numpy.cumsum(counts) - counts, counts)
+            candidates_s = sorter[numpy.repeat(start, counts) + numpy.arange(len(candidates_m)) - first]
+            # Keep the candidates within the tolerance
+            d = coords_m[candidates_m] - coords_s[candidates_s]
+            within = d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1] <= tolerance * tolerance
+            pairs_m.append(candidates_m[within])
+            pairs_s.append(candidates_s[within])
+    pairs_m = numpy.concatenate(pairs_m)
+    pairs_s = numpy.concatenate(pairs_s)
+    # Only match the nodes which have a single candidate within the tolerance
+    unique = ((numpy.bincount(pairs_m, minlength=n_m)[pairs_m] == 1) &
+              (numpy.bincount(pairs_s, minlength=n_s)[pairs_s] == 1))
+    matches[pairs_m[unique]] = pairs_s[unique]
+    return matches
+
+
+# Utility method to number the cells along one axis (see match_tolerance) with consecutive integers, so that the cell
+# numbers of both axes can be combined in a single key without overflow. Returns the numbers of the cells of the
+# slaves, the numbers of the cells before, at and after the cells of the masters (one row each), and the number of
+# distinct cells.
+def get_cell_numbers(cells_m, cells_s):
+    cells, numbers = numpy.unique(numpy.concatenate((cells_s, cells_m - 1, cells_m, cells_m + 1)), return_inverse=True)
+    return numbers[:len(cells_s)], numbers[len(cells_s):].reshape((3, -1)), len(cells)
+
+
+# Finds the exact matches between two arrays of keys (one row per node), returns for each master the index of
+# the matched slave (-1 if there is no match). Equal keys are matched in their original order: the n-th master with
+# a given key is matched to the n-th slave with the same key.
+def match_exact(keys_m, keys_s):
+    n_m = len(keys_m)
+    n_s = len(keys_s)
+    if n_m == 0 or n_s == 0:
+        return -numpy.ones(n_m, dtype=int)
+    # Assign a group number to each distinct key (shared by the masters and slaves)
+    keys = numpy.concatenate((keys_m, keys_s))
+    order = numpy.lexsort((keys[:, 1], keys[:, 0]))
+    sorted_keys = keys[order]
+    new_group = numpy.ones(len(keys), dtype=int)
+    new_group[1:] = (sorted_keys[1:, 0] != sorted_keys[:-1, 0]) | (sorted_keys[1:, 1] != sorted_keys[:-1, 1])
+    groups = numpy.empty(len(keys), dtype=int)
+    groups[order] = numpy.cumsum(new_group)
+    # Identify the nodes by their group and their rank within the group
+    size = max(n_m, n_s) + 1
+    ids_m = groups[:n_m] * size + get_group_ranks(groups[:n_m])
+    ids_s = groups[n_m:] * size + get_group_ranks(groups[n_m:])
+    # Look up the slave with the same identifier for each master
+    sorter = numpy.argsort(ids_s, kind='mergesort')
+    positions = numpy.minimum(numpy.searchsorted(ids_s[sorter], ids_m), n_s - 1)
+    found = ids_s[sorter[positions]] == ids_m
+    return numpy.where(found, sorter[positions], -1)
+
+
+# Splits the exact pass in tiles of about TILE_SIZE masters, by ranges of the first key, returns a list with the
+# indices of the masters and slaves of each tile (in ascending order). Nodes with equal keys end up in the same tile,
+# so matching the tiles separately gives the same matches as matching all nodes at once.
+def split_tiles(keys_m, keys_s):
+    count = -(-len(keys_m) // TILE_SIZE)
+    if count <= 1:
+        return [(numpy.arange(len(keys_m)), numpy.arange(len(keys_s)))]
+    edges = numpy.unique(numpy.sort(keys_m[:, 0])[numpy.arange(1, count) * len(keys_m) // count])
+    tiles_m = numpy.searchsorted(edges, keys_m[:, 0], side='right')
+    tiles_s = numpy.searchsorted(edges, keys_s[:, 0], side='right')
+    return [(numpy.nonzero(tiles_m == tile)[0], numpy.nonzero(tiles_s == tile)[0])
+            for tile in range(0, len(edges) + 1)]
+
+
+# Utility method to calculate the rank of each entry among the entries with the same group number (in original order)
+def get_group_ranks(groups):
+    order = numpy.argsort(groups, kind='mergesort')
+    sorted_groups = groups[order]
+    starts = numpy.ones(len(groups), dtype=bool)
+    starts[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    first = numpy.maximum.accumulate(numpy.where(starts, numpy.arange(len(groups)), 0))
+    ranks = numpy.empty(len(groups), dtype=int)
+    ranks[order] = numpy.arange(len(groups)) - first
+    return ranks
+
+
+# Calculates the keys of points along a space filling curve (1: Morton, 2: Hilbert) through their in-plane coordinates
+# (one row per point): the points are snapped to a grid of 2^CURVE_BITS cells along each axis, points which are
+# close along the curve are also close in the plane
+def get_curve_keys(coords, curve):
+    keys = numpy.zeros(len(coords), dtype=numpy.int64)
+    if len(coords) == 0:
+        return keys
+    size = 1 << CURVE_BITS
+    low = coords.min(axis=0)
+    span = float((coords.max(axis=0) - low).max())
+    if span <= 0:
+        return keys
+    grid = numpy.minimum(((coords - low) * (size / span)).astype(numpy.int64), size - 1)
+    x = grid[:, 0]
+    y = grid[:, 1]
+    if curve == 1:
+        # Morton: interleave the bits of the grid indices
+        for bit in range(0, CURVE_BITS):
+            keys |= (((x >> bit) & 1) << (2 * bit + 1)) | (((y >> bit) & 1) << (2 * bit))
+    else:
+        # Hilbert: determine the quadrant at each level, and rotate the lower levels accordingly
+        step = size // 2
+        while step > 0:
+            rx = ((x & step) > 0).astype(numpy.int64)
+            ry = ((y & step) > 0).astype(numpy.int64)
+            keys += step * step * ((3 * rx) ^ ry)
+            flip = (ry == 0) & (rx == 1)
+            x = numpy.where(flip, size - 1 - x, x)
+            y = numpy.where(flip, size - 1 - y, y)
+            x, y = numpy.where(ry == 0, y, x), numpy.where(ry == 0, x, y)
+            step //= 2
+    return keys
+
+
+# Measures the locality of the chained equations of a pair table, which couple consecutive pairs, by the in-plane
+# distance between the master nodes of consecutive pairs (the slave nodes lie at the same in-plane positions), which is
+# what the ordering along a space filling curve minimizes: the mean and the maximum distance, and the fraction of the
+# consecutive pairs which are adjacent, i.e. of which the master nodes are neighbours on the face (within
+# ADJACENCY_FACTOR times the node spacing, estimated from the bounding box of the master nodes). The span of the labels
+# of consecutive pairs (the largest of the masters and of the slaves) is reported as well, of which the maximum is the
+# bandwidth of the equations in the node numbering. This depends on how the mesh is numbered, and is not minimized by
+# the ordering. Returns a dict with the mean, maximum and adjacent distance metrics, and the label bandwidth and the
+# mean label span.
+def get_chain_metrics(pairs, plane):
+    if len(pairs) < 2:
+        return {'distance': 0.0, 'max distance': 0.0, 'adjacent': 1.0, 'label bandwidth': 0, 'label span': 0.0}
+    coords = plane.get_in_plane_coordinates(pairs.get_master_coordinates())
+    distances = numpy.sqrt(plane.dist_sq_arrays(coords[:-1], coords[1:]))
+    extent = coords.max(axis=0) - coords.min(axis=0)
+    if extent[0] > 0 and extent[1] > 0:
+        spacing = sqrt(extent[0] * extent[1] / len(coords))
+    else:
+        spacing = max(extent) / (len(coords) - 1)
+    spans = numpy.maximum(numpy.abs(numpy.diff(pairs.get_master_labels())),
+                          numpy.abs(numpy.diff(pairs.get_slave_labels())))
+    return {'distance': float(distances.mean()), 'max distance': float(distances.max()),
+            'adjacent': float(numpy.count_nonzero(distances <= ADJACENCY_FACTOR * spacing)) / len(distances),
+            'label bandwidth': int(spans.max()), 'label span': float(spans.mean())}
+
+
+# Describes the change of a metric which should not increase (such as the label bandwidth, see get_chain_metrics), so
+# that an increase is not reported as an improvement
+def describe_change(before, after):
+    if after > before:
+        return 'increased from ' + str(before) + ' to ' + str(after)
+    if after < before:
+        return 'decreased from ' + str(before) + ' to ' + str(after)
+    return 'unchanged at ' + str(after)
+
+
+# Compares the pairs of two pair tables (the applied and the current pairs of a matcher, see update_constraints) by
+# their ids, which determine the names of their sets and equations. Returns the names of the sets which are removed or
+# of which the node has changed, the (name, label) tuples of the sets which are added or of which the node has changed,
+# and the indices of the pairs of both tables of which the equations can differ. The equations of a pair only depend
+# on its id, exemption and coordinates, and on the id and coordinates of the next pair: the equations of the pairs
+# for which all of these are the same in both tables are the same as well.
+def compare_pairs(old, new):
+    ids_old = old.get_ids()
+    ids_new = new.get_ids()
+    # Positions of the pairs in the other table, -1 if they are not in it
+    pos_old = find_labels(ids_new, ids_old)
+    pos_new = find_labels(ids_old, ids_new)
+    found_old = pos_old >= 0
+    found_new = pos_new >= 0
+    # Compare the nodes of the sets
+    same_old = list()
+    same_new = list()
+    for labels_old, labels_new in [(old.get_master_labels(), new.get_master_labels()),
+                                   (old.get_slave_labels(), new.get_slave_labels())]:
+        same_old.append(found_old & (labels_new[pos_old] == labels_old) if len(new) > 0 else found_old)
+        same_new.append(found_new & (labels_old[pos_new] == labels_new) if len(old) > 0 else found_new)
+    deleted_sets = list()
+    for index in numpy.nonzero(~(same_old[0] & same_old[1]))[0].tolist():
+        if not same_old[0][index]:
+            deleted_sets.append(old.get_master_set_name(index))
+        if not same_old[1][index]:
+            deleted_sets.append(old.get_slave_set_name(index))
+    created_sets = list()
+    for index in numpy.nonzero(~(same_new[0] & same_new[1]))[0].tolist():
+        if not same_new[0][index]:
+            created_sets.append((new.get_master_set_name(index), int(new.get_master_labels()[index])))
+        if not same_new[1][index]:
+            created_sets.append((new.get_slave_set_name(index), int(new.get_slave_labels()[index])))
+    # Compare what the equations depend on, for the pairs of the new table which are in the old table
+    unchanged = numpy.zeros(len(new), dtype=bool)
+    if len(old) > 0 and len(new) > 0:
+        keys_old = get_equation_keys(old)
+        keys_new = get_equation_keys(new)
+        unchanged = found_new & numpy.all(keys_old[pos_new] == keys_new, axis=1)
+    unchanged_old = numpy.zeros(len(old), dtype=bool)
+    unchanged_old[pos_new[unchanged]] = True
+    return deleted_sets, created_sets, numpy.nonzero(~unchanged_old)[0], numpy.nonzero(~unchanged)[0]
+
+
+# Utility method to gather what the equations of each pair of a pair table depend on (see compare_pairs) as one row
+# per pair: the exemption and coordinates of the pair, and the id (-1 for the last pair) and coordinates of the next
+def get_equation_keys(pairs):
+    coords = numpy.column_stack((pairs.get_master_coordinates(), pairs.get_slave_coordinates()))
+    next_ids = numpy.append(pairs.get_ids()[1:], -1)
+    next_coords = numpy.vstack((coords[1:], numpy.zeros((1, 6))))
+    return numpy.column_stack((pairs.get_exempted_flags(), coords, next_ids, next_coords))
+
+
+# Finds the positions of the query labels in an array of labels, returns -1 for labels which are not found
+def find_labels(labels, queries):
+    if len(labels) == 0:
+        return -numpy.ones(len(queries), dtype=int)
+    sorter = numpy.argsort(labels, kind='mergesort')
+    positions = sorter[numpy.minimum(numpy.searchsorted(labels[sorter], queries), len(labels) - 1)]
+    return numpy.where(labels[positions] == queries, positions, -1)
+
+
+# Computes a fingerprint of the extracted nodes (see NodeMatcher.extract_nodes): a digest of the labels, coordinates
+# and exempt flags of the master and slave nodes, which changes if any node is added, removed, moved or exempted
+def get_fingerprint(nodes):
+    digest = hashlib.sha1()
+    for array in nodes:
+        array = numpy.ascontiguousarray(array)
+        digest.update(str(array.shape).encode('ascii'))
+        digest.update(array)
+    return digest.hexdigest()
+
+
+# Gets the path of the file with the given key in the cache of match results, None if the cache is disabled. The cache
+# is enabled by setting the PBC_CACHE_DIR environment variable to a directory (created if necessary).
+def get_cache_path(key):
+    directory = os.environ.get('PBC_CACHE_DIR', '')
+    if directory == '':
+        return None
+    return os.path.join(directory, 'pbc_' + key + '.npz')
+
+
+# Reads the matches from a file of the cache, returns None if the file does not exist or can not be read. The
+# modification time of the file is updated, as the cache evicts the least recently used files first.
+def read_cache_file(path):
+    if not os.path.isfile(path):
+        return None
+    try:
+        stream = numpy.load(path)
+        try:
+            matches = tuple(numpy.array(stream[key], dtype=int) for key in CACHE_ARRAYS)
+        finally:
+            stream.close()
+        os.utime(path, None)
+        return matches
+    except Exception:
+        # A damaged file is removed, the nodes are matched as if it did not exist
+        remove_cache_file(path)
+        return None
+
+
+# Writes the matches to a file of the cache, after which the least recently used files are removed until the size of
+# the cache is within the limit in the PBC_CACHE_SIZE environment variable (in MB). The cache is a convenience: if a
+# file can not be written, the matches are simply not cached.
+def write_cache_file(path, matches):
+    directory = os.path.dirname(path)
+    temp = path + '.' + str(os.getpid()) + '.tmp'
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        # Write to a temporary file first, so that other processes never read a partially written file
+        stream = open(temp, 'wb')
+        try:
+            numpy.savez_compressed(stream, **dict(zip(CACHE_ARRAYS, matches)))
+        finally:
+            stream.close()
+        remove_cache_file(path)
+        os.rename(temp, path)
+    except (IOError, OSError):
+        remove_cache_file(temp)
+        return
+    evict_cache_files(directory, float(os.environ.get('PBC_CACHE_SIZE', CACHE_SIZE)) * 1024 * 1024)
+
+
+# Removes the least recently used files from the cache until their total size (in bytes) is within the limit
+def evict_cache_files(directory, limit):
+    files = list()
+    try:
+        for name in os.listdir(directory):
+            if name.startswith('pbc_') and name.endswith('.npz'):
+                path = os.path.join(directory, name)
+                files.append((os.path.getmtime(path), os.path.getsize(path), path))
+    except OSError:
+        return
+    files.sort()
+    size = sum([entry[1] for entry in files])
+    for mtime, file_size, path in files:
+        if size <= limit:
+            break
+        remove_cache_file(path)
+        size -= file_size
+
+
+# Removes a file of the cache, if it exists
+def remove_cache_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Splits the exact matches (see match_coordinates) given the flags of the exempted masters and slaves. As in the
+# original implementation, pairs with an exempted node are dropped, but both of their nodes are used up, so that the
+# partner of an exempted node is not matched to another node by proximity. Returns the indices of the exactly matched
+# masters and slaves, of the masters to match by proximity (those without exact match which are not exempted), and of
+# the candidate slaves for the proximity pass.
+def split_matches(matches, exempt_m, exempt_s):
+    exact_m = numpy.nonzero(matches >= 0)[0]
+    exact_s = matches[exact_m]
+    candidates = ~exempt_s
+    candidates[exact_s] = False
+    keep = ~(exempt_m[exact_m] | exempt_s[exact_s])
+    return exact_m[keep], exact_s[keep], numpy.nonzero((matches < 0) & ~exempt_m)[0], numpy.nonzero(candidates)[0]
+
+
+# Greedily matches each master (in order) to the closest remaining slave, returns the index of the matched slave for
+# each master. The candidates are the slaves with the given indices, the search method is either a grid (0)
+# or a linear scan (1), both give identical results. With the assignment search (2), the greedy matches are improved
+# to the matches with the smallest total distance (see iterate_match_assignment), the greedy matches are then stored
+# in the given greedy array, to compare both.
+def match_closest(coords_m, coords_s, candidates, search, greedy=None):
+    matches = -numpy.ones(len(coords_m), dtype=int)
+    for done in iterate_match_closest(coords_m, coords_s, candidates, search, matches, greedy):
+        pass
+    return matches
+
+
+# Performs the matching of match_closest in steps, the matches are stored in the given array, and this generator
+# yields the number of masters which have been processed after every CHUNK_SIZE masters
+def iterate_match_closest(coords_m, coords_s, candidates, search, matches, greedy=None):
+    if len(coords_m) == 0 or len(candidates) == 0:
+        return
+    if search == 2:
+        # The greedy matching and the assignment each account for half of the progress
+        if greedy is None:
+            greedy = -numpy.ones(len(coords_m), dtype=int)
+        for done in iterate_match_closest(coords_m, coords_s, candidates, 0, greedy):
+            yield done // 2
+        for done in iterate_match_assignment(coords_m, coords_s, candidates, greedy, matches):
+            yield (len(coords_m) + done) // 2
+    elif search == 0:
+        grid = SpatialGrid(coords_s[candidates, 0].tolist(), coords_s[candidates, 1].tolist())
+        for index, (x, y) in enumerate(coords_m.tolist()):
+            closest = grid.find_closest(x, y)
+            if closest < 0:
+                break
+            grid.remove(closest)
+            matches[index] = candidates[closest]
+            if (index + 1) % CHUNK_SIZE == 0:
+                yield index + 1
+    else:
+        remaining = numpy.array(candidates)
+        for index in range(0, len(coords_m)):
+            if len(remaining) == 0:
+                break
+            d = coords_m[index] - coords_s[remaining]
+            closest = int(numpy.argmin(d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1]))
+            matches[index] = remaining[closest]
+            remaining = numpy.delete(remaining, closest)
+            if (index + 1) % CHUNK_SIZE == 0:
+                yield index + 1
+
+
+# Matches the masters to the candidate slaves such that the total distance is minimal, the matches are stored in the
+# given array. The assignment is solved on a sparse graph (see get_candidate_graph) which contains the given greedy
+# matches, so that it matches as many masters as the greedy matching, with a total distance which is at most that of
+# the greedy matching. The masters are added one at a time along the shortest augmenting path (Dijkstra, with column
+# potentials to keep the reduced costs non-negative): each search only visits the part of the graph which is
+# connected to the master, until it finds a free slave, which keeps it close to linear for nodes that are mostly
+# matched to their nearest slave. This generator yields the number of masters which have been processed after every
+# CHUNK_SIZE masters.
+def iterate_match_assignment(coords_m, coords_s, candidates, greedy, matches):
+    cols, costs = get_candidate_graph(coords_m, coords_s, candidates, greedy)
+    count = len(candidates)
+    # Column potentials, the matched column and the cost of the matched edge of each row, and the row of each column
+    v = [0.0] * count
+    row_col = [-1] * len(cols)
+    row_cost = [0.0] * len(cols)
+    col_row = [-1] * count
+    for start in range(0, len(cols)):
+        # Shortest path from the row to a free column, over the matched edges, with the reduced costs
+        dist = dict()
+        pred = dict()
+        for col, cost in zip(cols[start], costs[start]):
+            d = cost - v[col]
+            if col not in dist or d < dist[col]:
+                dist[col] = d
+                pred[col] = start
+        heap = [(d, col) for col, d in dist.items()]
+        heapq.heapify(heap)
+        scanned = list()
+        done = set()
+        end = -1
+        while len(heap) > 0:
+            d, col = heapq.heappop(heap)
+            if col in done or d > dist[col]:
+                continue
+            done.add(col)
+            scanned.append(col)
+            row = col_row[col]
+            if row < 0:
+                end = col
+                break
+            # Potential of the row, for which the reduced cost of its matched edge is zero
+            u = row_cost[row] - v[col]
+            for next_col, cost in zip(cols[row], costs[row]):
+                if next_col in done:
+                    continue
+                next_d = d + max(0.0, cost - v[next_col] - u)
+                if next_col not in dist or next_d < dist[next_col]:
+                    dist[next_col] = next_d
+                    pred[next_col] = row
+                    heapq.heappush(heap, (next_d, next_col))
+        if end >= 0:
+            # Update the potentials of the scanned columns, and augment the matching along the path
+            for col in scanned:
+                v[col] += dist[col] - dist[end]
+            col = end
+            while True:
+                row = pred[col]
+                previous = row_col[row]
+                row_col[row] = col
+                col_row[col] = row
+                row_cost[row] = costs[row][cols[row].index(col)]
+                if row == start:
+                    break
+                col = previous
+        if (start + 1) % CHUNK_SIZE == 0:
+            yield start + 1
+    for row in range(0, len(cols)):
+        if row_col[row] >= 0:
+            matches[row] = candidates[row_col[row]]
+
+
+# Builds the sparse graph of candidate matches for iterate_match_assignment: each master is connected to its
+# ASSIGNMENT_NEIGHBOURS closest candidate slaves within ASSIGNMENT_RADIUS grid cells (see SpatialGrid), and to the
+# slave of its greedy match. Returns, for each master, the list of the positions of the connected slaves in the
+# candidates, and the list of the distances to these slaves.
+def get_candidate_graph(coords_m, coords_s, candidates, greedy):
+    grid = SpatialGrid(coords_s[candidates, 0].tolist(), coords_s[candidates, 1].tolist())
+    radius = ASSIGNMENT_RADIUS * grid.size
+    positions = -numpy.ones(len(coords_s), dtype=int)
+    positions[candidates] = numpy.arange(len(candidates))
+    greedy = numpy.where(greedy >= 0, positions[greedy], -1).tolist()
+    cols = list()
+    costs = list()
+    for index, (x, y) in enumerate(coords_m.tolist()):
+        neighbours = grid.find_nearest(x, y, ASSIGNMENT_NEIGHBOURS, radius)
+        if greedy[index] >= 0 and greedy[index] not in neighbours:
+            neighbours.append(greedy[index])
+        cols.append(neighbours)
+        costs.append([sqrt((x - grid.x[col]) * (x - grid.x[col]) + (y - grid.y[col]) * (y - grid.y[col]))
+                      for col in neighbours])
+    return cols, costs
+
+
+# The adapter through which the model database is accessed (set by the kernel, or by scripts running outside of Abaqus)
+ADAPTER = None
+
+# Static arrays of the three possible match planes and axis labels
+PLANES = (MatchPlane(0, 1), MatchPlane(0, 2), MatchPlane(1, 2))
+AXES = ['x', 'y', 'z']
+
+# Indices of the match planes of the x, y and z directions of an RVE (the plane normal to each direction)
+RVE_PLANES = [2, 1, 0]
+
+# Jobs which are being processed in steps, by name
+JOBS = dict()
+
+# Number of nodes, sets or equations which are processed by a chunked operation before it checks its time budget
+CHUNK_SIZE = 1000
+
+# Names of the space filling curves to order the pairs along (by ordering index), and the number of bits of the grid
+# indices along each axis
+CURVES = ['', 'Morton', 'Hilbert']
+CURVE_BITS = 16
+
+# Distance (relative to the node spacing) within which the master nodes of consecutive pairs count as adjacent (see
+# get_chain_metrics), which includes diagonal neighbours on a structured mesh
+ADJACENCY_FACTOR = 1.5
+
+# Version of the files of the cache of match results (part of the keys, so that files of other versions are not used),
+# the names of the arrays in the files, and the default size limit of the cache (in MB)
+CACHE_VERSION = 3
+CACHE_ARRAYS = ['exact_m', 'exact_s', 'prox_m', 'prox_s', 'greedy_s']
+CACHE_SIZE = 256
+
+# Number of closest slaves, and the distance (in grid cells) within which they are searched, to which each master is
+# connected in the candidate graph of the assignment search (see get_candidate_graph)
+ASSIGNMENT_NEIGHBOURS = 8
+ASSIGNMENT_RADIUS = 4
+
+# Number of masters per tile of the exact pass of match_nodes_parallel
+TILE_SIZE = 100000
+
+# Phases of the operations of a matcher, in order of execution
+PHASES = ['extraction', 'cache', 'comparison', 'exact pass', 'proximity pass', 'ordering', 'proximity sets', 'sets',
+          'equations', 'include file', 'deletion']
+
+# Constraint types for the equations of each axis
+CONSTRAINT_TRANSLATIONAL = 0
+CONSTRAINT_RADIAL = 1
+CONSTRAINT_HOOP = 2
@@ -0,0 +1,211 @@
+import numpy
+import pickle
+from collections import OrderedDict
+from PeriodicBoundaryCondition_core import ModelAdapter
+
+
+# An in-memory stand-in for the model database, which allows to run the periodic boundary conditions without
+# Abaqus CAE (for instance to test or benchmark the matching). Models and parts are created with add_model and
+# add_part, surfaces and sets with add_surface and add_set, after which the adapter is activated with set_adapter:
+#
+#   adapter = MemoryAdapter()
+#   adapter.add_model('Model-1')
+#   adapter.add_part('Model-1', 'Part-1')
+#   adapter.add_surface('Model-1', 'Part-1', 'Master', labels_m, coords_m)
+#   adapter.add_surface('Model-1', 'Part-1', 'Slave', labels_s, coords_s)
+#   PeriodicBoundaryCondition_core.set_adapter(adapter)
+#   PeriodicBoundaryCondition_core.match_nodes('pbc', 0, 0, 0, 1, -1, -1, 0, 0)
+#
+# Like the mdb custom data, the repository stores the matchers pickled, along with their header.
+class MemoryAdapter(ModelAdapter):
+    # Constructor
+    def __init__(self):
+        ModelAdapter.__init__(self)
+        self.models = OrderedDict()
+        self.matchers = OrderedDict()
+
+    # Adds a new, empty model
+    def add_model(self, model):
+        self.models[model] = MemoryModel(model)
+        return self.models[model]
+
+    # Adds a new part without surfaces or sets to a model
+    def add_part(self, model, part):
+        self.models[model].parts[part] = MemoryPart(part)
+        return self.models[model].parts[part]
+
+    # Adds a surface with the given node labels and coordinates (one row per node) to a part
+    def add_surface(self, model, part, surface, labels, coords):
+        self.models[model].parts[part].surfaces[surface] = (numpy.array(labels, dtype=int),
+                                                            numpy.array(coords, dtype=float).reshape((-1, 3)))
+
+    # Adds a set with the given node labels to a part
+    def add_set(self, model, part, set_name, labels):
+        self.models[model].parts[part].sets[set_name] = numpy.array(labels, dtype=int)
+
+    # Fetches a model
+    def get_model(self, model):
+        return self.models[model]
+
+    # Getter for the names of the models
+    def get_model_names(self):
+        return list(self.models.keys())
+
+    # Getter for the names of the parts of a model
+    def get_part_names(self, model):
+        return list(self.models[model].parts.keys())
+
+    # Getter for the names of the surfaces of a part
+    def get_surface_names(self, model, part):
+        return list(self.models[model].parts[part].surfaces.keys())
+
+    # Getter for the names of the sets of a part
+    def get_set_names(self, model, part):
+        return list(self.models[model].parts[part].sets.keys())
+
+    # Gets the number of nodes of a surface
+    def get_surface_node_count(self, model, part, surface):
+        self.count_calls()
+        return len(self.models[model].parts[part].surfaces[surface][0])
+
+    # Gets the labels and coordinates of the nodes of a surface as arrays
+    def get_surface_nodes(self, model, part, surface):
+        self.count_calls()
+        labels, coords = self.models[model].parts[part].surfaces[surface]
+        return labels.copy(), coords.copy()
+
+    # Gets the labels of the nodes of a set as an array
+    def get_set_labels(self, model, part, set_name):
+        self.count_calls()
+        return self.models[model].parts[part].sets[set_name].copy()
+
+    # Creates a set with the nodes with the given labels
+    def create_set(self, model, part, name, labels):
+        self.count_calls(2)
+        self.models[model].sets[name] = (self.get_instance_name(model, part), numpy.array(labels, dtype=int))
+
+    # Creates a set with a single node for each of the given names
+    def create_node_sets(self, model, part, names, labels):
+        self.count_calls(1 + len(names))
+        instance = self.get_instance_name(model, part)
+        sets = self.models[model].sets
+        labels = numpy.asarray(labels).tolist()
+        for index in range(0, len(names)):
+            sets[names[index]] = (instance, numpy.array(labels[index:index + 1], dtype=int))
+
+    # Deletes the sets with the given names which exist, returns their names
+    def delete_sets(self, model, names):
+        self.count_calls(2)
+        sets = self.models[model].sets
+        names = [name for name in names if name in sets]
+        for name in names:
+            del sets[name]
+        return names
+
+    # Creates an equation constraint
+    def create_equation(self, model, name, terms):
+        self.count_calls()
+        self.models[model].constraints[name] = tuple(terms)
+
+    # Deletes the equation constraints with the given names which exist, returns their names
+    def delete_equations(self, model, names):
+        constraints = self.models[model].constraints
+        names = [name for name in names if name in constraints]
+        self.count_calls(1 + len(names))
+        for name in names:
+            del constraints[name]
+        return names
+
+    # Creates a cylindrical coordinate system and returns its id
+    def create_cylindrical_datum(self, model, name, normal):
+        self.count_calls()
+        datums = self.models[model].datums
+        datum_id = 1 + max([datum_id for datum_id, axis in datums.values()] + [0])
+        datums[name] = (datum_id, normal)
+        return datum_id
+
+    # Gets the id of a coordinate system, -1 if it does not exist
+    def get_datum_id(self, model, name):
+        self.count_calls()
+        datums = self.models[model].datums
+        return datums[name][0] if name in datums else -1
+
+    # Deletes a coordinate system
+    def delete_datum(self, model, name):
+        self.count_calls()
+        self.models[model].datums.pop(name, None)
+
+    # Creates a reference point, with an assembly set of the same name
+    def create_reference_point(self, model, name, point):
+        self.count_calls(3)
+        self.models[model].reference_points[name] = tuple(point)
+
+    # Deletes a reference point and its set
+    def delete_reference_point(self, model, name):
+        self.count_calls(2)
+        self.models[model].reference_points.pop(name, None)
+
+    # Inserts a keyword line before the end of the assembly definition
+    def insert_keyword(self, model, keyword):
+        self.count_calls(2)
+        keywords = self.models[model].keywords
+        keywords.insert(keywords.index('*End Assembly'), keyword)
+
+    # Removes a keyword line
+    def remove_keyword(self, model, keyword):
+        self.count_calls(2)
+        keywords = self.models[model].keywords
+        if keyword in keywords:
+            keywords.remove(keyword)
+
+    # Checks if a matcher with the given name exists in the repository
+    def has_matcher(self, name):
+        return name in self.matchers
+
+    # Getter for the names of the matchers in the repository
+    def get_matcher_names(self):
+        return list(self.matchers.keys())
+
+    # Fetches a matcher from the repository
+    def get_matcher(self, name):
+        return pickle.loads(self.matchers[name][1])
+
+    # Fetches the header of a matcher from the repository
+    def get_header(self, name):
+        return self.matchers[name][0]
+
+    # Stores a matcher in the repository
+    def store_matcher(self, name, matcher):
+        self.matchers[name] = (matcher.get_header(), pickle.dumps(matcher, pickle.HIGHEST_PROTOCOL))
+
+    # Deletes a matcher from the repository
+    def delete_matcher(self, name):
+        del self.matchers[name]
+
+
+# An in-memory model: the parts, and the assembly sets, equation constraints, coordinate systems and keyword lines
+# created by the periodic boundary conditions
+class MemoryModel:
+    # Constructor
+    def __init__(self, name):
+        self.name = name
+        self.parts = OrderedDict()
+        # Assembly sets as (instance name, labels) tuples
+        self.sets = OrderedDict()
+        # Equation constraints as tuples of terms
+        self.constraints = OrderedDict()
+        # Coordinate systems as (id, axial direction) tuples
+        self.datums = OrderedDict()
+        # Reference points as coordinate tuples, each reference point has an assembly set with the same name
+        self.reference_points = OrderedDict()
+        # Keyword lines of the assembly definition
+        self.keywords = ['*Assembly, name=Assembly', '*End Assembly']
+
+
+# An in-memory part: the surfaces as (labels, coordinates) tuples and the sets as label arrays
+class MemoryPart:
+    # Constructor
+    def __init__(self, name):
+        self.name = name
+        self.surfaces = OrderedDict()
+        self.sets = OrderedDict()
@@ -16,15 +16,20 @@ class Plugin(abaqusGui.AFXForm):
     STEP_CONFIRM = 2
     STEP_ERROR = 3
     STEP_CLOSE = 4
+    STEP_PROGRESS = 5
 
     # An array holding the names of each step (useful for debugging)
-    STEPS = ['OVERVIEW', 'NEW', 'CONFIRM', 'ERROR', 'CLOSE']
+    STEPS = ['OVERVIEW', 'NEW', 'CONFIRM', 'ERROR', 'CLOSE', 'PROGRESS']
 
     def __init__(self, owner):
         # Call super constructor
         abaqusGui.AFXForm.__init__(self, owner)
         # Define step tracker
         self.next_step = self.STEP_OVERVIEW
+        # Define trackers for the running job, and the names of the periodic boundaries which are to be paired next
+        self.job_name = ''
+        self.job_operation = ''
+        self.pair_queue = []
 
     def get_current_step(self):
         return self.getCurrentDialog().get_step()
@@ -37,6 +42,8 @@ class Plugin(abaqusGui.AFXForm):
             return self.get_input_dialog()
         elif self.next_step == self.STEP_CONFIRM:
             return self.get_confirm_dialog()
+        elif self.next_step == self.STEP_PROGRESS:
+            return self.get_progress_dialog()
         else:
             return None
 
@@ -48,12 +55,22 @@ class Plugin(abaqusGui.AFXForm):
     def get_input_dialog(self):
         return PeriodicBoundaryCondition_DB.InputDialog(self, self.STEP_NEW)
 
+    # Create the progress step for the running job
+    def get_progress_dialog(self):
+        return PeriodicBoundaryCondition_DB.ProgressDialog(self, self.STEP_PROGRESS, self.job_name, self.job_operation)
+
     # Create a confirmation or error dialog after creating a new pbc
     def get_confirm_dialog(self):
-        # Fetch the feedback
-        matcher = mdb.customData.matchers[self.getCurrentDialog().get_current_name()].get_matcher()
-        valid = matcher.is_valid()
-        lines = matcher.get_status_messages()
+        # Fetch the feedback from the summary, headers from older versions do not hold the messages (and the summary
+        # does not hold the header if the kernel has not published it)
+        header = PeriodicBoundaryCondition_DB.get_summary()['headers'].get(self.getCurrentDialog().get_current_name())
+        if header is not None and 'messages' in header:
+            valid = header['valid']
+            lines = header['messages']
+        else:
+            matcher = mdb.customData.matchers[self.getCurrentDialog().get_current_name()].get_matcher()
+            valid = matcher.is_valid()
+            lines = matcher.get_status_messages()
         # Construct dialog
         if valid:
             name = self.getCurrentDialog().get_current_name()
@@ -66,14 +83,16 @@ class Plugin(abaqusGui.AFXForm):
         cmd = abaqusGui.AFXGuiCommand(mode=self, method='create_registry',
                                       objectName='PeriodicBoundaryCondition_kernel', registerQuery=False)
         issue_command(cmd)
+        PeriodicBoundaryCondition_DB.invalidate_summary()
         # Return True indicating the command was issued
         return True
 
-    # Issues the command to match nodes
+    # Issues the command to start a job to match nodes
     def issue_match(self):
         # Check if the name already exists
         name = self.getCurrentDialog().get_current_name()
-        if mdb.customData.matchers.has_key(name):
+        summary = PeriodicBoundaryCondition_DB.get_summary()
+        if name in summary['headers']:
             # The name already exists: display an error message
             abaqusGui.showAFXErrorDialog(abaqusGui.getAFXApp().getAFXMainWindow(),
                                          'A constraint with this name already exists')
@@ -81,7 +100,7 @@ class Plugin(abaqusGui.AFXForm):
             return False
         else:
             # The name does not exist yet: issue the command
-            cmd = abaqusGui.AFXGuiCommand(mode=self, method='match_nodes',
+            cmd = abaqusGui.AFXGuiCommand(mode=self, method='start_match_job',
                                           objectName='PeriodicBoundaryCondition_kernel', registerQuery=False)
             abaqusGui.AFXStringKeyword(cmd, 'name', True, name)
             abaqusGui.AFXIntKeyword(cmd, 'model', True, self.getCurrentDialog().currentModel, False)
@@ -92,29 +111,80 @@ class Plugin(abaqusGui.AFXForm):
             abaqusGui.AFXIntKeyword(cmd, 'ex_s', True, self.getCurrentDialog().get_slave_exempt_index())
             abaqusGui.AFXIntKeyword(cmd, 'plane', True, self.getCurrentDialog().currentPlane, False)
             abaqusGui.AFXIntKeyword(cmd, 'mode', True, self.getCurrentDialog().currentMode, False)
+            abaqusGui.AFXFloatKeyword(cmd, 'tol', True, self.getCurrentDialog().get_tolerance())
+            abaqusGui.AFXIntKeyword(cmd, 'search', True, self.getCurrentDialog().currentSearch, False)
+            abaqusGui.AFXIntKeyword(cmd, 'output', True, self.getCurrentDialog().currentOutput, False)
+            abaqusGui.AFXIntKeyword(cmd, 'formulation', True, self.getCurrentDialog().currentFormulation, False)
+            abaqusGui.AFXIntKeyword(cmd, 'ordering', True, self.getCurrentDialog().currentOrdering, False)
             issue_command(cmd)
+            PeriodicBoundaryCondition_DB.invalidate_summary()
+            # Track the job
+            self.job_name = name
+            self.job_operation = 'match'
             # Return True indicating the command was issued
             return True
 
-    # Issues the command to pair nodes
-    def issue_pair(self):
+    # Issues the command to start a job to pair nodes, of the current periodic boundary if no name is given
+    def issue_pair(self, name=None):
         # Issue command
-        cmd = abaqusGui.AFXGuiCommand(mode=self, method='apply_constraints',
+        if name is None:
+            name = self.getCurrentDialog().get_current_name()
+        cmd = abaqusGui.AFXGuiCommand(mode=self, method='start_pair_job',
                                                 objectName='PeriodicBoundaryCondition_kernel')
-        abaqusGui.AFXStringKeyword(cmd, 'name', True, self.getCurrentDialog().get_current_name())
+        abaqusGui.AFXStringKeyword(cmd, 'name', True, name)
         issue_command(cmd)
-        # Update the overview window
-        self.getCurrentDialog().update_boundaries()
+        PeriodicBoundaryCondition_DB.invalidate_summary()
+        # Track the job
+        self.job_name = name
+        self.job_operation = 'pair'
         # Return True indicating the command was issued
         return True
 
-    # Issues the command to remove a pairing of nodes
-    def issue_remove(self):
+    # Issues the command to process the next steps of the running job (called repeatedly by the progress dialog,
+    # the command string is sent directly to avoid creating new keywords for every step)
+    def issue_step(self):
+        abaqusGui.sendCommand('PeriodicBoundaryCondition_kernel.step_job(name=' + repr(self.job_name) +
+                              ', budget=' + repr(PeriodicBoundaryCondition_DB.STEP_BUDGET) + ')')
+        PeriodicBoundaryCondition_DB.invalidate_summary()
+        # Return True indicating the command was issued
+        return True
+
+    # Issues the command to cancel the running job
+    def issue_cancel(self):
         # Issue command
-        cmd = abaqusGui.AFXGuiCommand(mode=self, method='remove_constraints',
-                                                  objectName='PeriodicBoundaryCondition_kernel')
-        abaqusGui.AFXStringKeyword(cmd, 'name', True, self.getCurrentDialog().get_current_name())
+        cmd = abaqusGui.AFXGuiCommand(mode=self, method='cancel_job',
+                                      objectName='PeriodicBoundaryCondition_kernel')
+        abaqusGui.AFXStringKeyword(cmd, 'name', True, self.job_name)
         issue_command(cmd)
+        PeriodicBoundaryCondition_DB.invalidate_summary()
+        # Return True indicating the command was issued
+        return True
+
+    # Issues the commands to pair the nodes of the selected periodic boundaries one after another: the job for the
+    # first is started, the others are queued and started when the previous job has finished
+    def issue_pair_selected(self):
+        names = self.getCurrentDialog().get_names_to_pair()
+        if len(names) == 0:
+            return False
+        self.pair_queue = names[1:]
+        return self.issue_pair(names[0])
+
+    # Issues the command to remove the pairing of nodes of the selected periodic boundaries, several periodic
+    # boundaries are removed with a single command
+    def issue_remove(self):
+        names = self.getCurrentDialog().get_selected_names()
+        if len(names) == 0:
+            return False
+        # Issue command
+        if len(names) == 1:
+            cmd = abaqusGui.AFXGuiCommand(mode=self, method='remove_constraints',
+                                          objectName='PeriodicBoundaryCondition_kernel')
+            abaqusGui.AFXStringKeyword(cmd, 'name', True, names[0])
+            issue_command(cmd)
+        else:
+            abaqusGui.sendCommand('PeriodicBoundaryCondition_kernel.remove_constraints_batch(names=' +
+                                  repr(list(names)) + ')')
+        PeriodicBoundaryCondition_DB.invalidate_summary()
         # Update the overview window
         self.getCurrentDialog().update_boundaries()
         # Return True indicating the command was issued
@@ -172,17 +242,19 @@ class Plugin(abaqusGui.AFXForm):
                 # Ok button in overview dialog: opens the new constraint dialog, but do not issue a command
                 self.next_step = self.STEP_NEW
             elif btn == abaqusGui.AFXDialog.ID_CLICKED_OK:
-                # Continue button in overview dialog: remain in the overview and pair the currently selected constraint
-                self.next_step = self.STEP_OVERVIEW
-                self.issue_pair()
+                # Continue button in overview dialog: pair the selected constraints and show the progress
+                if self.issue_pair_selected():
+                    self.next_step = self.STEP_PROGRESS
+                else:
+                    self.next_step = self.STEP_OVERVIEW
             elif btn == abaqusGui.AFXDialog.ID_CLICKED_CANCEL:
                 # Cancel button in overview dialog: close the dialog
                 pass
         elif step == self.STEP_NEW:
             if btn == abaqusGui.AFXDialog.ID_CLICKED_CONTINUE:
-                # Apply button in overview dialog: show confirmation dialog and match nodes
+                # Apply button in overview dialog: match nodes and show the progress
                 if self.issue_match():
-                    self.next_step = self.STEP_CONFIRM
+                    self.next_step = self.STEP_PROGRESS
                 else:
                     self.next_step = self.STEP_NEW
             elif btn == abaqusGui.AFXDialog.ID_CLICKED_CANCEL:
@@ -190,14 +262,30 @@ class Plugin(abaqusGui.AFXForm):
                 self.next_step = self.STEP_OVERVIEW
         elif step == self.STEP_CONFIRM:
             if btn == abaqusGui.AFXDialog.ID_CLICKED_CONTINUE:
-                # Apply button in confirm dialog: go back to the overview and pair nodes
+                # Apply button in confirm dialog: pair nodes and show the progress
                 # Before pairing check if the assembly module is active
                 # TODO
                 self.issue_pair()
-                self.next_step = self.STEP_OVERVIEW
+                self.next_step = self.STEP_PROGRESS
             elif btn == abaqusGui.AFXDialog.ID_CLICKED_CANCEL:
                 # Continue button in confirm dialog: go back to the overview
                 self.next_step = self.STEP_OVERVIEW
+        elif step == self.STEP_PROGRESS:
+            if btn == abaqusGui.AFXDialog.ID_CLICKED_CONTINUE:
+                # The job has finished: show the confirmation dialog after matching, or after pairing, pair the next
+                # queued constraint or go back to the overview
+                if self.job_operation == 'match':
+                    self.next_step = self.STEP_CONFIRM
+                elif len(self.pair_queue) > 0:
+                    self.issue_pair(self.pair_queue.pop(0))
+                    self.next_step = self.STEP_PROGRESS
+                else:
+                    self.next_step = self.STEP_OVERVIEW
+            elif btn == abaqusGui.AFXDialog.ID_CLICKED_CANCEL:
+                # Cancel button in progress dialog: cancel the job (and the queued pairings) and go back to the overview
+                self.issue_cancel()
+                self.pair_queue = []
+                self.next_step = self.STEP_OVERVIEW
         elif step == self.STEP_ERROR:
             # Continue button in error dialog: go back to the overview
             self.next_step = self.STEP_OVERVIEW
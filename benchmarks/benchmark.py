@@ -0,0 +1,241 @@
+# Benchmarks the matching, pairing and deletion of periodic boundary conditions on synthetic meshes, with the
+# in-memory stand-in for the model database (does not require Abaqus). Usage:
+#
+#     python benchmarks/benchmark.py --sizes 1000 10000 --results results.json
+#     python benchmarks/benchmark.py --baseline results.json
+#
+# The faces are square grids (translational) or annular sectors (axial) with the given number of nodes, with the nodes
+# of the slave face shuffled. Three kinds of meshes are generated:
+#  - conforming: the slave nodes coincide with the master nodes
+#  - jittered: a fraction of the slave nodes is displaced in-plane, these can only be matched by proximity
+#  - exempted: the nodes on two edges of the faces are exempted
+# The timings of each phase (and of the steps within, see PhaseProfile) are written as JSON, and compared with the
+# timings of a baseline file if one is given.
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'PeriodicBoundaryCondition'))
+
+import PeriodicBoundaryCondition_core as core
+from PeriodicBoundaryCondition_memory import MemoryAdapter
+
+
+# Mesh kinds and periodicity modes
+KINDS = ['conforming', 'jittered', 'exempted']
+MODES = ['translational', 'axial']
+
+# Phases which are timed
+PHASES = ['match', 'apply', 'delete']
+
+# Names of the model, part, surfaces and sets in the in-memory model
+MODEL = 'Model-1'
+PART = 'Part-1'
+
+
+# Generates the in-plane coordinates (XY-plane) of the nodes of a face with about the given number of nodes, returns
+# the coordinates (one row per node), the node spacing, and a mask of the nodes on the edges to exempt
+def generate_face(size, mode):
+    n = max(2, int(round(math.sqrt(size))))
+    i, j = numpy.meshgrid(numpy.arange(n), numpy.arange(n), indexing='ij')
+    i = i.ravel()
+    j = j.ravel()
+    if mode == 'translational':
+        # Unit square
+        spacing = 1.0 / (n - 1)
+        x = i * spacing
+        y = j * spacing
+    else:
+        # Annular sector of 90 degrees with radii between 1 and 2
+        spacing = 1.0 / (n - 1)
+        r = 1.0 + i * spacing
+        t = j * (0.5 * math.pi / (n - 1))
+        x = r * numpy.cos(t)
+        y = r * numpy.sin(t)
+    coords = numpy.column_stack((x, y, numpy.zeros(len(x))))
+    return coords, spacing, (i == 0) | (j == 0)
+
+
+# Generates the master and slave faces of a periodic mesh, and adds them as surfaces (and exempt sets) to the model
+def generate_mesh(adapter, size, kind, mode, jitter, fraction, seed):
+    rng = numpy.random.RandomState(seed)
+    coords, spacing, edges = generate_face(size, mode)
+    count = len(coords)
+    # Master face at z = 0, slave face at z = 1, both in shuffled order
+    order_m = rng.permutation(count)
+    order_s = rng.permutation(count)
+    coords_m = coords[order_m]
+    coords_s = coords[order_s]
+    coords_s[:, 2] = 1.0
+    if kind == 'jittered':
+        # Displace a fraction of the slave nodes in-plane
+        moved = rng.rand(count) < fraction
+        coords_s[moved, 0:2] += rng.uniform(-jitter * spacing, jitter * spacing, (numpy.count_nonzero(moved), 2))
+    labels_m = numpy.arange(1, count + 1)
+    labels_s = numpy.arange(count + 1, 2 * count + 1)
+    adapter.add_surface(MODEL, PART, 'Master', labels_m, coords_m)
+    adapter.add_surface(MODEL, PART, 'Slave', labels_s, coords_s)
+    adapter.add_set(MODEL, PART, 'Master-Edges', labels_m[edges[order_m]])
+    adapter.add_set(MODEL, PART, 'Slave-Edges', labels_s[edges[order_s]])
+    return count
+
+
+# Runs the benchmark for one configuration, returns a dict with the timings and statistics
+def run_case(size, kind, mode, args):
+    adapter = MemoryAdapter()
+    adapter.add_model(MODEL)
+    adapter.add_part(MODEL, PART)
+    count = generate_mesh(adapter, size, kind, mode, args.jitter, args.fraction, args.seed)
+    core.set_adapter(adapter)
+    exempt = 0 if kind == 'exempted' else -1
+    timings = dict()
+    # Match the nodes
+    start = timeit.default_timer()
+    if args.processes is None:
+        core.match_nodes('bench', 0, 0, 0, 1, exempt, exempt + 1 if exempt >= 0 else -1, 0, MODES.index(mode),
+                         args.tolerance, args.search, args.output, 0, args.ordering)
+    else:
+        core.create_matcher('bench', 0, 0, 0, 1, exempt, exempt + 1 if exempt >= 0 else -1, 0, MODES.index(mode),
+                            args.tolerance, args.search, args.output, 0, args.ordering)
+        core.match_nodes_parallel(['bench'], args.processes)
+    timings['match'] = timeit.default_timer() - start
+    header = adapter.get_header('bench')
+    # Apply the constraints
+    start = timeit.default_timer()
+    core.apply_constraints('bench')
+    timings['apply'] = timeit.default_timer() - start
+    equations = len(adapter.get_model(MODEL).constraints)
+    # Delete the constraints (on the matcher itself, to keep its profile after it is removed from the repository)
+    matcher = adapter.get_matcher('bench')
+    start = timeit.default_timer()
+    matcher.delete_constraints()
+    adapter.delete_matcher('bench')
+    timings['delete'] = timeit.default_timer() - start
+    profile = matcher.get_profile()
+    return {'size': size, 'nodes': count, 'kind': kind, 'mode': mode, 'timings': timings,
+            'phases': profile.get_timings(), 'calls': profile.get_calls(), 'memory': profile.get_peak_memory(),
+            'pairs': header['pairs'], 'exact': header['exact'], 'proximity': header['proximity'],
+            'exempts': header['exempts'], 'equations': equations, 'ordering': header['metrics'],
+            'proximity distance': {'total': header['avg'] * header['proximity'], 'max': header['max']},
+            'greedy': header['greedy']}
+
+
+# Identifies a benchmark case, to compare it with the baseline
+def get_case_key(result):
+    return result['size'], result['kind'], result['mode']
+
+
+# Compares the results with the baseline, returns a list of messages for the phases which are slower than the
+# baseline by more than the threshold factor (phases faster than the minimum time are not compared)
+def compare_results(results, baseline, threshold, minimum):
+    reference = dict()
+    for result in baseline['results']:
+        reference[get_case_key(result)] = result
+    regressions = list()
+    for result in results:
+        key = get_case_key(result)
+        if key not in reference:
+            continue
+        for phase in PHASES:
+            new = result['timings'][phase]
+            old = reference[key]['timings'][phase]
+            if new > minimum and new > threshold * old:
+                regressions.append('%s %s %d nodes, %s: %.3f s (baseline %.3f s)' %
+                                   (result['kind'], result['mode'], result['nodes'], phase, new, old))
+    return regressions
+
+
+# Parses the command line arguments
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmarks the periodic boundary conditions on synthetic meshes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000],
+                        help='number of nodes per face')
+    parser.add_argument('--kinds', nargs='+', choices=KINDS, default=KINDS, help='kinds of meshes')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES, help='periodicity modes')
+    parser.add_argument('--jitter', type=float, default=0.25, help='displacement of jittered nodes (x spacing)')
+    parser.add_argument('--fraction', type=float, default=0.1, help='fraction of jittered slave nodes')
+    parser.add_argument('--tolerance', type=float, default=0.0, help='tolerance for exact matches')
+    parser.add_argument('--search', type=int, choices=[0, 1, 2], default=0,
+                        help='proximity search (0: grid, 1: linear, 2: assignment)')
+    parser.add_argument('--output', type=int, choices=[0, 1], default=0, help='output (0: model, 1: include file)')
+    parser.add_argument('--ordering', type=int, choices=[0, 1, 2], default=0,
+                        help='pair ordering (0: matching, 1: Morton, 2: Hilbert)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='match with match_nodes_parallel with this number of processes (0: number of cores)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random number generator')
+    parser.add_argument('--results', default=None, help='JSON file to write the results to')
+    parser.add_argument('--baseline', default=None, help='JSON file with results to compare with')
+    parser.add_argument('--threshold', type=float, default=1.5, help='slowdown factor reported as a regression')
+    parser.add_argument('--minimum', type=float, default=0.05, help='phases faster than this (s) are not compared')
+    return parser.parse_args()
+
+
+# Runs the benchmarks
+def main():
+    args = parse_arguments()
+    # Matches loaded from the cache of match results would not measure the matching
+    os.environ.pop('PBC_CACHE_DIR', None)
+    # Include files are written to the working directory, run in a temporary directory
+    directory = os.getcwd()
+    temp = tempfile.mkdtemp()
+    os.chdir(temp)
+    results = list()
+    try:
+        for mode in args.modes:
+            for kind in args.kinds:
+                for size in args.sizes:
+                    result = run_case(size, kind, mode, args)
+                    results.append(result)
+                    timings = result['timings']
+                    print('%-10s %-13s %8d nodes: match %8.3f s, apply %8.3f s, delete %8.3f s' %
+                          (kind, mode, result['nodes'], timings['match'], timings['apply'], timings['delete']))
+                    if result['ordering'] is not None:
+                        before, after = result['ordering']
+                        print('%-10s %-13s %8d nodes: mean distance %.3g -> %.3g, max distance %.3g -> %.3g, '
+                              'adjacent %.1f%% -> %.1f%%, label bandwidth %s' %
+                              (kind, mode, result['nodes'], before['distance'], after['distance'],
+                               before['max distance'], after['max distance'], 100 * before['adjacent'],
+                               100 * after['adjacent'],
+                               core.describe_change(before['label bandwidth'], after['label bandwidth'])))
+                    if result['greedy'] is not None:
+                        distance = result['proximity distance']
+                        print('%-10s %-13s %8d nodes: proximity distance total %.4g (greedy %.4g), '
+                              'max %.4g (greedy %.4g)' % (kind, mode, result['nodes'], distance['total'],
+                                                          result['greedy']['total'], distance['max'],
+                                                          result['greedy']['max']))
+    finally:
+        os.chdir(directory)
+        shutil.rmtree(temp, ignore_errors=True)
+    output = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+              'numpy': numpy.__version__, 'platform': platform.platform(), 'arguments': vars(args),
+              'results': results}
+    if args.results is not None:
+        stream = open(args.results, 'w')
+        try:
+            json.dump(output, stream, indent=2, sort_keys=True)
+        finally:
+            stream.close()
+    if args.baseline is not None:
+        stream = open(args.baseline, 'r')
+        try:
+            baseline = json.load(stream)
+        finally:
+            stream.close()
+        regressions = compare_results(results, baseline, args.threshold, args.minimum)
+        for regression in regressions:
+            print('Regression: ' + regression)
+        if len(regressions) > 0:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# Helpers of the tests of the core, which run with the in-memory stand-in for the model database (does not require
+# Abaqus). Run the tests from the root of the repository with:
+#
+#     python -m pytest -q tests
+#     python -m unittest discover tests
+import os
+import sys
+from math import sqrt
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'PeriodicBoundaryCondition'))
+
+import PeriodicBoundaryCondition_core as core
+from PeriodicBoundaryCondition_memory import MemoryAdapter
+
+
+# Names of the model and part in the in-memory model
+MODEL = 'Model-1'
+PART = 'Part-1'
+
+
+# Creates the nodes of a pair of square faces of n x n nodes in the xy-plane, with the master and slave nodes in a
+# different random order and a fraction of the slave nodes displaced in-plane (these can only be matched by
+# proximity, the nodes on the edges x = 0 and y = 0 are not displaced), returns the labels and coordinates of the
+# master and slave nodes
+def make_faces(n, seed, jitter=0.3, fraction=0.2, offset=0):
+    random = numpy.random.RandomState(seed)
+    grid = numpy.array([(i, j) for i in range(0, n) for j in range(0, n)], dtype=float)
+    coords_m = numpy.column_stack((grid[random.permutation(len(grid))], numpy.zeros(len(grid))))
+    coords_s = numpy.column_stack((grid[random.permutation(len(grid))], numpy.ones(len(grid))))
+    moved = (random.rand(len(grid)) < fraction) & (coords_s[:, 0] > 0) & (coords_s[:, 1] > 0)
+    coords_s[moved, :2] += random.uniform(-jitter, jitter, (int(moved.sum()), 2))
+    labels_m = numpy.arange(1, len(grid) + 1) + offset
+    labels_s = labels_m + len(grid)
+    return labels_m, coords_m, labels_s, coords_s
+
+
+# Gets the labels of the nodes of a face (see make_faces) on the edge x = 0, and also on the edge y = 0 if both edges
+# are exempted
+def get_edge_labels(labels, coords, edges):
+    if edges > 1:
+        return labels[(coords[:, 0] == 0) | (coords[:, 1] == 0)]
+    return labels[coords[:, 0] == 0]
+
+
+# Creates an in-memory model with the given faces (see make_faces), and exempt sets with the nodes on the edges of each
+# face (see get_edge_labels), and activates it. The surfaces are added in order (master and slave alternating), as are
+# the exempt sets.
+def make_adapter(faces, edges=1):
+    adapter = MemoryAdapter()
+    adapter.add_model(MODEL)
+    adapter.add_part(MODEL, PART)
+    for index, (labels_m, coords_m, labels_s, coords_s) in enumerate(faces):
+        adapter.add_surface(MODEL, PART, 'master_' + str(index), labels_m, coords_m)
+        adapter.add_surface(MODEL, PART, 'slave_' + str(index), labels_s, coords_s)
+        adapter.add_set(MODEL, PART, 'exempt_master_' + str(index), get_edge_labels(labels_m, coords_m, edges))
+        adapter.add_set(MODEL, PART, 'exempt_slave_' + str(index), get_edge_labels(labels_s, coords_s, edges))
+    core.set_adapter(adapter)
+    return adapter
+
+
+# Matches the nodes of a pair of faces as in the original implementation: first each master (in order) to the first
+# remaining slave with the same in-plane coordinates, then each remaining master (in order) to the closest remaining
+# slave. Pairs with an exempted node are not created. The exempted nodes are given as sets of labels, by default those
+# on the edge x = 0 (see get_edge_labels). The exempted nodes must be matched exactly, the original implementation
+# also matched exempted nodes by proximity, while the core leaves them out of the proximity pass. Returns the labels of
+# the pairs, and the numbers of exact matches, proximity matches and exempted pairs, and the minimum, maximum and
+# total distance of the proximity matches.
+def match_baseline(labels_m, coords_m, labels_s, coords_s, exempt_m=None, exempt_s=None):
+    if exempt_m is None:
+        exempt_m = set(get_edge_labels(labels_m, coords_m, 1).tolist())
+    if exempt_s is None:
+        exempt_s = set(get_edge_labels(labels_s, coords_s, 1).tolist())
+    masters = list(range(0, len(labels_m)))
+    slaves = list(range(0, len(labels_s)))
+    pairs = list()
+    exact = 0
+    prox = 0
+    exempted = 0
+    mn = 0
+    mx = 0
+    tot = 0
+    for master in list(masters):
+        slave = None
+        for node in slaves:
+            if coords_m[master, 0] == coords_s[node, 0] and coords_m[master, 1] == coords_s[node, 1]:
+                slave = node
+                break
+        if slave is None:
+            prox += 1
+            continue
+        if labels_m[master] in exempt_m or labels_s[slave] in exempt_s:
+            exempted += 1
+        else:
+            pairs.append((labels_m[master], labels_s[slave]))
+            exact += 1
+        masters.remove(master)
+        slaves.remove(slave)
+    for master in list(masters):
+        slave = None
+        dist = -1
+        for node in slaves:
+            d = coords_m[master, :2] - coords_s[node, :2]
+            new_dist = d[0] * d[0] + d[1] * d[1]
+            if new_dist < dist or dist < 0:
+                slave = node
+                dist = new_dist
+        if labels_m[master] in exempt_m or labels_s[slave] in exempt_s:
+            exempted += 1
+        else:
+            pairs.append((labels_m[master], labels_s[slave]))
+            dist = sqrt(dist)
+            if mn == 0:
+                mn = dist
+                mx = dist
+                tot = dist
+            else:
+                mn = min(dist, mn)
+                mx = max(dist, mx)
+                tot = tot + dist
+        masters.remove(master)
+        slaves.remove(slave)
+    return pairs, exact, prox, exempted, mn, mx, tot
+
+
+# Gets the labels of the pairs of a matcher which are not exempted, in order
+def get_pairs(matcher):
+    pairs = matcher.pairs
+    free = numpy.logical_not(numpy.asarray(pairs.get_exempted_flags(), dtype=bool))
+    return list(zip(pairs.get_master_labels()[free].tolist(), pairs.get_slave_labels()[free].tolist()))
+
+
+# Gets the labels of the pairs and the match statistics of a matcher, to compare matchers
+def get_results(matcher):
+    return (get_pairs(matcher), matcher.exact, matcher.prox, matcher.exempts, matcher.mn, matcher.mx, matcher.tot)
@@ -0,0 +1,58 @@
+# Tests of the cache of match results, see helpers for how to run them
+import os
+import shutil
+import tempfile
+import unittest
+
+from helpers import MODEL, PART, core, make_faces, make_adapter, get_edge_labels, get_results
+
+
+class TestCache(unittest.TestCase):
+    # Sets up a temporary cache directory
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.previous = os.environ.get('PBC_CACHE_DIR')
+        os.environ['PBC_CACHE_DIR'] = self.directory
+
+    # Removes the temporary cache directory
+    def tearDown(self):
+        if self.previous is None:
+            del os.environ['PBC_CACHE_DIR']
+        else:
+            os.environ['PBC_CACHE_DIR'] = self.previous
+        shutil.rmtree(self.directory)
+
+    # Matching the same mesh again loads the matches from the cache, with the same results
+    def test_round_trip(self):
+        faces = make_faces(15, 2)
+        for search in [0, 2]:
+            matchers = list()
+            for attempt in range(0, 2):
+                adapter = make_adapter([faces])
+                core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0, 0.0, search)
+                matchers.append(adapter.get_matcher('pbc'))
+            self.assertFalse(matchers[0].is_cached())
+            self.assertTrue(matchers[1].is_cached())
+            self.assertEqual(get_results(matchers[1]), get_results(matchers[0]))
+            self.assertEqual(matchers[1].get_greedy_proximity(), matchers[0].get_greedy_proximity())
+
+    # The matches of the same mesh with other exemptions or another tolerance are not loaded from the cache
+    def test_key(self):
+        faces = make_faces(15, 2)
+        adapter = make_adapter([faces])
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        adapter = make_adapter([faces])
+        labels_m, coords_m, labels_s, coords_s = faces
+        adapter.get_model(MODEL).parts[PART].sets['exempt_master_0'] = get_edge_labels(labels_m, coords_m, 2)
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        self.assertFalse(adapter.get_matcher('pbc').is_cached())
+        adapter = make_adapter([faces])
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0, 0.01)
+        self.assertFalse(adapter.get_matcher('pbc').is_cached())
+        adapter = make_adapter([faces])
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        self.assertTrue(adapter.get_matcher('pbc').is_cached())
+
+
+if __name__ == '__main__':
+    unittest.main()
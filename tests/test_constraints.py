@@ -0,0 +1,237 @@
+# Tests of the constraints which are applied for the node pairs, see helpers for how to run them
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+import numpy
+
+from helpers import MODEL, PART, core, make_faces, make_adapter, get_pairs
+from PeriodicBoundaryCondition_memory import MemoryAdapter
+
+
+# A stand-in for the standard output, which keeps what is written
+class Output:
+    # Constructor
+    def __init__(self):
+        self.text = ''
+
+    # Keeps the written text
+    def write(self, text):
+        self.text += text
+
+    # Nothing to flush
+    def flush(self):
+        pass
+
+
+# Creates an in-memory model of a cube of n x n x n nodes with spacing 1, with the six faces as surfaces: the master
+# and slave faces of the x, y and z directions, in this order, and activates it
+def make_cube(n):
+    adapter = MemoryAdapter()
+    adapter.add_model(MODEL)
+    adapter.add_part(MODEL, PART)
+    grid = numpy.array([(i, j, k) for k in range(0, n) for j in range(0, n) for i in range(0, n)], dtype=float)
+    labels = numpy.arange(1, len(grid) + 1)
+    for axis in range(0, 3):
+        for side, value in [('master', 0), ('slave', n - 1)]:
+            face = grid[:, axis] == value
+            adapter.add_surface(MODEL, PART, side + '_' + core.AXES[axis], labels[face], grid[face])
+    core.set_adapter(adapter)
+    return adapter
+
+
+# Gets the matrix of the equations of a model, with a column for each degree of freedom of a node or reference point,
+# and the dependent degree of freedom (the first term) of each equation
+def get_equation_matrix(model):
+    columns = dict()
+    rows = list()
+    dependents = list()
+    for terms in model.constraints.values():
+        row = dict()
+        for term in terms:
+            node = int(model.sets[term[1]][1][0]) if term[1] in model.sets else term[1]
+            row[columns.setdefault((node, term[2]), len(columns))] = term[0]
+            if len(row) == 1:
+                dependents.append((node, term[2]))
+        rows.append(row)
+    matrix = numpy.zeros((len(rows), len(columns)))
+    for index, row in enumerate(rows):
+        for column, value in row.items():
+            matrix[index, column] = value
+    return matrix, dependents
+
+
+class TestRve(unittest.TestCase):
+    # The equations of an RVE are linearly independent and each constrains another dependent degree of freedom, so the
+    # edges and corners are not over-constrained, for both formulations
+    def test_rank(self):
+        for formulation in [0, 1]:
+            adapter = make_cube(4)
+            core.create_rve('rve', 0, 0, range(0, 6), formulation=formulation)
+            matrix, dependents = get_equation_matrix(adapter.get_model(MODEL))
+            # Each direction has 16 pairs, without those with nodes on the master faces of the previous directions
+            self.assertEqual(len(matrix), 3 * (16 + 12 + 9) - (3 * 3 if formulation == 0 else 0))
+            self.assertEqual(numpy.linalg.matrix_rank(matrix), len(matrix))
+            self.assertEqual(len(set(dependents)), len(dependents))
+
+    # With the reference point formulation, each equation has a term of the reference point of its direction, and
+    # removing the constraints also removes the reference points
+    def test_reference_points(self):
+        adapter = make_cube(4)
+        names = core.create_rve('rve', 0, 0, range(0, 6), formulation=1)
+        model = adapter.get_model(MODEL)
+        self.assertEqual(sorted(model.reference_points), ['RP_PBC_' + name for name in names])
+        for equation, terms in model.constraints.items():
+            name = [name for name in names if '_pbc_' + name + '_node_' in equation]
+            self.assertEqual(len(name), 1)
+            self.assertEqual(terms[-1], (-1.0, 'RP_PBC_' + name[0], terms[0][2]))
+        core.remove_constraints_batch(names)
+        self.assertEqual(model.reference_points, {})
+        self.assertEqual(len(model.constraints), 0)
+        self.assertEqual([name for name in model.sets if 'proximity' not in name], [])
+
+
+# Reads the keywords of an include file: returns the labels of the node sets by name, the equations by name (as
+# tuples of (coefficient, set name, dof) terms), and the (node set, data line) tuples of the transforms
+def read_include_file(path):
+    sets = dict()
+    equations = dict()
+    transforms = list()
+    lines = [line.rstrip('\n') for line in open(path)]
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        index += 1
+        if line.startswith('*Nset'):
+            name = line.split('nset=')[1].split(',')[0]
+            sets[name] = list()
+            while index < len(lines) and not lines[index].startswith('*'):
+                sets[name].extend([int(label) for label in lines[index].split(',') if label.strip()])
+                index += 1
+        elif line.startswith('** Constraint: '):
+            name = line[len('** Constraint: '):]
+            count = int(lines[index + 1])
+            terms = [lines[index + 2 + term].split(', ') for term in range(0, count)]
+            equations[name] = tuple((float(value), set_name, int(dof)) for set_name, dof, value in terms)
+            index += 2 + count
+        elif line.startswith('*Transform'):
+            transforms.append((line.split('nset=')[1].split(',')[0], lines[index]))
+            index += 1
+    return sets, equations, transforms
+
+
+class TestIncludeFile(unittest.TestCase):
+    # Writes the include files to a temporary working directory
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+
+    # Removes the temporary working directory
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    # With include file output, the sets and equations are written to the include file instead of the model, which
+    # includes it at the end of the assembly, and removing the constraints removes both the keyword and the file, for
+    # both modes
+    def test_contents(self):
+        for mode in [0, 1]:
+            labels_m, coords_m, labels_s, coords_s = make_faces(10, 0)
+            # Keep the nodes away from the axis in axial mode
+            coords_m[:, :2] += 1.5
+            coords_s[:, :2] += 1.5
+            adapter = make_adapter([(labels_m, coords_m, labels_s, coords_s)])
+            core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, mode, 0.0, 0, 1)
+            core.apply_constraints('pbc')
+            matcher = adapter.get_matcher('pbc')
+            model = adapter.get_model(MODEL)
+            path = matcher.get_include_file()
+            self.assertEqual(os.path.dirname(path), os.path.realpath(self.directory))
+            self.assertEqual(model.keywords[-2:], ['*Include, input=' + path, '*End Assembly'])
+            self.assertEqual((len(model.constraints), model.datums), (0, {}))
+            self.assertEqual([name for name in model.sets if 'proximity' not in name], [])
+            sets, equations, transforms = read_include_file(path)
+            nodes = sets.pop('pbc_pbc_nodes', None)
+            self.assertEqual(sets, dict((name, [label]) for name, label in matcher.get_pair_sets(matcher.pairs)))
+            # The coordinate system of the equations is defined by the transform, the terms do not refer to it
+            expected = dict((name, tuple((float(term[0]), term[1], term[2]) for term in terms))
+                            for name, terms in matcher.iterate_equations(0 if mode == 1 else -1))
+            self.assertTrue(equations == expected)
+            self.assertEqual(len(equations), matcher.get_equation_count())
+            if mode == 1:
+                # The nodes of the pairs are transformed to a cylindrical coordinate system around the z-axis
+                self.assertEqual(sorted(nodes), sorted(label for name, label in matcher.get_pair_sets(matcher.pairs)))
+                self.assertEqual(transforms, [('pbc_pbc_nodes', '0., 0., 0., 0.0, 0.0, 1.0')])
+            else:
+                self.assertEqual((nodes, transforms), (None, []))
+            core.remove_constraints('pbc')
+            self.assertEqual(model.keywords, ['*Assembly, name=Assembly', '*End Assembly'])
+            self.assertFalse(os.path.exists(path))
+
+
+class TestOlderVersions(unittest.TestCase):
+    # A matched matcher pickled by the original implementation, which stored its pairs as a list of NodePair objects
+    # and did not have the fields of later versions, is loaded with a pair table, and gives the same constraints
+    def test_node_pairs(self):
+        faces = make_faces(10, 0)
+        adapter = make_adapter([faces])
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        matcher = adapter.get_matcher('pbc')
+        # Keep only the fields of the original implementation
+        old = adapter.get_matcher('pbc')
+        old.__dict__ = dict((field, getattr(matcher, field)) for field in
+                            ['name', 'modelName', 'partName', 'masterName', 'slaveName', 'masterExemptName',
+                             'slaveExemptName', 'plane_index', 'mode_index', 'valid', 'matched', 'paired', 'number',
+                             'exempts', 'exact', 'prox', 'mn', 'mx', 'tot'])
+        old.pairs = list(matcher.pairs)
+        self.assertTrue(all(isinstance(pair, core.NodePair) for pair in old.pairs))
+        loaded = pickle.loads(pickle.dumps(old, 0))
+        self.assertTrue(isinstance(loaded.pairs, core.PairTable))
+        self.assertEqual(get_pairs(loaded), get_pairs(matcher))
+        self.assertEqual(loaded.get_pair_sets(loaded.pairs), matcher.get_pair_sets(matcher.pairs))
+        self.assertEqual(list(loaded.iterate_equations(-1)), list(matcher.iterate_equations(-1)))
+        self.assertEqual((loaded.get_tolerance(), loaded.get_profile().get_timings()), (0.0, {}))
+        # The constraints of the loaded matcher can be applied
+        adapter.store_matcher('pbc', loaded)
+        core.apply_constraints('pbc')
+        self.assertTrue(adapter.get_matcher('pbc').is_paired())
+        self.assertEqual(len(adapter.get_model(MODEL).constraints), loaded.get_equation_count())
+
+
+class TestRemoval(unittest.TestCase):
+    # Removing the constraints deletes all sets and equations, and returns a report of the deletion instead of printing
+    # it, which counts the sets and equations which were already missing
+    def test_report(self):
+        adapter = make_adapter([make_faces(10, 0)])
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        core.apply_constraints('pbc')
+        model = adapter.get_model(MODEL)
+        sets = len([name for name in model.sets if 'proximity' not in name])
+        equations = len(model.constraints)
+        # Remove a set and two equations by hand
+        del model.sets['pbc_pbc_node_0_master']
+        for name in list(model.constraints.keys())[:2]:
+            del model.constraints[name]
+        stdout = sys.stdout
+        sys.stdout = Output()
+        try:
+            report = core.remove_constraints('pbc')
+            output = sys.stdout.text
+        finally:
+            sys.stdout = stdout
+        self.assertEqual(output, '')
+        self.assertEqual(report, {'deleted sets': sets - 1, 'missing sets': 1, 'deleted equations': equations - 2,
+                                  'missing equations': 2})
+        self.assertEqual([name for name in model.sets if 'proximity' not in name], [])
+        self.assertEqual(len(model.constraints), 0)
+        self.assertFalse(adapter.has_matcher('pbc'))
+        self.assertTrue(core.get_removal_message('pbc', report).startswith('Periodic Boundary Condition pbc: removed'))
+        # Nothing is reported for a matcher which does not exist
+        self.assertEqual(core.remove_constraints_batch(['pbc']), {'pbc': None})
+
+
+if __name__ == '__main__':
+    unittest.main()
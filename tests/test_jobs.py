@@ -0,0 +1,94 @@
+# Tests of the jobs which match the nodes and apply the constraints in steps, see helpers for how to run them
+import unittest
+
+from helpers import MODEL, core, make_faces, make_adapter, get_results
+
+
+class TestJobs(unittest.TestCase):
+    # Uses small chunks, so that the jobs take several steps
+    def setUp(self):
+        self.chunk_size = core.CHUNK_SIZE
+        core.CHUNK_SIZE = 16
+
+    # Restores the size of the chunks
+    def tearDown(self):
+        core.CHUNK_SIZE = self.chunk_size
+
+    # Starts a job to match the nodes of the faces (see make_faces), returns the adapter
+    def start_match_job(self, create=False):
+        adapter = make_adapter([make_faces(15, 0, fraction=0.5)])
+        if create:
+            core.create_matcher('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        core.start_match_job('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        return adapter
+
+    # Processes a single step of a job, returns its progress
+    def step(self, adapter):
+        core.step_job('pbc', 0)
+        return adapter.get_progress('pbc')
+
+    # The steps of a matching job do not change the matcher, its profile included, until the last step
+    def test_match_steps(self):
+        adapter = self.start_match_job(True)
+        header = adapter.get_header('pbc')
+        job = core.JOBS['pbc']
+        progress = self.step(adapter)
+        steps = 1
+        while progress['status'] == 'running':
+            self.assertEqual(adapter.get_header('pbc'), header)
+            self.assertFalse(job.get_matcher().is_matched())
+            self.assertEqual(job.get_matcher().get_profile().get_timings(), {})
+            progress = self.step(adapter)
+            steps += 1
+        self.assertEqual(progress['status'], 'finished')
+        self.assertGreater(steps, 2)
+        # The result is the same as that of matching at once, and the phases of all steps are in the profile
+        matcher = adapter.get_matcher('pbc')
+        self.assertTrue(matcher.is_matched())
+        self.assertTrue(set(['extraction', 'exact pass', 'proximity pass']) <= set(matcher.get_profile().get_timings()))
+        expected = make_adapter([make_faces(15, 0, fraction=0.5)])
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        self.assertEqual(get_results(matcher), get_results(expected.get_matcher('pbc')))
+
+    # Cancelling a matching job leaves an existing matcher as it was, and removes a matcher created for the job
+    def test_match_cancel(self):
+        for create in [True, False]:
+            adapter = self.start_match_job(create)
+            header = adapter.get_header('pbc')
+            matcher = core.JOBS['pbc'].get_matcher()
+            self.step(adapter)
+            self.step(adapter)
+            core.cancel_job('pbc')
+            self.assertEqual(adapter.get_progress('pbc')['status'], 'cancelled')
+            self.assertFalse('pbc' in core.JOBS)
+            self.assertEqual(adapter.has_matcher('pbc'), create)
+            if create:
+                self.assertEqual(adapter.get_header('pbc'), header)
+            self.assertFalse(matcher.is_matched())
+            self.assertEqual(matcher.get_profile().get_timings(), {})
+            self.assertEqual(adapter.get_model(MODEL).sets, {})
+
+    # Cancelling a pairing job removes the sets and equations which have been created by its steps
+    def test_pair_rollback(self):
+        adapter = make_adapter([make_faces(15, 0)])
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        model = adapter.get_model(MODEL)
+        before = dict(model.sets)
+        core.start_pair_job('pbc')
+        for step in range(0, 3):
+            self.assertEqual(self.step(adapter)['status'], 'running')
+        self.assertGreater(len(model.sets), len(before))
+        core.cancel_job('pbc')
+        self.assertEqual(adapter.get_progress('pbc')['status'], 'cancelled')
+        self.assertEqual(list(model.sets.keys()), list(before.keys()))
+        self.assertEqual(len(model.constraints), 0)
+        matcher = adapter.get_matcher('pbc')
+        self.assertTrue(matcher.is_matched() and not matcher.is_paired())
+        # The constraints can be applied afterwards
+        core.apply_constraints('pbc')
+        self.assertTrue(adapter.get_matcher('pbc').is_paired())
+        self.assertGreater(len(model.constraints), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+# Tests of the matching of the nodes, see helpers for how to run them
+import unittest
+import numpy
+
+from helpers import core, make_faces, make_adapter, get_edge_labels, match_baseline, get_pairs, get_results
+
+
+class TestMatching(unittest.TestCase):
+    # With a zero tolerance, both search methods give the same pairs as the original implementation
+    def test_baseline(self):
+        for seed in range(0, 3):
+            faces = make_faces(12, seed)
+            labels_m, coords_m, labels_s, coords_s = faces
+            expected = match_baseline(labels_m, coords_m, labels_s, coords_s)
+            for search in [0, 1]:
+                adapter = make_adapter([faces])
+                core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0, 0.0, search)
+                matcher = adapter.get_matcher('pbc')
+                results = get_results(matcher)
+                self.assertEqual(results[0], [(int(m), int(s)) for m, s in expected[0]])
+                self.assertEqual(results[1:4], expected[1:4])
+                for value, expected_value in zip(results[4:], expected[4:]):
+                    self.assertAlmostEqual(value, expected_value)
+
+    # If only the nodes on one side are exempted, their exact partners are not matched to other nodes by proximity
+    def test_one_sided_exemption(self):
+        for seed in range(0, 3):
+            faces = make_faces(12, seed)
+            labels_m, coords_m, labels_s, coords_s = faces
+            edge_m = set(get_edge_labels(labels_m, coords_m, 1).tolist())
+            edge_s = set(get_edge_labels(labels_s, coords_s, 1).tolist())
+            for ex_m, ex_s, exempt_m, exempt_s in [(0, -1, edge_m, set()), (-1, 1, set(), edge_s)]:
+                expected = match_baseline(labels_m, coords_m, labels_s, coords_s, exempt_m, exempt_s)
+                for search in [0, 1]:
+                    adapter = make_adapter([faces])
+                    core.match_nodes('pbc', 0, 0, 0, 1, ex_m, ex_s, 0, 0, 0.0, search)
+                    results = get_results(adapter.get_matcher('pbc'))
+                    self.assertEqual(results[0], [(int(m), int(s)) for m, s in expected[0]])
+                    self.assertEqual(results[1:4], expected[1:4])
+                    # None of the nodes on the edge are paired
+                    self.assertFalse([(m, s) for m, s in results[0] if m in edge_m or s in edge_s])
+
+    # The assignment search matches as many nodes as the greedy search, with a total distance which is not larger
+    def test_assignment(self):
+        for seed in range(0, 5):
+            faces = make_faces(15, seed, jitter=0.45, fraction=0.5)
+            matchers = list()
+            for search in [0, 2]:
+                adapter = make_adapter([faces])
+                core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0, 0.0, search)
+                matchers.append(adapter.get_matcher('pbc'))
+            greedy, assignment = matchers
+            self.assertEqual(len(get_pairs(assignment)), len(get_pairs(greedy)))
+            self.assertEqual(assignment.prox, greedy.prox)
+            self.assertLessEqual(assignment.tot, greedy.tot + 1e-9)
+            self.assertAlmostEqual(assignment.get_greedy_proximity()['total'], greedy.tot)
+            self.assertAlmostEqual(assignment.get_greedy_proximity()['max'], greedy.mx)
+
+    # Where the greedy search takes the closest slave of the first master, the assignment search finds the matches
+    # with the smallest total distance
+    def test_assignment_optimal(self):
+        coords_m = numpy.array([[0.0, 0.0], [1.0, 0.0]])
+        coords_s = numpy.array([[0.9, 0.0], [-1.0, 0.0]])
+        greedy = -numpy.ones(2, dtype=int)
+        self.assertEqual(core.match_closest(coords_m, coords_s, numpy.arange(2), 0).tolist(), [0, 1])
+        self.assertEqual(core.match_closest(coords_m, coords_s, numpy.arange(2), 2, greedy).tolist(), [1, 0])
+        self.assertEqual(greedy.tolist(), [0, 1])
+
+
+# Matches two arrays of in-plane coordinates by brute force: a master and a slave are matched if each is the only node
+# within the tolerance of the other (see match_tolerance)
+def match_brute_force(coords_m, coords_s, tolerance):
+    d = coords_m[:, None, :] - coords_s[None, :, :]
+    within = (d * d).sum(axis=2) <= tolerance * tolerance
+    unique = within & (within.sum(axis=1) == 1)[:, None] & (within.sum(axis=0) == 1)[None, :]
+    return numpy.where(unique.any(axis=1), unique.argmax(axis=1), -1)
+
+
+class TestCoordinates(unittest.TestCase):
+    # With a tolerance, jittered coordinates are matched to their permuted counterparts, ambiguous nodes are not
+    def test_tolerance(self):
+        for seed in range(0, 5):
+            random = numpy.random.RandomState(seed)
+            grid = numpy.array([(i, j) for i in range(0, 30) for j in range(0, 30)], dtype=float) - 7.5
+            permutation = random.permutation(len(grid))
+            coords_s = grid[permutation] + random.uniform(-0.04, 0.04, grid.shape)
+            matches = core.match_coordinates(grid, coords_s, 0.1)
+            self.assertEqual(matches[permutation].tolist(), list(range(0, len(grid))))
+            # A second slave close to a master makes both candidates ambiguous
+            coords_s = numpy.vstack((coords_s, grid[:10] + 0.05))
+            matches = core.match_coordinates(grid, coords_s, 0.1)
+            self.assertTrue((matches[:10] == -1).all())
+            self.assertEqual(matches.tolist(), match_brute_force(grid, coords_s, 0.1).tolist())
+
+    # With a tolerance, the matches are those of the brute force comparison, for random coordinates of any density
+    def test_tolerance_random(self):
+        for seed in range(0, 5):
+            random = numpy.random.RandomState(seed)
+            coords_m = random.uniform(-3, 3, (400, 2))
+            coords_s = random.uniform(-3, 3, (300, 2))
+            for tolerance in [0.01, 0.1, 0.3, 1.0]:
+                matches = core.match_coordinates(coords_m, coords_s, tolerance)
+                self.assertEqual(matches.tolist(), match_brute_force(coords_m, coords_s, tolerance).tolist())
+
+    # With a tolerance, the displaced nodes of the faces are matched in the exact pass instead of by proximity
+    def test_tolerance_faces(self):
+        faces = make_faces(12, 0, jitter=0.01)
+        matchers = list()
+        for tolerance in [0.0, 0.05]:
+            adapter = make_adapter([faces])
+            core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0, tolerance)
+            matchers.append(adapter.get_matcher('pbc'))
+        self.assertGreater(matchers[0].prox, 0)
+        self.assertEqual(matchers[1].prox, 0)
+        self.assertEqual(matchers[1].exact + matchers[1].exempts, len(faces[0]))
+        self.assertEqual(sorted(get_pairs(matchers[1])), sorted(get_pairs(matchers[0])))
+
+
+
+class TestOrdering(unittest.TestCase):
+    # Ordering the pairs along a curve keeps the pairs, and lowers the distance between consecutive pairs
+    def test_locality(self):
+        faces = make_faces(20, 3)
+        adapter = make_adapter([faces])
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        expected = sorted(get_pairs(adapter.get_matcher('pbc')))
+        for ordering in [1, 2]:
+            adapter = make_adapter([faces])
+            core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0, 0.0, 0, 0, 0, ordering)
+            matcher = adapter.get_matcher('pbc')
+            self.assertEqual(sorted(get_pairs(matcher)), expected)
+            before, after = matcher.get_ordering_metrics()
+            self.assertLess(after['distance'], 0.2 * before['distance'])
+            self.assertGreater(after['adjacent'], 0.75)
+        self.assertLessEqual(after['max distance'], 2.0)
+
+    # When the labels follow the rows of the face, ordering the pairs along a curve increases the label bandwidth,
+    # which is reported as such
+    def test_bandwidth(self):
+        grid = numpy.array([(i, j, 0) for j in range(0, 3) for i in range(0, 6)], dtype=float)
+        labels = numpy.arange(1, len(grid) + 1)
+        adapter = make_adapter([(labels, grid, labels + len(grid), grid + (0, 0, 1))])
+        core.match_nodes('pbc', 0, 0, 0, 1, -1, -1, 0, 0, 0.0, 0, 0, 0, 2)
+        matcher = adapter.get_matcher('pbc')
+        before, after = matcher.get_ordering_metrics()
+        self.assertLess(after['distance'], before['distance'])
+        self.assertGreater(after['label bandwidth'], before['label bandwidth'])
+        messages = [msg for msg in matcher.get_status_messages() if msg.startswith('Label bandwidth')]
+        self.assertEqual(len(messages), 1)
+        self.assertTrue(('increased from ' + str(before['label bandwidth']) + ' to ') in messages[0])
+        self.assertEqual(core.describe_change(3, 2), 'decreased from 3 to 2')
+        self.assertEqual(core.describe_change(3, 3), 'unchanged at 3')
+
+
+if __name__ == '__main__':
+    unittest.main()
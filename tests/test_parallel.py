@@ -0,0 +1,79 @@
+# Tests of the parallel matching of several matchers, see helpers for how to run them
+import pickle
+import unittest
+
+from helpers import core, make_faces, make_adapter, get_results
+
+
+# A stand-in for a pool of processes, of which the map raises the given error
+class FailingPool:
+    # Constructor
+    def __init__(self, error):
+        self.error = error
+
+    # Raises the error instead of running the tasks
+    def map(self, function, tasks):
+        raise self.error
+
+    # Closes the pool
+    def close(self):
+        pass
+
+    # Waits for the workers
+    def join(self):
+        pass
+
+
+class TestParallel(unittest.TestCase):
+    # Matching in parallel gives the same results as matching each matcher in turn
+    def test_parallel(self):
+        faces = [make_faces(n, seed, offset=10000 * seed) for seed, n in enumerate([15, 20, 10])]
+        names = ['x', 'y', 'z']
+        results = list()
+        for parallel in [False, True]:
+            adapter = make_adapter(faces)
+            for index in range(0, len(names)):
+                core.create_matcher(names[index], 0, 0, 2 * index, 2 * index + 1, 2 * index, 2 * index + 1, 0, 0)
+            if parallel:
+                core.match_nodes_parallel(names, 2)
+            else:
+                for name in names:
+                    core.match_nodes(name, 0, 0, 0, 0, 0, 0, 0, 0)
+            results.append([get_results(adapter.get_matcher(name)) for name in names])
+        self.assertEqual(results[0], results[1])
+
+    # If the pool can not run the tasks, they are run in this process and the reason is reported
+    def test_fallback(self):
+        for error in [pickle.PicklingError('can not pickle'), ImportError('no module'), OSError('no process')]:
+            fallbacks = list()
+            results = core.run_tasks(FailingPool(error), abs, [-1, 2, -3], fallbacks)
+            self.assertEqual(results, [1, 2, 3])
+            self.assertEqual(len(fallbacks), 1)
+            self.assertTrue(fallbacks[0].startswith(type(error).__name__ + ':'))
+        # The matchers are matched nevertheless, and report the fallback
+        faces = [make_faces(10, 0)]
+        adapter = make_adapter(faces)
+        core.create_matcher('x', 0, 0, 0, 1, 0, 1, 0, 0)
+        create_pool = core.create_pool
+        core.create_pool = lambda processes: FailingPool(OSError('no process'))
+        try:
+            core.match_nodes_parallel(['x'], 2)
+        finally:
+            core.create_pool = create_pool
+        matcher = adapter.get_matcher('x')
+        self.assertTrue(matcher.is_matched())
+        self.assertEqual(len([msg for msg in matcher.get_status_messages() if 'OSError: no process' in msg]), 1)
+        # Without a pool, nothing is reported
+        fallbacks = list()
+        self.assertEqual(core.run_tasks(None, abs, [-1], fallbacks), [1])
+        self.assertEqual(fallbacks, [])
+
+    # Other errors of the tasks are not hidden by running them again
+    def test_task_error(self):
+        fallbacks = list()
+        self.assertRaises(ValueError, core.run_tasks, FailingPool(ValueError('bad task')), abs, [-1], fallbacks)
+        self.assertEqual(fallbacks, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# Tests of the profile of the operations of a matcher, see helpers for how to run them
+import unittest
+
+from helpers import core, make_faces, make_adapter
+
+
+class TestProfile(unittest.TestCase):
+    # Keeps the size of the chunks
+    def setUp(self):
+        self.chunk_size = core.CHUNK_SIZE
+
+    # Restores the size of the chunks
+    def tearDown(self):
+        core.CHUNK_SIZE = self.chunk_size
+
+    # The matching and the pairing are measured in phases, with the model database calls of each phase: the nodes of
+    # the surfaces and exempt sets are fetched once, the passes do not access the model database, and the sets of the
+    # pairs are created in one batch per chunk of pairs
+    def test_phases(self):
+        for chunk_size in [1000, 50]:
+            core.CHUNK_SIZE = chunk_size
+            adapter = make_adapter([make_faces(10, 0)])
+            core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+            profile = adapter.get_matcher('pbc').get_profile()
+            # Two sets identify the proximity matches, each takes two calls
+            calls = {'extraction': 4, 'exact pass': 0, 'proximity pass': 0, 'proximity sets': 4}
+            self.assertEqual(profile.get_calls(), calls)
+            self.assertEqual(sorted(profile.get_timings()), sorted(calls))
+            count = adapter.get_call_count()
+            core.apply_constraints('pbc')
+            matcher = adapter.get_matcher('pbc')
+            profile = matcher.get_profile()
+            sets = 2 * len(matcher.pairs)
+            calls['sets'] = sets + (sets // 2 + chunk_size - 1) // chunk_size
+            calls['equations'] = matcher.get_equation_count()
+            self.assertEqual(profile.get_calls(), calls)
+            self.assertEqual(adapter.get_call_count() - count, calls['sets'] + calls['equations'])
+            # The messages report the phases in order of execution, and the total number of calls
+            messages = profile.get_messages()
+            self.assertEqual([phase.rsplit(' ', 2)[0] for phase in messages[0][len('Timings: '):].split(', ')],
+                             [phase for phase in core.PHASES if phase in calls])
+            self.assertTrue(messages[1].startswith('Model database calls: ' + str(sum(calls.values())) + ','))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# Tests of the re-matching of the nodes after the mesh has been modified, see helpers for how to run them
+import unittest
+import numpy
+
+from helpers import MODEL, PART, core, make_faces, make_adapter, get_edge_labels, get_pairs
+
+
+# Gets the pairs of a matcher by id, as (master label, slave label) tuples
+def get_pairs_by_id(matcher):
+    pairs = matcher.pairs
+    return dict(zip(pairs.get_ids().tolist(), zip(pairs.get_master_labels().tolist(),
+                                                  pairs.get_slave_labels().tolist())))
+
+
+# Moves a few of the slave nodes of a face (see make_faces) which are not on the edges, and returns the new face
+def move_slaves(faces, positions, distance=0.01):
+    labels_m, coords_m, labels_s, coords_s = faces
+    coords_s = coords_s.copy()
+    moved = numpy.flatnonzero((coords_s[:, 0] > 0) & (coords_s[:, 1] > 0))[positions]
+    coords_s[moved, :2] += distance
+    return labels_m, coords_m, labels_s, coords_s
+
+
+class TestRematching(unittest.TestCase):
+    # Re-matching an unchanged mesh keeps all pairs
+    def test_unchanged(self):
+        adapter = make_adapter([make_faces(15, 0)])
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        before = get_pairs_by_id(adapter.get_matcher('pbc'))
+        core.rematch_nodes('pbc')
+        matcher = adapter.get_matcher('pbc')
+        self.assertEqual(get_pairs_by_id(matcher), before)
+        self.assertEqual(matcher.get_kept_count(), len(before))
+
+    # After the mesh is modified, re-matching keeps the unchanged pairs with their ids, the other nodes get new pairs
+    # with new ids, and each node which is not exempted is in exactly one pair
+    def test_modified(self):
+        faces = make_faces(20, 1)
+        adapter = make_adapter([faces])
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        before = get_pairs_by_id(adapter.get_matcher('pbc'))
+        next_id = adapter.get_matcher('pbc').pairs.get_next_id()
+        # Move a few slave nodes, and exempt the nodes on a second edge
+        labels_m, coords_m, labels_s, coords_s = move_slaves(faces, [20, 50, 80])
+        part = adapter.get_model(MODEL).parts[PART]
+        part.surfaces['slave_0'] = (labels_s.copy(), coords_s)
+        exempt_m = get_edge_labels(labels_m, coords_m, 2)
+        exempt_s = get_edge_labels(labels_s, coords_s, 2)
+        part.sets['exempt_master_0'] = exempt_m
+        part.sets['exempt_slave_0'] = exempt_s
+        core.rematch_nodes('pbc')
+        matcher = adapter.get_matcher('pbc')
+        after = get_pairs_by_id(matcher)
+        kept = [pair_id for pair_id in after if after[pair_id] == before.get(pair_id)]
+        self.assertEqual(len(kept), matcher.get_kept_count())
+        self.assertTrue(0 < matcher.get_kept_count() < len(before))
+        self.assertTrue(all([pair_id >= next_id for pair_id in after if pair_id not in kept]))
+        # None of the kept pairs has an exempted or moved node
+        moved = set(labels_s[numpy.any(coords_s != faces[3], axis=1)].tolist())
+        self.assertFalse([pair_id for pair_id in kept if after[pair_id][1] in moved or
+                          after[pair_id][0] in exempt_m or after[pair_id][1] in exempt_s])
+        # Each node which is not exempted is in exactly one pair
+        pairs = get_pairs(matcher)
+        self.assertEqual(sorted([m for m, s in pairs]), sorted(numpy.setdiff1d(labels_m, exempt_m).tolist()))
+        self.assertEqual(sorted([s for m, s in pairs]), sorted(numpy.setdiff1d(labels_s, exempt_s).tolist()))
+        # The statistics are those of matching the modified mesh from scratch
+        fresh = make_adapter([(labels_m, coords_m, labels_s, coords_s)], 2)
+        core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, 0)
+        expected = fresh.get_matcher('pbc')
+        self.assertEqual((matcher.exact + matcher.prox, matcher.exempts),
+                         (expected.exact + expected.prox, expected.exempts))
+
+    # After the mesh is modified, the update of the constraints gives the same sets and equations as applying the
+    # constraints of the new pairs, and only deletes and creates those which differ, for both modes and formulations
+    def test_update(self):
+        for mode in [0, 1]:
+            for formulation in [0, 1]:
+                labels_m, coords_m, labels_s, coords_s = make_faces(20, 1)
+                # Keep the nodes away from the axis in axial mode
+                coords_m[:, :2] += 1.5
+                coords_s[:, :2] += 1.5
+                faces = (labels_m, coords_m, labels_s, coords_s)
+                adapter = make_adapter([faces])
+                core.match_nodes('pbc', 0, 0, 0, 1, 0, 1, 0, mode, 0.0, 0, 0, formulation)
+                core.apply_constraints('pbc')
+                model = adapter.get_model(MODEL)
+                reference_points = dict(model.reference_points)
+                # Move a few slave nodes
+                labels_m, coords_m, labels_s, coords_s = move_slaves(faces, [20, 50, 80])
+                model.parts[PART].surfaces['slave_0'] = (labels_s, coords_s)
+                core.rematch_nodes('pbc')
+                matcher = adapter.get_matcher('pbc')
+                self.assertTrue(matcher.is_paired() and matcher.is_outdated())
+                expected = self.get_changes(matcher, model)
+                changes = matcher.update_constraints()
+                self.assertEqual(changes, expected)
+                self.assertTrue(0 < changes['created equations'] < len(model.constraints))
+                self.assertFalse(matcher.is_outdated())
+                # The model has the sets and equations of the new pairs, the reference point has not been moved
+                sets = dict((name, int(labels[0])) for name, (instance, labels) in model.sets.items()
+                            if 'proximity' not in name)
+                self.assertEqual(sets, dict(matcher.get_pair_sets(matcher.pairs)))
+                datum_id = model.datums['CSYS_PBC_pbc'][0] if mode == 1 else -1
+                self.assertEqual(dict(model.constraints), dict(matcher.iterate_equations(datum_id)))
+                self.assertEqual(model.reference_points, reference_points)
+                self.assertEqual(len(reference_points), formulation)
+
+    # Counts the sets and equations which differ between the applied and the current pairs of a matcher, by comparing
+    # all of them
+    def get_changes(self, matcher, model):
+        datum_id = model.datums['CSYS_PBC_pbc'][0] if matcher.get_mode_index() == 1 else -1
+        changes = dict()
+        for kind, old, new in [('sets', matcher.get_pair_sets(matcher.get_applied_pairs()),
+                                matcher.get_pair_sets(matcher.pairs)),
+                               ('equations', list(matcher.iterate_equations(datum_id, matcher.get_applied_pairs())),
+                                list(matcher.iterate_equations(datum_id)))]:
+            changes['deleted ' + kind] = len(set(old) - set(new))
+            changes['created ' + kind] = len(set(new) - set(old))
+        return changes
+
+
+if __name__ == '__main__':
+    unittest.main()
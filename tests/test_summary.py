@@ -0,0 +1,42 @@
+# Tests of the summary of the matchers which is published for the dialogs, see helpers for how to run them
+import pickle
+import unittest
+
+from helpers import core, make_faces, make_adapter, MemoryAdapter
+
+
+class TestSummary(unittest.TestCase):
+    # Without matchers, the summary is empty, in the same form as the summary of the dialogs when none has been
+    # published
+    def test_empty(self):
+        core.set_adapter(MemoryAdapter())
+        self.assertEqual(core.get_summary(), {'names': [], 'headers': {}})
+
+    # The summary has the names of the matchers in the order of the repository, and their headers with the status and
+    # the messages of the confirmation dialog, which are plain values that can be pickled
+    def test_contents(self):
+        faces = [make_faces(10, seed, offset=10000 * seed) for seed in range(0, 2)]
+        adapter = make_adapter(faces)
+        core.match_nodes('y', 0, 0, 2, 3, 2, 3, 0, 0)
+        core.match_nodes('x', 0, 0, 0, 1, 0, 1, 0, 0)
+        core.apply_constraints('x')
+        summary = core.get_summary()
+        self.assertEqual(summary['names'], ['y', 'x'])
+        self.assertEqual(sorted(summary['headers']), ['x', 'y'])
+        for name in summary['names']:
+            matcher = adapter.get_matcher(name)
+            header = summary['headers'][name]
+            self.assertEqual(header, matcher.get_header())
+            self.assertEqual((header['name'], header['master'], header['slave']),
+                             (name, matcher.get_master_name(), matcher.get_slave_name()))
+            self.assertEqual((header['matched'], header['paired']), (True, name == 'x'))
+            self.assertEqual(header['pairs'], matcher.get_pair_count())
+            self.assertEqual(header['messages'], matcher.get_status_messages())
+        self.assertEqual(pickle.loads(pickle.dumps(summary, 0)), summary)
+        # Removed matchers are no longer in the summary
+        core.remove_constraints('y')
+        self.assertEqual(core.get_summary()['names'], ['x'])
+
+
+if __name__ == '__main__':
+    unittest.main()